@@ -2,13 +2,20 @@
     This is the main entry, just run the script to open the interface
 """
 
+import os
 from sys import platform, path
 
 if platform == "win32":
     path.append("./")
 
 from src.ui.application import application
+from src.ui.common import registry
 from src.model.corpus import Corpus
 
 if __name__ == '__main__':
-    application.run(debug=True)
+    debug = True
+    # In debug mode the reloader runs this script in a parent process that only watches the files, the corpora are
+    # loaded by the child process that serves the application
+    if not debug or os.environ.get("WERKZEUG_RUN_MAIN") == "true":
+        registry.warm_up()
+    application.run(debug=debug)
@@ -26,7 +26,7 @@ class Author:
         Return document at index
     get_documents()
         Return all documents
-    dict_from_documents(documents)
+    dict_from_documents(documents, authors=None)
         Create dictionary of author from documents
     """
     def __init__(self, name):
@@ -85,22 +85,25 @@ class Author:
         return self.__str__()
 
     @staticmethod
-    def dict_from_documents(documents):
+    def dict_from_documents(documents, authors=None):
         """
         Create dictionary of author from documents
         :param documents: a list of document
         :type documents: list[Document]
+        :param authors: an existing dict of author to complete with documents (a new dict is created if None)
+        :type authors: dict[int, Author]
         :return: a dict of all author named in given documents
         :rtype: dict[int, Author]
         """
-        authors = {}
+        authors = {} if authors is None else authors
         for doc in documents:
-            if doc.author and doc.author not in authors:
-                authors[doc.author] = Author(name=doc.author)
-            authors[doc.author].add_document(doc)
+            name = doc.get_author()
+            if name and name not in authors:
+                authors[name] = Author(name=name)
+            authors[name].add_document(doc)
 
             if doc.get_type() == "arxiv":
-                for author in doc.co_authors:
+                for author in doc.get_co_authors():
                     if author not in authors:
                         authors[author] = Author(name=author)
                     authors[author].add_document(doc)
@@ -1,17 +1,43 @@
+import functools
 import os
-import re
 import sys
+import threading
 
 import numpy as np
-import numpy.linalg
 import pandas as pd
 from scipy.sparse import csr_matrix
 
 from src.utility import config
 from src.utility.data_query import DataQuery
 from src.model.author import Author
-from src.model.document import Document, RedditDocument, ArxivDocument
-from src.utility.utils import clean_text, split_string, stringify_list_to_list
+from src.model.document import RedditDocument, ArxivDocument
+from src.model.document_store import DocumentStore
+from src.model import indexer, query, snapshot
+from src.model.database import CorpusDatabase
+from src.model.facet import FacetIndex
+from src.model.positional import PositionalIndex
+from src.model.scoring import ScoringEngine
+from src.model.vocabulary import Vocabulary
+from src.model.weighting import weight
+from src.utility.result_cache import ResultCache
+from src.utility.tokenizer import Tokenizer, ENGLISH_STOPWORDS
+from src.utility.utils import stringify_list_to_list
+
+
+def _synchronized(method):
+    """
+    A decorator to run a method of Corpus while holding the lock of the corpus, so it never reads a page half appended
+    :param method: the method
+    :type method: Callable
+    :return: the method that holds the lock
+    :rtype: Callable
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self.lock:
+            return method(self, *args, **kwargs)
+
+    return wrapper
 
 
 # @singleton
@@ -23,8 +49,10 @@ class Corpus:
     ----------
     name : str
         the name of the corpus (fetch keyword)
-    id2doc : dict[int, Document]
-        the document contained into the corpus
+    store : DocumentStore
+        the documents contained into the corpus, as columns
+    id2doc : DocumentStore
+        the document contained into the corpus by id (the store, documents are views created on demand)
     authors: dict[int, Author]
         the authors of documents
     ndoc : int
@@ -33,25 +61,54 @@ class Corpus:
         the number of authors of documents
     saved : bool
         the save status of the corpus
+    index_saved : bool
+        True if the index of the corpus is saved into a fresh snapshot
     loaded : bool
         the load status of the corpus
+    weighting : str
+        the weighting scheme of mat_TFxIDF, can be "tf" | "log" | "bm25" | "l2" (see weighting.weight)
+    workers : int
+        the number of process used to tokenize documents
+    tokenizer : Tokenizer
+        the tokenizer that split documents and keywords into words (english stopwords removed by default)
     file_path : Path
-        the path to the saved corpus
+        the path to the saved corpus (<corpus name>.csv, or <corpus name>.db if config.STORAGE is "sqlite")
+    database : CorpusDatabase | None
+        the SQLite storage of the corpus if config.STORAGE is "sqlite", None to store the corpus as csv
     unique_chain : str
-        the string that contain all document text
-    vocab : dict[str, dict[str, int]]
-        the dict that contain all unique word of the corpus as key and some his freq, document_freq and id as value
+        the string that contain all document text (joined on demand)
+    document_len : ndarray
+        the number of word of each document
+    vocab : Vocabulary
+        the vocabulary that contain all unique word of the corpus kept by the min_df / max_df of the tokenizer, with
+        his id, freq and document_freq
     mat_TF : csr_matrix
         the term frequency matrix with word as column and document as row, populated with word occurrence
     mat_TFxIDF : csr_matrix
         the term frequency-inverse document frequency matrix with word as column and document as row, populated with word occurrence
+    engine : ScoringEngine
+        the engine used to rank documents by cosine similarity with keywords
+    positional_index : PositionalIndex
+        the positions of each word into the documents, used by concorde and search (built on first use)
+    facets : FacetIndex
+        the rows of the documents of each source, author and month (built on first use)
+    results : ResultCache
+        the last results of sort_by_score, cleared when the index changes
+    lock : RLock
+        held while a page of documents is appended to the index, and by the methods that read the index
+    on_publish : Callable | None
+        called with the corpus each time a page of documents is published (searchable) during a load
 
     Methods
     -------
     load(name, count)
         Load corpus with data depend on name and count
+    progress()
+        Return the number of document fetched and indexed by the running load
     save()
-        Save the current corpus to a csv (<corpus name>.csv)
+        Save the current corpus to a csv (<corpus name>.csv) or his database, and his index to a binary snapshot (<corpus name>.idx)
+    save_index()
+        Save the index of the current corpus to a binary snapshot (<corpus name>.idx)
     get_name()
         Return the name of corpus
     get_document_count()
@@ -66,6 +123,12 @@ class Corpus:
         Return sorted list of document
     get_authors(sort="")
         Return sorted list of author
+    documents_between(start=None, end=None)
+        Return the documents dated between start and end, sorted by date
+    min_date()
+        Return the date of the oldest document
+    max_date()
+        Return the date of the newest document
     is_same(name, document_count)
         Return if corpus match with name and document_count
     concorde(keyword, context_size)
@@ -74,95 +137,387 @@ class Corpus:
         Same as concorde, but return a list of string with 2 word of context
     stats(top_count)
         Print some statistic about the corpus. The total number of unique word and the <top_count> most frequent words
+    sort_by_score(keywords, max_count=5, author=None, start=None, end=None, source=None)
+        Return <max_count> sorted document by keywords match, among the documents that match the filters
+    filter_rows(author=None, start=None, end=None, source=None)
+        Return the sorted ids of the documents that match the filters
+    search_many(queries, k=5)
+        Return the <k> best document ids and their scores for each query
+    term_means(kind="tf", terms=None, facet=None)
+        Return the mean value of each word over the documents
+    top_terms(kind="tf", count=10, facet=None)
+        Return the ids of the <count> words with the highest mean value
+    facet_matrix(kind, facet)
+        Return the rows of the matrix of kind that belong to a facet
     """
 
-    def __init__(self, name):
+    def __init__(self, name, weighting="tf", workers=config.INDEX_WORKERS, tokenizer=None):
         self.name = name
-        self.id2doc = {}
+        self.weighting = weighting
+        self.workers = workers
+        self.tokenizer = tokenizer or Tokenizer(stopwords=ENGLISH_STOPWORDS)
+        self.store = DocumentStore()
         self.authors = {}
         self.ndoc = 0
         self.naut = 0
         self.saved = False
         self.loaded = False
-        self.file_path = config.DATA_FOLDER.joinpath(f"{name}.csv")
-        self.unique_chain = ""
-        self.vocab = {}
+        self.file_path = config.DATA_FOLDER.joinpath(f"{name}.db" if config.STORAGE == "sqlite" else f"{name}.csv")
+        self.database = CorpusDatabase(self.file_path) if config.STORAGE == "sqlite" else None
+        self.document_len = None
+        self.vocab = Vocabulary()
         self.mat_TF = None
-        self.mat_TFxIDF = None
+        # The index of every word, vocab and mat_TF are the words of it kept by the tokenizer (see _prune)
+        self._full_vocab = self.vocab
+        self._full_TF = None
+        self._full_len = None
+        self.index_saved = False
+        self._source_rows = None
+        self._cache = {}
+        self.results = ResultCache(config.RESULT_CACHE_ENTRIES, config.RESULT_CACHE_BYTES, config.RESULT_CACHE_TTL)
+        self.lock = threading.RLock()
+        self.on_publish = None
+        self._target = 0
+        self._fetched = 0
 
     def load(self, count):
         """
-        Load corpus with data depend on name and count
+        Load corpus with data depend on name and count (from the index snapshot if it is fresh).
+        If the corpus is already loaded with less than count documents, only the missing documents are indexed: the
+        next rows of the saved corpus first, then the documents fetched from the apis.
+        With the SQLite storage, the csv of the corpus is migrated on first load and the fetched documents are appended
+        to the database.
+        Documents are published page by page (chunks of the saved corpus, then pages of the apis): each page is
+        appended to the index as soon as it is read, so the corpus can be searched while the next pages arrive (see
+        on_publish and progress). The vocabulary is pruned once all pages are indexed.
         :param count: The amount of document to retrieve
         :type count: int
         """
+        self._target = count
+        if not (self.loaded and self.ndoc < count):
+            with self.lock:
+                self._reset()
+                csv_path = self.file_path.with_suffix(".csv")
+                if self.database is not None and not os.path.isfile(self.file_path) and os.path.isfile(csv_path):
+                    self.database.migrate(csv_path)
+                read = os.path.isfile(self.file_path) and self._read_index(count)
+            if read:
+                self.saved = True
+                self._publish()
+            elif os.path.isfile(self.file_path):
+                self.saved = True
+                self._read_source(count)
+        if self.ndoc < count and os.path.isfile(self.file_path) and (self._source_rows is None or self._source_rows > self.ndoc):
+            # The saved corpus has rows after the documents of the corpus, they are read before the apis are queried
+            self._fetched = self.ndoc
+            self._read_source(count)
+        self._fetched = self.ndoc
+
+        if self.ndoc < count:
+            r_off, a_off = self._resume_offsets()
+            # The database follows the corpus if it holds exactly the documents of the corpus
+            append = self.database is not None and self.database.count() == self.ndoc
+            for documents in DataQuery.all_pages(self.name, count - self.ndoc, r_off, a_off):
+                self._fetched += len(documents)
+                if append:
+                    self.database.append(documents)
+                self._append(documents, prune=False)
+            if append:
+                self._source_rows = self.ndoc
+            self.saved = append
+
+        # The words are selected once all pages are indexed, as in a one-shot build
+        with self.lock:
+            self._prune()
+            self._invalidate()
+        self.loaded = True
 
-        if not os.path.isfile(self.file_path):
-            self.saved = False
-            data_list = DataQuery().all(self.name, count)
-            self.id2doc = dict([(i, doc) for i, doc in enumerate(data_list)])
+    def progress(self):
+        """
+        Return the number of document fetched and indexed by the running load (or the last one)
+        :return: the document count to load, the documents fetched (read from the saved corpus or the apis) and the
+            documents indexed (searchable)
+        :rtype: dict[str, int]
+        """
+        return dict(target=self._target, fetched=self._fetched, indexed=self.ndoc)
+
+    def _publish(self):
+        """
+        Tell on_publish that the documents appended are searchable
+        """
+        if self.on_publish is not None:
+            self.on_publish(self)
+
+    def _read_source(self, count):
+        """
+        Add the documents of the saved corpus (csv or database) that follow the documents of the corpus, up to <count>
+        documents. Documents are read and indexed chunk by chunk (config.LOAD_CHUNK_SIZE rows), the vocabulary is pruned
+        by the caller (see load).
+        :param count: The amount of document the corpus must contain
+        :type count: int
+        """
+        start = self.ndoc
+        read = 0
+        # One more row is read to know if the whole source is loaded
+        for documents in self._source_chunks(count + 1, start):
+            read += len(documents)
+            documents = documents[0:count - self.ndoc]
+            self._fetched += len(documents)
+            if len(documents) > 0:
+                self._append(documents, prune=False)
+        with self.lock:
+            self._source_rows = start + read if start + read <= count else None
+
+    def _source_chunks(self, count, start=0):
+        """
+        Yield the documents of the saved corpus (csv or database) from row <start> to row <count>, chunk by chunk
+        :param count: The index of the row after the last document to read
+        :type count: int
+        :param start: The index of the first document to read
+        :type start: int
+        :return: a generator of list of document
+        :rtype: Generator[list[Document]]
+        """
+        size = config.LOAD_CHUNK_SIZE
+        if start >= count:
+            return
+        if self.database is not None:
+            for offset in range(start, count, size):
+                documents = self.database.read(min(size, count - offset), offset)
+                if len(documents) == 0:
+                    return
+                yield documents
         else:
-            self.saved = True
-            df = pd.read_csv(self.file_path, sep=config.CSV_SEP, index_col=0, converters={"co_authors": stringify_list_to_list})
-            if len(df) < count:
-                self.saved = False
-                r_off = df.loc[df.type == "reddit", :].tail(1).iloc[0].fullname
-                a_off = df.loc[(df.type == "arxiv") & (df.api_index == df.api_index.max()), :].tail(1).iloc[0].api_index
-                data_list = DataQuery().all(self.name, count - len(df), r_off, a_off)
-
-                df2 = pd.DataFrame([data.__dict__ | dict(type=data.get_type()) for data in data_list])
-                df = pd.concat([df, df2], ignore_index=True)
-            else:
-                df = df.iloc[0:count, :]
+            # The header line is kept, the rows before start are skipped without being parsed into documents
+            with pd.read_csv(self.file_path, sep=config.CSV_SEP, index_col=0, converters={"co_authors": stringify_list_to_list},
+                             skiprows=range(1, start + 1), nrows=count - start, chunksize=size) as reader:
+                for df in reader:
+                    yield [RedditDocument(**kwargs) if kwargs["type"] == "reddit" else ArxivDocument(**kwargs) for kwargs in df.to_dict(orient='records')]
 
-            df.index.name = "id"
-            self.id2doc = dict(
-                [(i, RedditDocument(**kwargs) if kwargs["type"] == "reddit" else ArxivDocument(**kwargs)) for i, kwargs
-                 in enumerate(df.to_dict(orient='records'))])
+    def _reset(self):
+        """
+        Remove all documents and the index of the corpus
+        """
+        self.store = DocumentStore()
+        self.authors = {}
+        self.ndoc = 0
+        self.naut = 0
+        self._set_index(Vocabulary(), csr_matrix((0, 0), dtype=int), np.zeros(0, dtype=int))
+        self.index_saved = False
+        self._source_rows = None
+        self._invalidate()
 
-        self.authors = Author.dict_from_documents(list(self.id2doc.values()))
+    def _invalidate(self):
+        """
+        Drop everything computed from the index (weighted matrix, scoring engine, search results, ...), it is computed
+        again when needed
+        """
+        self._cache = {}
+        self.results.clear()
 
-        self.ndoc = len(self.id2doc)
-        self.naut = len(self.authors)
+    def _cached(self, key, compute):
+        """
+        Return the value cached under key, computing it if it is missing
+        :param key: the cache key
+        :type key: str
+        :param compute: the function that compute the value
+        :type compute: Callable
+        :return: the value
+        :rtype: Any
+        """
+        if key not in self._cache:
+            self._cache[key] = compute()
+        return self._cache[key]
+
+    @property
+    def id2doc(self):
+        return self.store
+
+    @property
+    def unique_chain(self):
+        return " ".join(self.store.column("text"))
+
+    @property
+    def mat_TFxIDF(self):
+        return self._cached("mat_TFxIDF", lambda: weight(self.mat_TF, self.vocab.document_freq, self.document_len, self.weighting))
+
+    @property
+    def engine(self):
+        return self._cached("engine", lambda: ScoringEngine(self.mat_TFxIDF))
+
+    @property
+    def positional_index(self):
+        return self._cached("positional_index", lambda: PositionalIndex(self.store.column("text")))
 
-        self.unique_chain = " ".join(map(Document.get_text, self.id2doc.values()))
+    @property
+    def facets(self):
+        return self._cached("facets", lambda: FacetIndex(list(self.id2doc.values()), self.authors))
+
+    def _resume_offsets(self):
+        """
+        Return the offsets to resume the queries after the documents of the corpus
+        :return: the name of the last reddit document and the highest api index of arxiv documents
+        :rtype: (str, int)
+        """
+        if self.database is not None and self.saved and self._source_rows == self.ndoc:
+            return self.database.resume_offsets()
+        reddit = np.flatnonzero(self.store.types == 0)
+        arxiv = np.flatnonzero(self.store.types == 1)
+        return (self.store.column("fullname")[reddit[-1]] if len(reddit) > 0 else "",
+                int(self.store.api_indexes[arxiv].max()) if len(arxiv) > 0 else 0)
+
+    def _append(self, documents, prune=True):
+        """
+        Add documents to the corpus and append their rows to the index, then publish them
+        :param documents: the documents to add
+        :type documents: list[Document]
+        :param prune: False to keep the vocabulary as it is (when more documents are appended before the next _prune)
+        :type prune: bool
+        """
+        # The documents are tokenized before the lock is taken, the index is only locked while the page is merged
+        chunks = indexer.tokenize([document.get_text() for document in documents], self.tokenizer, self.workers, config.INDEX_CHUNK_SIZE)
+        with self.lock:
+            self._add_documents(documents)
+            self._index_documents(chunks)
+            if prune:
+                self._prune()
+            self._invalidate()
+        self._publish()
+
+    def _add_documents(self, documents):
+        """
+        Add documents to the corpus, without indexing them
+        :param documents: the documents to add
+        :type documents: list[Document]
+        """
+        self._add_rows(self.store.append(documents))
 
-        # Creation of term frequency matrix and vocabulary dictionary
-        indptr = [0]
-        indices = []
-        data = []
+    def _add_rows(self, rows):
+        """
+        Add the authors of the documents at rows of the store to the corpus
+        :param rows: the ids of the new documents
+        :type rows: range
+        """
+        self.index_saved = False
+        self.authors = Author.dict_from_documents([self.store[i] for i in rows], self.authors)
 
-        document_len = []  # for tf-idf computation
+        self.ndoc = len(self.store)
+        self.naut = len(self.authors)
 
-        for document in self.id2doc.values():
-            split_words = split_string(clean_text(document.get_text()))
-            document_len.append(len(split_words))
-            for word in split_words:
-                index = self.vocab.setdefault(word, {"id": len(self.vocab)})["id"]
-                indices.append(index)
-                data.append(1)
-            indptr.append(len(indices))
+    def _index_documents(self, chunks):
+        """
+        Append the rows of tokenized documents to the term frequency matrix, extending the vocabulary with their new words
+        :param chunks: the documents tokenized by indexer.tokenize
+        :type chunks: list[tuple]
+        """
+        vocab, mat_TF = self._full_vocab, self._full_TF
+        rows = indexer.merge(vocab, chunks)
 
-        self.mat_TF = csr_matrix((data, indices, indptr), dtype=int)
+        # Previous rows keep their values, only the column count grows with the new words
+        mat_TF = csr_matrix((
+            np.concatenate([mat_TF.data, rows.data]),
+            np.concatenate([mat_TF.indices, rows.indices]),
+            np.concatenate([mat_TF.indptr, rows.indptr[1:] + mat_TF.nnz])
+        ), shape=(mat_TF.shape[0] + rows.shape[0], len(vocab)))
 
         # Total occurrence of words in corpus computation
-        for k, v in self.vocab.items():
-            self.vocab[k]["freq"] = self.mat_TF.getcol(v["id"]).sum()
-            self.vocab[k]["document_freq"] = np.count_nonzero(self.mat_TF.getcol(v["id"]).toarray())
+        vocab.update(rows)
+        self._set_index(vocab, mat_TF, np.concatenate([self._full_len, np.asarray(rows.sum(axis=1)).ravel()]))
 
-        # Creation of term frequency-inverse document frequency matrix
-        idf = np.log(self.mat_TF.shape[0] / np.array([v["document_freq"] for v in self.vocab.values()]))
-        tf_div = np.array([np.array([length for _ in range(len(idf))]) for length in document_len])
-        self.mat_TFxIDF = (self.mat_TF / tf_div).multiply(idf).tocsr()
+    def _set_index(self, vocab, mat_TF, document_len):
+        """
+        Replace the index of every word, it is used as it is until the next _prune
+        :param vocab: the vocabulary of every word
+        :type vocab: Vocabulary
+        :param mat_TF: the term frequency matrix of every word
+        :type mat_TF: csr_matrix
+        :param document_len: the number of word of each document
+        :type document_len: ndarray
+        """
+        self._full_vocab, self._full_TF, self._full_len = vocab, mat_TF, document_len
+        self.vocab, self.mat_TF, self.document_len = vocab, mat_TF, document_len
 
-        self.loaded = True
+    def _prune(self):
+        """
+        Select the words kept by the min_df / max_df of the tokenizer into vocab and mat_TF. The index of every word
+        keeps the counts of the words that are not kept, so the selection of a corpus indexed in several times is the
+        same as the one of a corpus indexed at once
+        """
+        keep = self.tokenizer.keep(self._full_vocab.document_freq, self._full_TF.shape[0])
+        if keep.all():
+            self.vocab, self.mat_TF, self.document_len = self._full_vocab, self._full_TF, self._full_len
+        else:
+            self.vocab, kept = self._full_vocab.select(keep)
+            self.mat_TF = self._full_TF[:, kept]
+            self.document_len = np.asarray(self.mat_TF.sum(axis=1)).ravel()
 
+    def _read_index(self, count):
+        """
+        Restore the documents, the vocabulary and the term frequency matrix from the index snapshot.
+        A snapshot of the whole csv with less than count documents is also read, the missing documents are appended later.
+        :param count: The amount of document the snapshot must contain
+        :type count: int
+        :return: True if the snapshot was fresh and has been read
+        :rtype: bool
+        """
+        folder = snapshot.snapshot_path(self.file_path)
+        tokenizer = self.tokenizer.signature()
+        result = snapshot.read(folder, self.file_path, ndoc=count, tokenizer=tokenizer) or snapshot.read(folder, self.file_path, complete=True, tokenizer=tokenizer)
+        if result is None or result[1]["ndoc"] > count:
+            return False
+        arrays, meta = result
+
+        self.store = DocumentStore.from_arrays({key[4:]: array for key, array in arrays.items() if key.startswith("doc_")})
+        self._add_rows(range(meta["ndoc"]))
+
+        vocab = Vocabulary.from_arrays(
+            snapshot.decode_strings(arrays["vocab"], arrays["vocab_offsets"]), arrays["vocab_freq"], arrays["vocab_document_freq"]
+        )
+        mat_TF = csr_matrix((arrays["tf_data"], arrays["tf_indices"], arrays["tf_indptr"]), shape=(meta["ndoc"], len(vocab)), copy=False)
+        self._set_index(vocab, mat_TF, arrays["document_len"])
+        # A snapshot of the whole database is only complete while no row has been appended to the database since
+        complete = meta["complete"] and (self.database is None or self.database.count() == meta["ndoc"])
+        self._source_rows = meta["ndoc"] if complete else None
+        self.index_saved = True
+        self._invalidate()
+        return True
+
+    @_synchronized
+    def save_index(self):
+        """
+        Save the index of the current corpus to a binary snapshot (<corpus name>.idx), the corpus csv must exist
+        """
+        # The index of every word is saved, the words kept are selected again when it is read
+        arrays = {
+            "tf_data": self._full_TF.data,
+            "tf_indices": self._full_TF.indices,
+            "tf_indptr": self._full_TF.indptr,
+            "document_len": self._full_len,
+            "vocab_freq": self._full_vocab.freq,
+            "vocab_document_freq": self._full_vocab.document_freq,
+        }
+        arrays["vocab"], arrays["vocab_offsets"] = snapshot.encode_strings(list(self._full_vocab))
+        arrays.update({f"doc_{key}": array for key, array in self.store.arrays().items()})
+
+        snapshot.write(snapshot.snapshot_path(self.file_path), self.file_path, arrays, ndoc=self.ndoc, complete=self._source_rows == self.ndoc,
+                       tokenizer=self.tokenizer.signature())
+        self.index_saved = True
+
+    @_synchronized
     def save(self):
         """
-        Save the current corpus to a csv (<corpus name>.csv)
+        Save the current corpus to a csv (<corpus name>.csv) and his index to a binary snapshot (<corpus name>.idx).
+        With the SQLite storage, the documents missing from the database are appended to it.
         """
-        df = pd.DataFrame([data.__dict__ | dict(type=data.get_type()) for data in self.id2doc.values()])
-        df.to_csv(self.file_path, sep=config.CSV_SEP)
+        if self.database is not None:
+            self.database.append([self.store[i] for i in range(self.database.count(), self.ndoc)])
+            # The database may hold more documents than the corpus, the snapshot is then not complete
+            self._source_rows = self.ndoc if self.database.count() == self.ndoc else None
+        else:
+            df = pd.DataFrame(self.store.to_dict())
+            df.to_csv(self.file_path, sep=config.CSV_SEP)
+            self._source_rows = self.ndoc
+        self.save_index()
         self.saved = True
 
     def get_name(self):
@@ -205,35 +560,91 @@ class Corpus:
         """
         return self.saved
 
+    def _order(self, key):
+        """
+        Return the permutation that sort the documents or the authors by key (stable, cached until the next load)
+        :param key: can be "title" | "date" for documents, "name" | "document_count" for authors
+        :type key: str
+        :return: the indexes of the documents (id2doc order) or of the authors (authors order), sorted
+        :rtype: ndarray
+        """
+        def compute():
+            if key == "title":
+                values = np.array(list(self.store.column("title")), dtype=str)
+            elif key == "date":
+                values = self.facets.dates
+            elif key == "name":
+                values = np.array([author.get_name() for author in self.authors.values()], dtype=str)
+            else:
+                values = np.array([author.get_document_count() for author in self.authors.values()], dtype=np.int64)
+            return np.argsort(values, kind="stable")
+
+        return self._cached(f"order_{key}", compute)
+
+    @_synchronized
     def get_documents(self, sort=""):
         """
-        Return sorted list of document
+        Return sorted list of document (the sort permutation is cached until the next load)
         :param sort: Sort mode, can be "" | "title" | "date"
         :type sort: str
         :return: a list of document
         :rtype: list[Document]
         """
-        if sort == "title":
-            return sorted(self.id2doc.values(), key=lambda x: x.get_title())
-        if sort == "date":
-            return sorted(self.id2doc.values(), key=lambda x: x.get_date())
+        documents = list(self.id2doc.values())
+        if sort in ("title", "date"):
+            return [documents[i] for i in self._order(sort)]
         else:
-            return list(self.id2doc.values())
+            return documents
 
+    @_synchronized
     def get_authors(self, sort=""):
         """
-        Return sorted list of author
+        Return sorted list of author (the sort permutation is cached until the next load)
         :param sort: Sort mode, can be "" | "name" | "document_count"
         :type sort: str
         :return: a list of author
         :rtype: list[Author]
         """
-        if sort == "name":
-            return sorted(self.authors.values(), key=lambda x: x.get_name())
-        elif sort == "document_count":
-            return sorted(self.authors.values(), key=lambda x: x.get_document_count())
+        authors = list(self.authors.values())
+        if sort in ("name", "document_count"):
+            return [authors[i] for i in self._order(sort)]
         else:
-            return list(self.authors.values())
+            return authors
+
+    @_synchronized
+    def documents_between(self, start=None, end=None):
+        """
+        Return the documents dated between start and end (included), sorted by date, found by binary search
+        :param start: the first date, None for no lower bound
+        :type start: datetime | date | str
+        :param end: the last date (a day without time is included as a whole), None for no upper bound
+        :type end: datetime | date | str
+        :return: a list of document
+        :rtype: list[Document]
+        :raise ValueError
+        """
+        facets = self.facets
+        return [self.id2doc[i] for i in facets.date_order[facets.date_range(start, end)]]
+
+    @_synchronized
+    def min_date(self):
+        """
+        Return the date of the oldest document
+        :return: the date, None if no document has a date
+        :rtype: datetime | str | None
+        """
+        order = self.facets.date_order
+        return self.id2doc[order[0]].get_date() if len(order) > 0 else None
+
+    @_synchronized
+    def max_date(self):
+        """
+        Return the date of the newest document
+        :return: the date, None if no document has a date
+        :rtype: datetime | str | None
+        """
+        order = self.facets.date_order
+        return self.id2doc[order[-1]].get_date() if len(order) > 0 else None
 
     def is_same(self, name, document_count):
         """
@@ -247,22 +658,20 @@ class Corpus:
         """
         return self.name == name and self.ndoc == document_count
 
+    @_synchronized
     def concorde(self, keyword, context_size):
         """
         Return a dataframe with three column, left context of len <context_size>, the keyword, right context of len <context_size>
-        :param keyword: the keyword to match
+        (contexts are cut at the bounds of the document of each match)
+        :param keyword: the keyword to match, several words are matched as an exact phrase
         :type keyword: str
         :param context_size: the size (in word) of context
         :type context_size: int
         :return: the dataframe
         :rtype DataFrame
         """
-        regex = r"(\w+)\W+" * context_size + f"({keyword})" + r"\W+(\w+)" * context_size
-        matches = re.findall(regex, self.unique_chain.lower())
-
-        list_of_dict = [dict(left=" ".join(match[0:context_size]), pattern=match[context_size], right=" ".join(match[context_size + 1:])) for match in matches]
-
-        return pd.DataFrame(list_of_dict)
+        terms = PositionalIndex.WORD.findall(keyword)
+        return pd.DataFrame(self.positional_index.concordance(terms, context_size), columns=["left", "pattern", "right"])
 
     def search(self, keyword):
         """
@@ -274,6 +683,7 @@ class Corpus:
         """
         return self.concorde(keyword, 2)[['left', 'pattern', 'right']].apply(lambda row: ' '.join(row.values.astype(str)), axis=1).tolist()
 
+    @_synchronized
     def stats(self, top_count):
         """
         Print some statistic about the corpus. The total number of unique word and the <top_count> most frequent words
@@ -282,36 +692,206 @@ class Corpus:
         :return: None
         """
         print(f"Number of words: {len(self.vocab)}\n")
-        print(
-            *list(map(
-                lambda tp: tp[0],
-                sorted(
-                    self.vocab.items(),
-                    key=lambda row: row[1]["freq"],
-                    reverse=True
-                )[0:top_count]
-            )),
-            sep="\n"
-        )
+        print(*self.vocab.get_terms()[np.argsort(-self.vocab.freq, kind="stable")[0:top_count]], sep="\n")
 
-    def sort_by_score(self, keywords, max_count=5):
+    @_synchronized
+    def sort_by_score(self, keywords, max_count=5, author=None, start=None, end=None, source=None):
         """
-        Return <max_count> sorted document by keywords match
+        Return <max_count> sorted document by keywords match.
+        Keywords can be a boolean query (AND, OR, NOT, "exact phrase", parentheses), only the documents that match the
+        query are ranked, with the words that are not negated.
+        The filters are applied before the ranking, so <max_count> documents are returned if enough documents match them.
+        The results are cached (see results) until the next load.
         :param keywords: the string to match with document
         :type keywords: str
         :param max_count: the document count to return
         :type max_count: int
+        :param author: the name of the author (or co-author) of the documents, None for any author
+        :type author: str
+        :param start: the first date of the documents, None for no lower bound
+        :type start: datetime | date | str
+        :param end: the last date of the documents (a day without time is included as a whole), None for no upper bound
+        :type end: datetime | date | str
+        :param source: the type of the documents, can be None | "reddit" | "arxiv"
+        :type source: str
         :return: the sorted by score list of document
         :rtype: list[Document]
+        :raise ValueError
+        """
+        key = self._result_key(keywords, max_count, author, start, end, source)
+        ids = self.results.get(key) if key is not None else None
+        if ids is None:
+            ids = self._rank(keywords, max_count, author, start, end, source)
+            if key is not None:
+                self.results.put(key, ids, ids.nbytes + sys.getsizeof(key))
+        return [self.id2doc[i] for i in ids]
+
+    def _result_key(self, keywords, max_count, author, start, end, source):
         """
-        words = split_string(clean_text(keywords))
-        vector = np.array([1 if k in words else 0 for k in self.vocab.keys()])
-        if np.count_nonzero(vector) < 1:
+        Return the key of the results of a search: the normalised query (the set of words, or the parsed boolean
+        query), the document count and the filters
+        :return: the key, None if the query can not be parsed
+        :rtype: tuple | None
+        """
+        if query.is_boolean(keywords):
+            try:
+                words = repr(query.parse(keywords))
+            except ValueError:
+                return None
+        else:
+            words = tuple(sorted(set(self.tokenizer.tokens(keywords))))
+        return words, max_count, author, *(None if date is None else str(date) for date in (start, end)), source
+
+    def _rank(self, keywords, max_count, author, start, end, source):
+        """
+        Return the ids of the <max_count> documents that best match keywords, among the documents that match the filters
+        (see sort_by_score)
+        :return: the document ids, best first
+        :rtype: ndarray
+        """
+        none = np.empty(0, dtype=np.int64)
+        rows = self.filter_rows(author, start, end, source)
+        if rows is not None and len(rows) < 1:
+            print("No document match the filters", file=sys.stderr)
+            return none
+
+        matched = False
+        if query.is_boolean(keywords):
+            try:
+                root = query.parse(keywords)
+            except ValueError as error:
+                print(f"Invalid query {keywords}: {error}", file=sys.stderr)
+                return none
+            found = root.evaluate(self.positional_index, self.ndoc)
+            rows = found if rows is None else query.intersect(rows, found)
+            if len(rows) < 1:
+                print("No document match the query", file=sys.stderr)
+                return none
+            matched = True
+            keywords = " ".join(root.words())
+
+        term_ids = [self.vocab.get_id(word) for word in self.tokenizer.tokens(keywords) if word in self.vocab]
+        if len(term_ids) < 1 and not matched:
             print("None of the key words provide match this corpus vocabulary", file=sys.stderr)
-            return []
+            return none
         else:
-            scores = np.array([(np.dot(vector, col.toarray().T) / (numpy.linalg.norm(vector) * numpy.linalg.norm(col.toarray())))[0] for col in self.mat_TFxIDF])
-            return np.array(list(self.id2doc.values()))[np.argsort(scores)[::-1]][0:max_count]
+            ids, _ = self.engine.search(term_ids, max_count, rows)
+            return ids
+
+    @_synchronized
+    def filter_rows(self, author=None, start=None, end=None, source=None):
+        """
+        Return the sorted ids of the documents that match the filters (from the facet index, no document is read)
+        :param author: the name of the author (or co-author) of the documents, None for any author
+        :type author: str
+        :param start: the first date of the documents, None for no lower bound
+        :type start: datetime | date | str
+        :param end: the last date of the documents (a day without time is included as a whole), None for no upper bound
+        :type end: datetime | date | str
+        :param source: the type of the documents, can be None | "reddit" | "arxiv"
+        :type source: str
+        :return: the document ids, None if there is no filter
+        :rtype: ndarray | None
+        :raise ValueError
+        """
+        parts = []
+        if source is not None:
+            parts.append(self.facets.rows("type", source))
+        if author is not None:
+            parts.append(self.facets.rows("author", author))
+        if start is not None or end is not None:
+            parts.append(self.facets.between(start, end))
+        if len(parts) == 0:
+            return None
+
+        rows = None
+        for ids in sorted(parts, key=len):
+            rows = ids if rows is None else query.intersect(rows, ids)
+        return rows
+
+    @_synchronized
+    def term_means(self, kind="tf", terms=None, facet=None):
+        """
+        Return the mean value of each word over the documents (cached until the next load)
+        :param kind: the matrix to average, can be "tf" | "tfidf"
+        :type kind: str
+        :param terms: the words to return, aligned with this list (0 for unknown words), None for all words ordered by id
+        :type terms: list[str]
+        :param facet: the facet and value of the documents to average, as ("type", "reddit"), None for all documents
+        :type facet: (str, str)
+        :return: the mean of each word
+        :rtype: ndarray
+        """
+        def compute():
+            matrix = self._matrix(kind) if facet is None else self.facet_matrix(kind, facet)
+            return np.asarray(matrix.sum(axis=0), dtype=float).ravel() / max(matrix.shape[0], 1)
+
+        means = self._cached(f"means_{kind}_{facet}", compute)
+        if terms is None:
+            return means
+        ids = np.array([self.vocab.get_id(term) for term in terms], dtype=np.int64)
+        return np.where(ids >= 0, means[ids], 0.0) if len(ids) > 0 else np.zeros(0)
+
+    @_synchronized
+    def top_terms(self, kind="tf", count=10, facet=None):
+        """
+        Return the ids of the <count> words with the highest mean value, best first (the ranking is cached until the next load)
+        :param kind: the matrix to average, can be "tf" | "tfidf"
+        :type kind: str
+        :param count: the number of word to return
+        :type count: int
+        :param facet: the facet and value of the documents to average, as ("type", "reddit"), None for all documents
+        :type facet: (str, str)
+        :return: the word ids
+        :rtype: ndarray
+        """
+        ranking = self._cached(f"ranking_{kind}_{facet}", lambda: np.argsort(-self.term_means(kind, facet=facet), kind="stable"))
+        return ranking[0:count]
+
+    @_synchronized
+    def facet_matrix(self, kind, facet):
+        """
+        Return the rows of the matrix of kind that belong to a facet (cached until the next load)
+        :param kind: can be "tf" | "tfidf"
+        :type kind: str
+        :param facet: the facet and value of the documents, as ("type", "reddit") | ("author", <name>) | ("month", "YYYY-MM")
+        :type facet: (str, str)
+        :return: the rows of the documents of the facet, in corpus order
+        :rtype: csr_matrix
+        :raise ValueError
+        """
+        return self._cached(f"facet_{kind}_{facet}", lambda: self._matrix(kind)[self.facets.rows(*facet)])
+
+    def _matrix(self, kind):
+        """
+        Return the matrix of kind
+        :param kind: can be "tf" | "tfidf"
+        :type kind: str
+        :return: mat_TF or mat_TFxIDF
+        :rtype: csr_matrix
+        :raise ValueError
+        """
+        if kind == "tf":
+            return self.mat_TF
+        if kind == "tfidf":
+            return self.mat_TFxIDF
+        raise ValueError(f"Unknown matrix {kind}, expected tf or tfidf")
+
+    @_synchronized
+    def search_many(self, queries, k=5):
+        """
+        Return the <k> best document ids and their scores for each query, all queries are scored together
+        :param queries: the strings to match with documents
+        :type queries: list[str]
+        :param k: the document count to return per query
+        :type k: int
+        :return: the document ids and their scores of each query, best first (empty arrays if no word of the query is known)
+        :rtype: list[(ndarray, ndarray)]
+        """
+        queries = [[self.vocab.get_id(word) for word in self.tokenizer.tokens(query) if word in self.vocab] for query in queries]
+        ids, scores = self.engine.search_many(queries, k)
+        empty = (np.empty(0, dtype=np.int64), np.empty(0))
+        return [(ids[i], scores[i]) if len(term_ids) > 0 else empty for i, term_ids in enumerate(queries)]
 
     def __str__(self):
         return f"Corpus({self.name}, documents={self.ndoc}, authors={self.naut})"
@@ -0,0 +1,185 @@
+"""
+    SQLite storage of the documents of a corpus (<corpus name>.db next to the csv), used instead of the csv when
+    config.STORAGE is "sqlite". Documents are only appended, in corpus order, so the first rows of the table are always
+    the first documents of the corpus.
+"""
+
+import os
+import sqlite3
+import threading
+from contextlib import closing
+
+import pandas as pd
+
+from src.model.document import RedditDocument, ArxivDocument
+from src.utility import config
+from src.utility.utils import stringify_list_to_list
+
+LIST_SEP = "\x1f"
+COLUMNS = ("type", "title", "author", "date", "url", "text", "comment_count", "fullname", "co_authors", "api_index")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    id INTEGER PRIMARY KEY,
+    type TEXT NOT NULL,
+    title TEXT,
+    author TEXT,
+    date TEXT,
+    url TEXT,
+    text TEXT,
+    comment_count INTEGER,
+    fullname TEXT,
+    co_authors TEXT,
+    api_index INTEGER
+);
+CREATE INDEX IF NOT EXISTS documents_type ON documents (type);
+CREATE INDEX IF NOT EXISTS documents_api_index ON documents (type, api_index);
+CREATE INDEX IF NOT EXISTS documents_fullname ON documents (fullname);
+CREATE INDEX IF NOT EXISTS documents_date ON documents (date);
+"""
+
+
+class CorpusDatabase:
+    """
+    A class used to read and append the documents of a corpus into a SQLite database
+
+    Attributes
+    ----------
+    path : Path
+        the path to the database file
+
+    Methods
+    -------
+    count()
+        Return the number of document in the database
+    read(count, offset=0)
+        Return <count> documents, in corpus order, starting at <offset>
+    append(documents)
+        Add documents at the end of the database
+    resume_offsets()
+        Return the offsets to resume the queries after the documents of the database
+    migrate(csv_path)
+        Create the database from the documents of a corpus csv (read chunk by chunk)
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+    def _connect(self):
+        """
+        Return a connection to the database, the table is created if it is missing
+        :return: the connection
+        :rtype: sqlite3.Connection
+        """
+        connection = sqlite3.connect(self.path)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        connection.executescript(SCHEMA)
+        return connection
+
+    def count(self):
+        """
+        Return the number of document in the database
+        :return: the number of document
+        :rtype: int
+        """
+        with closing(self._connect()) as connection:
+            return connection.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
+
+    def read(self, count, offset=0):
+        """
+        Return <count> documents, in corpus order, starting at <offset> (only these rows are read)
+        :param count: the amount of document to read
+        :type count: int
+        :param offset: the index of the first document
+        :type offset: int
+        :return: the documents
+        :rtype: list[RedditDocument | ArxivDocument]
+        """
+        with closing(self._connect()) as connection:
+            rows = connection.execute(f"SELECT {', '.join(COLUMNS)} FROM documents ORDER BY id LIMIT ? OFFSET ?", (count, offset)).fetchall()
+
+        documents = []
+        for row in rows:
+            values = dict(zip(COLUMNS, row))
+            if values.pop("type") == "reddit":
+                documents.append(RedditDocument(**values))
+            else:
+                values["co_authors"] = values["co_authors"].split(LIST_SEP) if values["co_authors"] else []
+                documents.append(ArxivDocument(**values))
+        return documents
+
+    def append(self, documents):
+        """
+        Add documents at the end of the database, in one transaction
+        :param documents: the documents to add
+        :type documents: list[Document]
+        """
+        rows = []
+        for doc in documents:
+            reddit = doc.get_type() == "reddit"
+            rows.append((
+                doc.get_type(), doc.get_title(), doc.get_author(), None if doc.get_date() is None else str(doc.get_date()), doc.get_url(), doc.get_text(),
+                doc.get_comment_count() if reddit else None,
+                doc.get_fullname() if reddit else None,
+                None if reddit else LIST_SEP.join(doc.get_co_authors()),
+                None if reddit else doc.get_api_index(),
+            ))
+
+        with closing(self._connect()) as connection:
+            with connection:
+                connection.executemany(f"INSERT INTO documents ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))})", rows)
+            # The main file is updated at once, so his size and modification time tell the snapshots it changed
+            connection.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+    def resume_offsets(self):
+        """
+        Return the offsets to resume the queries after the documents of the database (read from the indexes)
+        :return: the name of the last reddit document and the highest api index of arxiv documents
+        :rtype: (str, int)
+        """
+        with closing(self._connect()) as connection:
+            reddit = connection.execute("SELECT fullname FROM documents WHERE type = 'reddit' ORDER BY id DESC LIMIT 1").fetchone()
+            arxiv = connection.execute("SELECT MAX(api_index) FROM documents WHERE type = 'arxiv'").fetchone()
+        return reddit[0] if reddit else "", arxiv[0] or 0
+
+    def migrate(self, csv_path):
+        """
+        Create the database from the documents of a corpus csv, replacing it. The documents are written into a
+        temporary database that replaces this one once all chunks are written, so an interrupted migration leaves no
+        database (and is done again on the next load)
+        :param csv_path: the path to the corpus csv
+        :type csv_path: Path
+        :return: the number of migrated document
+        :rtype: int
+        """
+        temporary = CorpusDatabase(self.path.with_name(f"{self.path.name}.{os.getpid()}.{threading.get_ident()}.tmp"))
+        migrated = 0
+        try:
+            with pd.read_csv(csv_path, sep=config.CSV_SEP, index_col=0, converters={"co_authors": stringify_list_to_list},
+                             chunksize=config.LOAD_CHUNK_SIZE) as reader:
+                for df in reader:
+                    temporary.append([RedditDocument(**kwargs) if kwargs["type"] == "reddit" else ArxivDocument(**kwargs) for kwargs in df.to_dict(orient="records")])
+                    migrated += len(df)
+            if migrated == 0:
+                # An empty csv still gives a database, with the table only
+                temporary.count()
+            os.replace(temporary.path, self.path)
+        finally:
+            for suffix in ("", "-wal", "-shm"):
+                temporary.path.with_name(temporary.path.name + suffix).unlink(missing_ok=True)
+        return migrated
+
+    def __str__(self):
+        return f"CorpusDatabase({self.path})"
+
+    def __repr__(self):
+        return self.__str__()
+
+
+if __name__ == "__main__":
+    # Migration of all the corpus csv of the data folder
+    for path in sorted(config.DATA_FOLDER.glob("*.csv")):
+        database = CorpusDatabase(path.with_suffix(".db"))
+        if database.count() == 0:
+            print(f"{path.name}: {database.migrate(path)} documents migrated")
@@ -40,6 +40,8 @@ class Document:
         Return a ArxivDocument from arxiv api query
     """
 
+    __slots__ = ("title", "author", "date", "url", "text")
+
     def __init__(self, **kwargs):
         self.title = kwargs["title"]
         self.author = kwargs["author"]
@@ -95,7 +97,7 @@ class Document:
         return self.text
 
     def __str__(self):
-        return f"Document({self.title}, source={self.get_type()})"
+        return f"Document({self.get_title()}, source={self.get_type()})"
 
     def __repr__(self) -> str:
         return self.__str__()
@@ -104,37 +106,37 @@ class Document:
     def from_reddit(post):
         """
         Return a RedditDocument from reddit api query
-        :param post: the result of praw request
+        :param post: the record of a post, see DataQuery.reddit_record
+        :type post: dict
         :return: a document
         :rtype: RedditDocument
         """
         return RedditDocument(
-            title=string_preprocessing(post.title),
-            author=post.author_flair_text if post.author_flair_text else "Unknown",
-            date=datetime.utcfromtimestamp(post.created_utc),
-            url=post.url,
-            text=string_preprocessing(post.selftext),
-            comment_count=len(post.comments),
-            fullname=post.name
+            title=string_preprocessing(post["title"]),
+            author=post["author_flair_text"] if post["author_flair_text"] else "Unknown",
+            date=datetime.utcfromtimestamp(post["created_utc"]),
+            url=post["url"],
+            text=string_preprocessing(post["selftext"]),
+            comment_count=post["comment_count"],
+            fullname=post["name"]
         )
 
     @staticmethod
     def from_arxiv(post):
         """
         Return a ArxivDocument from arxiv api query
-        :param post: the result of arxiv request
+        :param post: the record of an arxiv entry, see atom.read_entries
+        :type post: ArxivEntry
         :return: a document
         :rtype: ArxivDocument
         """
-        title = string_preprocessing(post["title"]) if "title" in post else "Empty"
-        author = post["author"][0]["name"] if type(post["author"]) is list else post["author"]["name"]
-        date = datetime.strptime(post["published"], "%Y-%m-%dT%H:%M:%SZ") if "published" in post else None
-        url = post["id"] if "id" in post else "Empty"
-        text = string_preprocessing(post["summary"] or "None") if "summary" in post else "Empty"
-        co_authors = list(map(lambda aut: aut["name"], post["author"][1:])) if type(post["author"]) is list else []
-        api_index = post["api_index"] if "api_index" in post else 0
-        return ArxivDocument(title=title, author=author, date=date, url=url, text=text, co_authors=co_authors,
-                             api_index=api_index)
+        title = string_preprocessing(post.title) if post.title is not None else "Empty"
+        author = post.authors[0] if post.authors else "Unknown"
+        date = datetime.strptime(post.published, "%Y-%m-%dT%H:%M:%SZ") if post.published else None
+        url = post.id if post.id is not None else "Empty"
+        text = string_preprocessing(post.summary or "None") if post.summary is not None else "Empty"
+        return ArxivDocument(title=title, author=author, date=date, url=url, text=text, co_authors=post.authors[1:],
+                             api_index=post.api_index)
 
 
 class RedditDocument(Document):
@@ -157,6 +159,8 @@ class RedditDocument(Document):
     get_fullname()
         Return the fullname of this post
     """
+    __slots__ = ("comment_count", "fullname")
+
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
 
@@ -208,6 +212,8 @@ class ArxivDocument(Document):
     get_api_index()
         Return the index of the document in arxiv api
     """
+    __slots__ = ("co_authors", "api_index")
+
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
 
@@ -0,0 +1,302 @@
+from collections.abc import Mapping
+
+import numpy as np
+
+from src.model import snapshot
+from src.model.document import RedditDocument, ArxivDocument
+from src.model.facet import to_datetime64
+
+
+class StringColumn:
+    """
+    A class used to read a column of string stored as one utf-8 buffer and the offsets of each string into it
+    (strings are decoded when they are read)
+
+    Attributes
+    ----------
+    buffer : ndarray
+        the utf-8 bytes of all strings
+    offsets : ndarray
+        the offset of each string into buffer (string count + 1 values)
+    """
+
+    def __init__(self, buffer, offsets):
+        self.buffer = buffer
+        self.offsets = offsets
+
+    def __getitem__(self, index):
+        return self.buffer[self.offsets[index]:self.offsets[index + 1]].tobytes().decode("utf-8")
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __iter__(self):
+        return iter(snapshot.decode_strings(self.buffer, self.offsets))
+
+
+def _int(value):
+    """
+    Return value as an int (0 for a missing value)
+    :param value: the value
+    :type value: Any
+    :return: the int
+    :rtype: int
+    """
+    return 0 if value is None or value != value else int(value)
+
+
+def _string(value):
+    """
+    Return value as a string ("" for a missing value)
+    :param value: the value
+    :type value: Any
+    :return: the string
+    :rtype: str
+    """
+    return "" if value is None or value != value else str(value)
+
+
+class DocumentStore(Mapping):
+    """
+    A class used to keep the documents of a corpus in columns (parallel arrays), documents are read through
+    lightweight views created on demand. The store is a mapping from document id (row) to document.
+
+    Attributes
+    ----------
+    types : ndarray
+        the type code of each document (index into TYPES)
+    dates : ndarray
+        the date of each document, as seconds since epoch (NAT for a document without date)
+    comment_counts : ndarray
+        the comment count of each reddit document (0 for arxiv documents)
+    api_indexes : ndarray
+        the arxiv api index of each arxiv document (0 for reddit documents)
+    strings : dict[str, (ndarray, ndarray)]
+        the utf-8 buffer and the offsets of each string column (see STRING_COLUMNS)
+
+    Methods
+    -------
+    append(documents)
+        Add documents to the store
+    column(name)
+        Return a string column
+    get_type(row)
+        Return the type of the document at row
+    arrays()
+        Return the columns as arrays, the inverse of from_arrays
+    from_arrays(arrays)
+        Return a store of the columns returned by arrays
+    to_dict()
+        Return the columns as lists, in the layout of the corpus csv
+    """
+
+    TYPES = ("reddit", "arxiv")
+    STRING_COLUMNS = ("title", "author", "url", "text", "fullname", "co_authors")
+    LIST_SEP = "\x1f"
+    NAT = np.iinfo(np.int64).min
+
+    def __init__(self):
+        self.types = np.zeros(0, dtype=np.int8)
+        self.dates = np.zeros(0, dtype=np.int64)
+        self.comment_counts = np.zeros(0, dtype=np.int64)
+        self.api_indexes = np.zeros(0, dtype=np.int64)
+        self.strings = {name: (np.zeros(0, dtype=np.uint8), np.zeros(1, dtype=np.int64)) for name in self.STRING_COLUMNS}
+
+    def append(self, documents):
+        """
+        Add documents to the store (their values are copied into the columns)
+        :param documents: the documents to add
+        :type documents: list[Document]
+        :return: the ids of the added documents
+        :rtype: range
+        """
+        start = len(self)
+        types = [self.TYPES.index(doc.get_type()) for doc in documents]
+        reddit = [doc.get_type() == "reddit" for doc in documents]
+
+        self.types = np.concatenate([self.types, np.array(types, dtype=np.int8)])
+        self.dates = np.concatenate([self.dates, to_datetime64([doc.get_date() for doc in documents]).astype(np.int64)])
+        self.comment_counts = np.concatenate([self.comment_counts, np.array(
+            [_int(doc.get_comment_count()) if is_reddit else 0 for doc, is_reddit in zip(documents, reddit)], dtype=np.int64)])
+        self.api_indexes = np.concatenate([self.api_indexes, np.array(
+            [0 if is_reddit else _int(doc.get_api_index()) for doc, is_reddit in zip(documents, reddit)], dtype=np.int64)])
+
+        values = {
+            "title": [_string(doc.get_title()) for doc in documents],
+            "author": [_string(doc.get_author()) for doc in documents],
+            "url": [_string(doc.get_url()) for doc in documents],
+            "text": [_string(doc.get_text()) for doc in documents],
+            "fullname": [_string(doc.get_fullname()) if is_reddit else "" for doc, is_reddit in zip(documents, reddit)],
+            "co_authors": [
+                "" if is_reddit else self.LIST_SEP.join(map(str, doc.get_co_authors())) for doc, is_reddit in zip(documents, reddit)
+            ],
+        }
+        for name, strings in values.items():
+            buffer, offsets = self.strings[name]
+            added, added_offsets = snapshot.encode_strings(strings)
+            self.strings[name] = (np.concatenate([buffer, added]), np.concatenate([offsets, added_offsets[1:] + offsets[-1]]))
+
+        return range(start, len(self))
+
+    def column(self, name):
+        """
+        Return a string column
+        :param name: the name of the column, see STRING_COLUMNS
+        :type name: str
+        :return: the column
+        :rtype: StringColumn
+        :raise KeyError
+        """
+        return StringColumn(*self.strings[name])
+
+    def get_type(self, row):
+        """
+        Return the type of the document at row
+        :param row: the id of the document
+        :type row: int
+        :return: "reddit" | "arxiv"
+        :rtype: str
+        """
+        return self.TYPES[self.types[row]]
+
+    def arrays(self):
+        """
+        Return the columns as arrays, the inverse of from_arrays
+        :return: the arrays by name
+        :rtype: dict[str, ndarray]
+        """
+        arrays = dict(type=self.types, date=self.dates, comment_count=self.comment_counts, api_index=self.api_indexes)
+        for name, (buffer, offsets) in self.strings.items():
+            arrays[name], arrays[f"{name}_offsets"] = buffer, offsets
+        return arrays
+
+    @staticmethod
+    def from_arrays(arrays):
+        """
+        Return a store of the columns returned by arrays (the arrays are used as they are, they can be memory-mapped)
+        :param arrays: the arrays by name
+        :type arrays: dict[str, ndarray]
+        :return: the store
+        :rtype: DocumentStore
+        :raise KeyError
+        """
+        store = DocumentStore()
+        store.types = arrays["type"]
+        store.dates = arrays["date"]
+        store.comment_counts = arrays["comment_count"]
+        store.api_indexes = arrays["api_index"]
+        store.strings = {name: (arrays[name], arrays[f"{name}_offsets"]) for name in DocumentStore.STRING_COLUMNS}
+        return store
+
+    def to_dict(self):
+        """
+        Return the columns as lists, in the layout of the corpus csv (None for the values of the other source)
+        :return: the lists by column name
+        :rtype: dict[str, list]
+        """
+        reddit = (self.types == 0).tolist()
+        dates = [None if date == self.NAT else str(np.datetime64(date, "s").item()) for date in self.dates.tolist()]
+        co_authors = [value.split(self.LIST_SEP) if value else [] for value in self.column("co_authors")]
+        return {
+            "title": list(self.column("title")),
+            "author": list(self.column("author")),
+            "date": dates,
+            "url": list(self.column("url")),
+            "text": list(self.column("text")),
+            "comment_count": [count if is_reddit else None for count, is_reddit in zip(self.comment_counts.tolist(), reddit)],
+            "fullname": [name if is_reddit else None for name, is_reddit in zip(self.column("fullname"), reddit)],
+            "type": [self.TYPES[code] for code in self.types.tolist()],
+            "co_authors": [None if is_reddit else value for value, is_reddit in zip(co_authors, reddit)],
+            "api_index": [None if is_reddit else index for index, is_reddit in zip(self.api_indexes.tolist(), reddit)],
+        }
+
+    def __getitem__(self, row):
+        try:
+            row = int(row)
+        except (TypeError, ValueError):
+            raise KeyError(row)
+        if not 0 <= row < len(self.types):
+            raise KeyError(row)
+        return RedditView(self, row) if self.types[row] == 0 else ArxivView(self, row)
+
+    def __len__(self):
+        return len(self.types)
+
+    def __iter__(self):
+        return iter(range(len(self.types)))
+
+    def __str__(self):
+        return f"DocumentStore(documents={len(self)}, bytes={sum(array.nbytes for array in self.arrays().values())})"
+
+    def __repr__(self):
+        return self.__str__()
+
+
+class _StoredDocument:
+    """
+    The getters of a document read from a DocumentStore (the store and the row of the document are kept)
+    """
+    __slots__ = ()
+
+    def _string(self, name):
+        buffer, offsets = self._store.strings[name]
+        return buffer[offsets[self._row]:offsets[self._row + 1]].tobytes().decode("utf-8")
+
+    def get_title(self):
+        return self._string("title")
+
+    def get_author(self):
+        return self._string("author")
+
+    def get_date(self):
+        date = self._store.dates[self._row]
+        return None if date == DocumentStore.NAT else np.datetime64(int(date), "s").item()
+
+    def get_url(self):
+        return self._string("url")
+
+    def get_text(self):
+        return self._string("text")
+
+    def get_comment_count(self):
+        return int(self._store.comment_counts[self._row])
+
+    def get_fullname(self):
+        return self._string("fullname")
+
+    def get_co_authors(self):
+        value = self._string("co_authors")
+        return value.split(DocumentStore.LIST_SEP) if value else []
+
+    def get_api_index(self):
+        return int(self._store.api_indexes[self._row])
+
+    def __eq__(self, other):
+        if not isinstance(other, _StoredDocument):
+            return NotImplemented
+        return self._store is other._store and self._row == other._row
+
+    def __hash__(self):
+        return hash((id(self._store), self._row))
+
+
+class RedditView(_StoredDocument, RedditDocument):
+    """
+    A reddit document read from a DocumentStore
+    """
+    __slots__ = ("_store", "_row")
+
+    def __init__(self, store, row):
+        self._store = store
+        self._row = row
+
+
+class ArxivView(_StoredDocument, ArxivDocument):
+    """
+    An arxiv document read from a DocumentStore
+    """
+    __slots__ = ("_store", "_row")
+
+    def __init__(self, store, row):
+        self._store = store
+        self._row = row
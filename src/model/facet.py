@@ -0,0 +1,197 @@
+import numpy as np
+
+
+def to_datetime64(dates):
+    """
+    Return the dates as an array of datetime64 (seconds), the dates that can not be read are NaT
+    :param dates: the dates, as datetime or string ("YYYY-MM-DD HH:MM:SS")
+    :type dates: list[datetime | str]
+    :return: the dates
+    :rtype: ndarray
+    """
+    values = [str(date) for date in dates]
+    try:
+        return np.array(values, dtype="datetime64[s]")
+    except ValueError:
+        result = np.full(len(values), np.datetime64("NaT"), dtype="datetime64[s]")
+        for i, value in enumerate(values):
+            try:
+                result[i] = np.datetime64(value, "s")
+            except ValueError:
+                pass
+        return result
+
+
+def to_bound(date, end=False):
+    """
+    Return a date as a datetime64 (seconds) bound. A date without time (day, month or year) is a whole period: the start
+    bound is the start of the period and the end bound is the start of the next period.
+    :param date: the date, as datetime, date or string ("YYYY-MM-DD", "YYYY-MM-DD HH:MM:SS", ...)
+    :type date: datetime | date | str
+    :param end: True for an end bound
+    :type end: bool
+    :return: the bound and True if it is exclusive (an end bound of a period)
+    :rtype: (datetime64, bool)
+    :raise ValueError
+    """
+    value = np.datetime64(str(date).strip())
+    period = np.datetime_data(value.dtype)[0] in ("Y", "M", "W", "D")
+    if end and period:
+        return (value + 1).astype("datetime64[s]"), True
+    return value.astype("datetime64[s]"), False
+
+
+def _group(labels):
+    """
+    Return the sorted row indexes of each label
+    :param labels: the label of each row
+    :type labels: ndarray
+    :return: the row indexes by label
+    :rtype: dict[str, ndarray]
+    """
+    if len(labels) == 0:
+        return {}
+    order = np.argsort(labels, kind="stable")
+    values, starts = np.unique(labels[order], return_index=True)
+    return {str(value): rows for value, rows in zip(values, np.split(order, starts[1:]))}
+
+
+class FacetIndex:
+    """
+    A class used to find the rows of the documents of a sub-corpus (a source, an author or a month)
+
+    Attributes
+    ----------
+    ndoc : int
+        the number of document
+    dates : ndarray
+        the date of each document, as datetime64 (NaT if the date could not be read)
+    date_order : ndarray
+        the row indexes of the documents sorted by date (the documents without date are left out)
+    facets : dict[str, dict[str, ndarray]]
+        the sorted row indexes of each value of each facet: "type" (reddit | arxiv), "author" (the author and co-authors
+        names) and "month" (YYYY-MM)
+
+    Methods
+    -------
+    rows(facet, value)
+        Return the sorted row indexes of the documents with value for facet
+    mask(facet, value)
+        Return True for each document with value for facet
+    values(facet)
+        Return the values of facet
+    date_range(start=None, end=None)
+        Return the slice of date_order of the documents dated between start and end (included)
+    between(start=None, end=None)
+        Return the sorted row indexes of the documents dated between start and end (included)
+    """
+
+    FACETS = ("type", "author", "month")
+
+    def __init__(self, documents, authors):
+        """
+        :param documents: the documents, in row order
+        :type documents: list[Document]
+        :param authors: the authors of the documents (see Author.dict_from_documents)
+        :type authors: dict[str, Author]
+        """
+        self.ndoc = len(documents)
+        self.dates = to_datetime64([doc.get_date() for doc in documents])
+
+        # NaT are sorted last, they are left out of the sorted dates
+        self.date_order = np.argsort(self.dates, kind="stable")[0:np.count_nonzero(~np.isnat(self.dates))]
+        self._sorted_dates = self.dates[self.date_order]
+
+        rows = {doc: i for i, doc in enumerate(documents)}
+        months = self.dates.astype("datetime64[M]")
+        dated = ~np.isnat(months)
+        self.facets = {
+            "type": _group(np.array([doc.get_type() for doc in documents])),
+            "author": {
+                name: np.unique(np.array([rows[doc] for doc in author.get_documents() if doc in rows], dtype=np.int64))
+                for name, author in authors.items()
+            },
+            "month": {value: np.flatnonzero(dated)[part] for value, part in _group(months[dated].astype(str)).items()},
+        }
+
+    def rows(self, facet, value):
+        """
+        Return the sorted row indexes of the documents with value for facet
+        :param facet: can be "type" | "author" | "month"
+        :type facet: str
+        :param value: the value of the facet
+        :type value: str
+        :return: the row indexes (empty if no document has value)
+        :rtype: ndarray
+        :raise ValueError
+        """
+        if facet not in self.facets:
+            raise ValueError(f"Unknown facet {facet}, expected {' | '.join(self.FACETS)}")
+        return self.facets[facet].get(value, np.empty(0, dtype=np.int64))
+
+    def mask(self, facet, value):
+        """
+        Return True for each document with value for facet
+        :param facet: can be "type" | "author" | "month"
+        :type facet: str
+        :param value: the value of the facet
+        :type value: str
+        :return: the mask of the documents
+        :rtype: ndarray
+        :raise ValueError
+        """
+        mask = np.zeros(self.ndoc, dtype=bool)
+        mask[self.rows(facet, value)] = True
+        return mask
+
+    def values(self, facet):
+        """
+        Return the values of facet
+        :param facet: can be "type" | "author" | "month"
+        :type facet: str
+        :return: the sorted values
+        :rtype: list[str]
+        :raise ValueError
+        """
+        if facet not in self.facets:
+            raise ValueError(f"Unknown facet {facet}, expected {' | '.join(self.FACETS)}")
+        return sorted(self.facets[facet])
+
+    def date_range(self, start=None, end=None):
+        """
+        Return the slice of date_order of the documents dated between start and end (included, a day without time
+        is included as a whole), found by binary search into the sorted dates
+        :param start: the first date (None for no lower bound)
+        :type start: datetime | date | str
+        :param end: the last date (None for no upper bound)
+        :type end: datetime | date | str
+        :return: the slice
+        :rtype: slice
+        :raise ValueError
+        """
+        low = 0 if start is None else int(np.searchsorted(self._sorted_dates, to_bound(start)[0], side="left"))
+        high = len(self._sorted_dates)
+        if end is not None:
+            bound, exclusive = to_bound(end, end=True)
+            high = int(np.searchsorted(self._sorted_dates, bound, side="left" if exclusive else "right"))
+        return slice(low, max(low, high))
+
+    def between(self, start=None, end=None):
+        """
+        Return the sorted row indexes of the documents dated between start and end (included, a day without time
+        is included as a whole)
+        :param start: the first date (None for no lower bound)
+        :type start: datetime | date | str
+        :param end: the last date (None for no upper bound)
+        :type end: datetime | date | str
+        :return: the row indexes
+        :rtype: ndarray
+        :raise ValueError
+        """
+        return np.sort(self.date_order[self.date_range(start, end)])
+
+    def __str__(self):
+        return f"FacetIndex(documents={self.ndoc}, {', '.join(f'{facet}={len(values)}' for facet, values in self.facets.items())})"
+
+    def __repr__(self):
+        return self.__str__()
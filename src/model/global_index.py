@@ -0,0 +1,247 @@
+import sys
+import threading
+
+import numpy as np
+from scipy.sparse import csr_matrix
+
+from src.model.scoring import ScoringEngine
+from src.model.vocabulary import Vocabulary
+from src.model.weighting import weight
+from src.utility.tokenizer import Tokenizer, ENGLISH_STOPWORDS
+
+KINDS = ("tf", "tfidf")
+
+
+class GlobalIndex:
+    """
+    A class used to index several corpora together: their words share one vocabulary and their term frequency
+    matrices are stacked into one matrix (the rows of each corpus follow each other, in corpus order).
+    The mean of each word over each corpus is computed once, aligned on the shared vocabulary, so corpora are compared
+    without looking up their words.
+    The index is a snapshot of the corpora, it is built again when one of them changes (see is_current).
+
+    Attributes
+    ----------
+    names : list[str]
+        the names of the corpora, in row order
+    corpora : dict[str, Corpus]
+        the corpora by name
+    tokenizer : Tokenizer
+        the tokenizer that split keywords into words (the one of the first corpus)
+    vocab : Vocabulary
+        the shared vocabulary, the words of each corpus with their id, freq and document_freq over all corpora
+    columns : dict[str, ndarray]
+        the shared id of each word of a corpus, indexed by his id in the corpus vocabulary
+    offsets : ndarray
+        the first row of each corpus, followed by the row count
+    corpus_ids : ndarray
+        the index (in names) of the corpus of each row
+    document_len : ndarray
+        the number of word of each document
+    mat_TF : csr_matrix
+        the stacked term frequency matrix with shared word id as column and document as row
+    mat_TFxIDF : csr_matrix
+        the stacked matrix weighted with the document frequencies of all corpora (used by search)
+    engine : ScoringEngine
+        the engine used to rank the documents of all corpora
+    means : dict[str, ndarray]
+        the mean of each word over each corpus, one row per corpus, computed by the corpus with his own weighting
+
+    Methods
+    -------
+    is_current(corpora)
+        Return if the index was built from the current state of corpora
+    rows(name)
+        Return the rows of the corpus name
+    view(name, kind="tf")
+        Return the rows of the corpus name, sharing the values of the stacked matrix
+    rank(keywords, max_count=5)
+        Return the <max_count> best rows and their scores over all corpora
+    search(keywords, max_count=5)
+        Return <max_count> sorted document of all corpora by keywords match, with the name of their corpus
+    term_means(kind, name)
+        Return the mean of each word of the shared vocabulary over the corpus name
+    top_terms(kind, name, count=10)
+        Return the shared ids of the <count> words with the highest mean over the corpus name
+    """
+
+    def __init__(self, corpora, weighting="tf", tokenizer=None):
+        corpora = list(corpora)
+        self.names = [corpus.get_name() for corpus in corpora]
+        self.corpora = dict(zip(self.names, corpora))
+        self.vocab = Vocabulary()
+        self.columns = {}
+        self.tokenizer = tokenizer or (corpora[0].tokenizer if len(corpora) > 0 else Tokenizer(stopwords=ENGLISH_STOPWORDS))
+        self._sources = []
+        self._cache = {}
+        self._lock = threading.Lock()
+
+        parts = []
+        local_means = {kind: [] for kind in KINDS}
+        for corpus in corpora:
+            # The corpus is read at once, so a page appended during the build is not half taken
+            with corpus.lock:
+                columns = np.array([self.vocab.add(term) for term in corpus.vocab], dtype=np.int64)
+                self.columns[corpus.get_name()] = columns
+                self._sources.append(corpus.mat_TF)
+                parts.append((corpus.mat_TF, corpus.document_len))
+                for kind in KINDS:
+                    local_means[kind].append(corpus.term_means(kind))
+
+        # The rows are stacked as they are, only their column ids are translated into the shared ids
+        ndocs = np.array([matrix.shape[0] for matrix, _ in parts], dtype=np.int64)
+        nnz = np.concatenate([[0], np.cumsum([matrix.nnz for matrix, _ in parts])])
+        self.offsets = np.concatenate([[0], np.cumsum(ndocs)])
+        self.corpus_ids = np.repeat(np.arange(len(parts)), ndocs)
+        self.document_len = np.concatenate([np.asarray(length) for _, length in parts]) if parts else np.zeros(0, dtype=int)
+        self.mat_TF = csr_matrix((
+            np.concatenate([matrix.data for matrix, _ in parts]) if parts else np.zeros(0, dtype=int),
+            np.concatenate([self.columns[name][matrix.indices] for name, (matrix, _) in zip(self.names, parts)]) if parts else np.zeros(0, dtype=np.int64),
+            np.concatenate([[0], *[matrix.indptr[1:] + nnz[i] for i, (matrix, _) in enumerate(parts)]])
+        ), shape=(int(self.offsets[-1]), len(self.vocab)))
+        self.mat_TF.sort_indices()
+        self.vocab.update(self.mat_TF)
+
+        self.means = {}
+        for kind in KINDS:
+            self.means[kind] = np.zeros((len(parts), len(self.vocab)))
+            for i, means in enumerate(local_means[kind]):
+                self.means[kind][i, self.columns[self.names[i]]] = means
+
+        self.mat_TFxIDF = weight(self.mat_TF, self.vocab.document_freq, self.document_len, weighting)
+        self.engine = ScoringEngine(self.mat_TFxIDF)
+
+    def is_current(self, corpora):
+        """
+        Return if the index was built from the current state of corpora (each change of a corpus index replaces his
+        term frequency matrix)
+        :param corpora: the corpora, in the order of names
+        :type corpora: list[Corpus]
+        :return: True if no corpus changed since the build
+        :rtype: bool
+        """
+        corpora = list(corpora)
+        return [corpus.get_name() for corpus in corpora] == self.names and all(
+            corpus.mat_TF is source for corpus, source in zip(corpora, self._sources))
+
+    def _position(self, name):
+        """
+        Return the index of the corpus name in names
+        :param name: the name of the corpus
+        :type name: str
+        :return: the index of the corpus
+        :rtype: int
+        :raise KeyError
+        """
+        if name not in self.corpora:
+            raise KeyError(name)
+        return self.names.index(name)
+
+    def rows(self, name):
+        """
+        Return the rows of the corpus name in the stacked matrices (the row of a document is his id plus the start)
+        :param name: the name of the corpus
+        :type name: str
+        :return: the rows
+        :rtype: range
+        :raise KeyError
+        """
+        i = self._position(name)
+        return range(int(self.offsets[i]), int(self.offsets[i + 1]))
+
+    def view(self, name, kind="tf"):
+        """
+        Return the rows of the corpus name, with the shared word ids as columns. The values and column ids are not
+        copied, they are slices of the stacked matrix
+        :param name: the name of the corpus
+        :type name: str
+        :param kind: the matrix, can be "tf" | "tfidf"
+        :type kind: str
+        :return: the matrix of the corpus
+        :rtype: csr_matrix
+        :raise KeyError, ValueError
+        """
+        if kind not in KINDS:
+            raise ValueError(f"Unknown matrix {kind}, expected tf or tfidf")
+        matrix = self.mat_TF if kind == "tf" else self.mat_TFxIDF
+        rows = self.rows(name)
+        start, end = matrix.indptr[rows.start], matrix.indptr[rows.stop]
+        # The slices are set after the construction: the constructor copies the slices much smaller than their array
+        view = csr_matrix((len(rows), matrix.shape[1]), dtype=matrix.dtype)
+        view.data, view.indices = matrix.data[start:end], matrix.indices[start:end]
+        view.indptr = matrix.indptr[rows.start:rows.stop + 1] - start
+        return view
+
+    def rank(self, keywords, max_count=5):
+        """
+        Return the <max_count> rows that best match keywords over all corpora, scored with the document frequencies of
+        all corpora
+        :param keywords: the string to match with documents
+        :type keywords: str
+        :param max_count: the number of row to return
+        :type max_count: int
+        :return: the rows and their scores, best first (empty arrays if no word is known)
+        :rtype: (ndarray, ndarray)
+        """
+        term_ids = [self.vocab.get_id(word) for word in self.tokenizer.tokens(keywords) if word in self.vocab]
+        if len(term_ids) < 1:
+            print("None of the key words provide match the corpora vocabulary", file=sys.stderr)
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        return self.engine.search(term_ids, max_count)
+
+    def search(self, keywords, max_count=5):
+        """
+        Return <max_count> sorted document of all corpora by keywords match, with the name of their corpus
+        :param keywords: the string to match with documents
+        :type keywords: str
+        :param max_count: the document count to return
+        :type max_count: int
+        :return: the name of the corpus and the document, best first
+        :rtype: list[(str, Document)]
+        """
+        rows, _ = self.rank(keywords, max_count)
+        results = []
+        for row in rows:
+            i = self.corpus_ids[row]
+            results.append((self.names[i], self.corpora[self.names[i]].id2doc[int(row - self.offsets[i])]))
+        return results
+
+    def term_means(self, kind, name):
+        """
+        Return the mean of each word of the shared vocabulary over the corpus name (0 for the words of other corpora),
+        as computed by Corpus.term_means
+        :param kind: the matrix to average, can be "tf" | "tfidf"
+        :type kind: str
+        :param name: the name of the corpus
+        :type name: str
+        :return: the mean of each word, indexed by shared id
+        :rtype: ndarray
+        :raise KeyError
+        """
+        return self.means[kind][self._position(name)]
+
+    def top_terms(self, kind, name, count=10):
+        """
+        Return the shared ids of the <count> words with the highest mean over the corpus name, best first (the ranking is
+        computed on first use)
+        :param kind: the matrix to average, can be "tf" | "tfidf"
+        :type kind: str
+        :param name: the name of the corpus
+        :type name: str
+        :param count: the number of word to return
+        :type count: int
+        :return: the shared word ids
+        :rtype: ndarray
+        :raise KeyError
+        """
+        key = (kind, name)
+        with self._lock:
+            if key not in self._cache:
+                self._cache[key] = np.argsort(-self.term_means(kind, name), kind="stable")
+            return self._cache[key][0:count]
+
+    def __str__(self):
+        return f"GlobalIndex({', '.join(self.names)}, documents={self.mat_TF.shape[0]}, terms={len(self.vocab)})"
+
+    def __repr__(self):
+        return self.__str__()
@@ -0,0 +1,98 @@
+"""
+    Tokenisation stage of the corpus index. Documents are split in chunks, each chunk is tokenised (by a process pool if
+    more than one worker is configured) into a local vocabulary and term frequency rows, then the chunks are merged in
+    order into the corpus vocabulary, so the term ids are the same as a single threaded build.
+"""
+
+import pickle
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+
+import numpy as np
+from scipy.sparse import csr_matrix
+
+
+def tokenize_chunk(texts, tokenizer):
+    """
+    Return the local vocabulary and the term frequency rows of texts
+    :param texts: the texts to tokenize
+    :type texts: list[str]
+    :param tokenizer: the tokenizer that split texts into words
+    :type tokenizer: Tokenizer
+    :return: the words in order of first occurrence, and the indices, indptr and data of the rows (with local word ids)
+    :rtype: (list[str], ndarray, ndarray, ndarray)
+    """
+    terms = {}
+    indptr = [0]
+    indices = []
+
+    for text in texts:
+        for word in tokenizer.tokens(text):
+            indices.append(terms.setdefault(word, len(terms)))
+        indptr.append(len(indices))
+
+    rows = csr_matrix((np.ones(len(indices), dtype=int), indices, indptr), shape=(len(texts), len(terms)))
+    rows.sum_duplicates()
+    return list(terms), rows.indices, rows.indptr, rows.data
+
+
+def tokenize(texts, tokenizer, workers=1, chunk_size=256):
+    """
+    Return the tokenize_chunk result of each chunk of texts, in order
+    :param texts: the texts to tokenize
+    :type texts: list[str]
+    :param tokenizer: the tokenizer that split texts into words
+    :type tokenizer: Tokenizer
+    :param workers: the number of process used, 1 to tokenize in the current process
+    :type workers: int
+    :param chunk_size: the number of text per chunk
+    :type chunk_size: int
+    :return: the result of each chunk
+    :rtype: list[(list[str], ndarray, ndarray, ndarray)]
+    """
+    chunks = [texts[i:i + chunk_size] for i in range(0, len(texts), chunk_size)]
+
+    if workers > 1 and len(chunks) > 1:
+        try:
+            with ProcessPoolExecutor(max_workers=min(workers, len(chunks))) as executor:
+                return list(executor.map(partial(tokenize_chunk, tokenizer=tokenizer), chunks))
+        except (OSError, BrokenProcessPool, pickle.PicklingError, AttributeError, TypeError) as error:
+            # The pickling errors come from a tokenizer that can not be sent to the processes (lambda, local function, lock)
+            print(f"Could not tokenize with {workers} processes ({error}), fallback to a single process", file=sys.stderr)
+
+    return [tokenize_chunk(chunk, tokenizer) for chunk in chunks]
+
+
+def merge(vocab, chunks):
+    """
+    Return the term frequency rows of all chunks, the new words of each chunk are added to vocab in order
+    :param vocab: the vocabulary to complete
+    :type vocab: Vocabulary
+    :param chunks: the results of tokenize_chunk
+    :type chunks: list[(list[str], ndarray, ndarray, ndarray)]
+    :return: the term frequency rows, with word as column (one per word of vocab) and document as row
+    :rtype: csr_matrix
+    """
+    indptr = [np.zeros(1, dtype=np.int64)]
+    indices = []
+    data = []
+    nnz = 0
+
+    for terms, chunk_indices, chunk_indptr, chunk_data in chunks:
+        mapping = np.array([vocab.add(term) for term in terms], dtype=np.int64)
+        chunk_indices = mapping[chunk_indices]
+
+        indices.append(chunk_indices)
+        data.append(chunk_data)
+        indptr.append(chunk_indptr[1:] + nnz)
+        nnz += len(chunk_data)
+
+    rows = csr_matrix((
+        np.concatenate(data) if data else np.zeros(0, dtype=int),
+        np.concatenate(indices) if indices else np.zeros(0, dtype=np.int64),
+        np.concatenate(indptr)
+    ), shape=(sum(len(part) for part in indptr) - 1, len(vocab)))
+    rows.sort_indices()
+    return rows
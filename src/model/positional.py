@@ -0,0 +1,175 @@
+import re
+
+import numpy as np
+
+
+class PositionalIndex:
+    """
+    A class used to find the positions of words and phrases into the documents of a corpus
+
+    Attributes
+    ----------
+    texts : Sequence[str]
+        the text of each document
+    term2id : dict[str, int]
+        the dict that map each word (lower case) to his id
+    doc_ptr : ndarray
+        the index of the first token of each document (ndoc + 1 values)
+    token_terms : ndarray
+        the word id of each token, documents after documents
+    token_starts : ndarray
+        the character offset of the start of each token into his document
+    token_ends : ndarray
+        the character offset of the end of each token into his document
+    term_ptr : ndarray
+        the index of the first posting of each word (word count + 1 values)
+    post_docs : ndarray
+        the document id of each posting, postings are sorted by word, document and position
+    post_positions : ndarray
+        the token position into his document of each posting
+    post_offsets : ndarray
+        the character offset into his document of each posting
+
+    Methods
+    -------
+    postings(term)
+        Return the document ids, token positions and character offsets of term
+    documents(term)
+        Return the sorted ids of the documents that contain term
+    phrase(terms)
+        Return the global token index of the first word of each occurrence of the phrase
+    phrase_documents(terms)
+        Return the sorted ids of the documents that contain the phrase
+    concordance(terms, context_size)
+        Return the left context, the matched text and the right context of each occurrence of the phrase
+    """
+
+    WORD = re.compile(r"\w+")
+
+    def __init__(self, texts):
+        self.texts = texts
+        self.term2id = {}
+
+        doc_ptr = [0]
+        terms = []
+        starts = []
+        ends = []
+        for text in texts:
+            for match in self.WORD.finditer(text):
+                terms.append(self.term2id.setdefault(match.group().lower(), len(self.term2id)))
+                starts.append(match.start())
+                ends.append(match.end())
+            doc_ptr.append(len(terms))
+
+        self.doc_ptr = np.array(doc_ptr, dtype=np.int64)
+        self.token_terms = np.array(terms, dtype=np.int64)
+        self.token_starts = np.array(starts, dtype=np.int64)
+        self.token_ends = np.array(ends, dtype=np.int64)
+        self._token_docs = np.repeat(np.arange(len(texts)), np.diff(self.doc_ptr))
+
+        # Postings, grouped by word (the stable sort keep the document and position order)
+        self._order = np.argsort(self.token_terms, kind="stable")
+        self.term_ptr = np.concatenate([[0], np.cumsum(np.bincount(self.token_terms, minlength=len(self.term2id)))])
+        self.post_docs = self._token_docs[self._order]
+        self.post_positions = self._order - self.doc_ptr[self.post_docs]
+        self.post_offsets = self.token_starts[self._order]
+
+    def _slice(self, term):
+        """
+        Return the slice of the postings of term (empty if term is unknown)
+        :param term: the word
+        :type term: str
+        :return: the slice
+        :rtype: slice
+        """
+        index = self.term2id.get(term.lower())
+        if index is None:
+            return slice(0, 0)
+        return slice(self.term_ptr[index], self.term_ptr[index + 1])
+
+    def postings(self, term):
+        """
+        Return the document ids, token positions and character offsets of term
+        :param term: the word to find
+        :type term: str
+        :return: the document ids, token positions and character offsets of each occurrence
+        :rtype: (ndarray, ndarray, ndarray)
+        """
+        part = self._slice(term)
+        return self.post_docs[part], self.post_positions[part], self.post_offsets[part]
+
+    def documents(self, term):
+        """
+        Return the sorted ids of the documents that contain term
+        :param term: the word to find
+        :type term: str
+        :return: the document ids
+        :rtype: ndarray
+        """
+        docs = self.post_docs[self._slice(term)]
+        return docs[np.concatenate([[True], docs[1:] != docs[:-1]])] if len(docs) > 0 else docs
+
+    def phrase(self, terms):
+        """
+        Return the global token index of the first word of each occurrence of the phrase
+        :param terms: the words of the phrase
+        :type terms: list[str]
+        :return: the token indexes, sorted
+        :rtype: ndarray
+        """
+        ids = [self.term2id.get(term.lower(), -1) for term in terms]
+        if len(ids) == 0 or min(ids) < 0:
+            return np.empty(0, dtype=np.int64)
+
+        # Start from the rarest word and check the others around each of his occurrences
+        rarest = int(np.argmin([self.term_ptr[i + 1] - self.term_ptr[i] for i in ids]))
+        tokens = self._order[self.term_ptr[ids[rarest]]:self.term_ptr[ids[rarest] + 1]] - rarest
+        docs = self.post_docs[self.term_ptr[ids[rarest]]:self.term_ptr[ids[rarest] + 1]]
+
+        valid = (tokens >= self.doc_ptr[docs]) & (tokens + len(ids) <= self.doc_ptr[docs + 1])
+        tokens = tokens[valid]
+        for i, index in enumerate(ids):
+            if i != rarest:
+                tokens = tokens[self.token_terms[tokens + i] == index]
+        return np.sort(tokens)
+
+    def phrase_documents(self, terms):
+        """
+        Return the sorted ids of the documents that contain the phrase
+        :param terms: the words of the phrase
+        :type terms: list[str]
+        :return: the document ids
+        :rtype: ndarray
+        """
+        return np.unique(self._token_docs[self.phrase(terms)])
+
+    def concordance(self, terms, context_size):
+        """
+        Return the left context, the matched text and the right context of each occurrence of the phrase
+        (contexts are cut at the bounds of the document)
+        :param terms: the words of the phrase
+        :type terms: list[str]
+        :param context_size: the size (in word) of contexts
+        :type context_size: int
+        :return: a list of dict with left, pattern and right keys, as lower case
+        :rtype: list[dict[str, str]]
+        """
+        result = []
+        for token in self.phrase(terms):
+            doc = self._token_docs[token]
+            text = self.texts[doc]
+            last = token + len(terms) - 1
+            left = range(max(token - context_size, self.doc_ptr[doc]), token)
+            right = range(last + 1, min(last + 1 + context_size, self.doc_ptr[doc + 1]))
+            result.append(dict(
+                left=" ".join(text[self.token_starts[i]:self.token_ends[i]] for i in left).lower(),
+                pattern=text[self.token_starts[token]:self.token_ends[last]].lower(),
+                right=" ".join(text[self.token_starts[i]:self.token_ends[i]] for i in right).lower()
+            ))
+        return result
+
+    def __str__(self):
+        return f"PositionalIndex(documents={len(self.texts)}, terms={len(self.term2id)}, tokens={len(self.token_terms)})"
+
+    def __repr__(self):
+        return self.__str__()
@@ -0,0 +1,249 @@
+"""
+    Boolean query language executed over the sorted posting lists of a PositionalIndex.
+
+    Grammar (operators are upper case, two operands without operator are joined with AND):
+        query  := and ("OR" and)*
+        and    := not (["AND"] not)*
+        not    := "NOT" not | atom
+        atom   := word | '"' phrase '"' | "(" query ")"
+"""
+
+import re
+
+import numpy as np
+
+OPERATOR = re.compile(r'\b(?:AND|OR|NOT)\b|["()]')
+TOKEN = re.compile(r'"([^"]*)"|(\()|(\))|(\w+)')
+
+
+def is_boolean(query):
+    """
+    Return if query use the boolean query language (operators, quotes or parentheses)
+    :param query: the query
+    :type query: str
+    :return: True if query is a boolean query
+    :rtype: bool
+    """
+    return OPERATOR.search(query) is not None
+
+
+def _contains(b, a):
+    """
+    Return for each id of a if it is in b. Each id is found into b by binary search (skipping the ids in between),
+    so the cost is driven by the length of a.
+    :param b: sorted ids
+    :type b: ndarray
+    :param a: sorted ids
+    :type a: ndarray
+    :return: True for each id of a that is in b
+    :rtype: ndarray
+    """
+    positions = np.searchsorted(b, a)
+    found = positions < len(b)
+    found[found] = b[positions[found]] == a[found]
+    return found
+
+
+def intersect(a, b):
+    """
+    Return the intersection of two sorted arrays of unique ids (the shorter one is searched into the longer one)
+    :param a: sorted ids
+    :type a: ndarray
+    :param b: sorted ids
+    :type b: ndarray
+    :return: the sorted ids in both arrays
+    :rtype: ndarray
+    """
+    if len(a) > len(b):
+        a, b = b, a
+    return a[_contains(b, a)] if len(a) > 0 else a
+
+
+def difference(a, b):
+    """
+    Return the ids of a that are not in b
+    :param a: sorted ids
+    :type a: ndarray
+    :param b: sorted ids
+    :type b: ndarray
+    :return: the sorted ids of a not in b
+    :rtype: ndarray
+    """
+    return a[~_contains(b, a)] if len(a) > 0 and len(b) > 0 else a
+
+
+class Term:
+    """
+    A query node that match the documents that contain a word
+    """
+    def __init__(self, word):
+        self.word = word
+
+    def evaluate(self, index, ndoc):
+        """
+        Return the sorted ids of the documents matched by the node
+        :param index: the positional index of the corpus
+        :type index: PositionalIndex
+        :param ndoc: the number of document in the corpus
+        :type ndoc: int
+        :return: the document ids
+        :rtype: ndarray
+        """
+        return index.documents(self.word)
+
+    def words(self):
+        """
+        Return the words that must be in matched documents (used to rank them)
+        :return: the words
+        :rtype: list[str]
+        """
+        return [self.word]
+
+    def __repr__(self):
+        return f"Term({self.word})"
+
+
+class Phrase(Term):
+    """
+    A query node that match the documents that contain an exact phrase
+    """
+    def __init__(self, phrase):
+        super().__init__(phrase)
+        self.terms = re.findall(r"\w+", phrase)
+
+    def evaluate(self, index, ndoc):
+        return index.phrase_documents(self.terms)
+
+    def words(self):
+        return self.terms
+
+    def __repr__(self):
+        return f"Phrase({' '.join(self.terms)})"
+
+
+class Not:
+    """
+    A query node that match the documents not matched by his operand
+    """
+    def __init__(self, operand):
+        self.operand = operand
+
+    def evaluate(self, index, ndoc):
+        return difference(np.arange(ndoc), self.operand.evaluate(index, ndoc))
+
+    def words(self):
+        return []
+
+    def __repr__(self):
+        return f"Not({self.operand!r})"
+
+
+class And:
+    """
+    A query node that match the documents matched by all his operands
+    """
+    def __init__(self, operands):
+        self.operands = operands
+
+    def evaluate(self, index, ndoc):
+        # Negative operands are removed from the intersection of the positive ones (no complement is built)
+        positives = [operand.evaluate(index, ndoc) for operand in self.operands if not isinstance(operand, Not)]
+        negatives = [operand.operand for operand in self.operands if isinstance(operand, Not)]
+
+        result = np.arange(ndoc) if len(positives) == 0 else None
+        for ids in sorted(positives, key=len):
+            result = ids if result is None else intersect(result, ids)
+        for operand in negatives:
+            if len(result) == 0:
+                break
+            result = difference(result, operand.evaluate(index, ndoc))
+        return result
+
+    def words(self):
+        return [word for operand in self.operands for word in operand.words()]
+
+    def __repr__(self):
+        return f"And({', '.join(map(repr, self.operands))})"
+
+
+class Or(And):
+    """
+    A query node that match the documents matched by at least one of his operands
+    """
+    def evaluate(self, index, ndoc):
+        result = np.empty(0, dtype=np.int64)
+        for operand in self.operands:
+            result = np.union1d(result, operand.evaluate(index, ndoc))
+        return result
+
+    def __repr__(self):
+        return f"Or({', '.join(map(repr, self.operands))})"
+
+
+def parse(query):
+    """
+    Return the tree of query nodes of a boolean query
+    :param query: the query
+    :type query: str
+    :return: the root node
+    :rtype: Term | Phrase | Not | And | Or
+    :raise ValueError
+    """
+    tokens = []
+    for phrase, opening, closing, word in TOKEN.findall(query):
+        if opening or closing:
+            tokens.append(opening or closing)
+        elif word in ("AND", "OR", "NOT"):
+            tokens.append(word)
+        elif word:
+            tokens.append(Term(word))
+        else:
+            tokens.append(Phrase(phrase))
+
+    position = 0
+
+    def peek():
+        return tokens[position] if position < len(tokens) else None
+
+    def parse_or():
+        nonlocal position
+        operands = [parse_and()]
+        while peek() == "OR":
+            position += 1
+            operands.append(parse_and())
+        return operands[0] if len(operands) == 1 else Or(operands)
+
+    def parse_and():
+        nonlocal position
+        operands = [parse_not()]
+        while peek() not in (None, "OR", ")"):
+            if peek() == "AND":
+                position += 1
+            operands.append(parse_not())
+        return operands[0] if len(operands) == 1 else And(operands)
+
+    def parse_not():
+        nonlocal position
+        if peek() == "NOT":
+            position += 1
+            return Not(parse_not())
+        return parse_atom()
+
+    def parse_atom():
+        nonlocal position
+        token = peek()
+        position += 1
+        if token == "(":
+            node = parse_or()
+            if peek() != ")":
+                raise ValueError("Missing closing parenthesis")
+            position += 1
+            return node
+        if isinstance(token, Term):
+            return token
+        raise ValueError(f"Unexpected {token or 'end of query'}")
+
+    root = parse_or()
+    if peek() is not None:
+        raise ValueError(f"Unexpected {peek()}")
+    return root
@@ -0,0 +1,211 @@
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from src.model.corpus import Corpus
+from src.model.global_index import GlobalIndex
+
+
+class CorpusRegistry:
+    """
+    A class used to share loaded corpora between callbacks, each corpus is loaded only once even if it is requested
+    by several threads at the same time (the other threads wait for the running load, or only for its first pages)
+
+    Attributes
+    ----------
+    count : int
+        the amount of document loaded into each corpus
+    corpora : dict[str, Corpus]
+        the corpora by name
+
+    Methods
+    -------
+    get(name, partial=False)
+        Return the corpus name, loaded (wait for the load if it is running, start it if it is not)
+    warm_up(workers=None)
+        Start the load of all corpora in background threads
+    is_ready(name)
+        Return if the corpus name is loaded
+    status()
+        Return the state of each corpus, "pending" | "loading" | "partial" | "ready" | "error"
+    names()
+        Return the name of all corpora
+    global_index()
+        Return the index of all loaded corpora together, built again when a corpus changed
+    """
+
+    def __init__(self, names, count, **kwargs):
+        self.count = count
+        self.corpora = {name: Corpus(name, **kwargs) for name in names}
+        self._lock = threading.Lock()
+        self._loads = {}
+        self._errors = {}
+        self._executor = None
+        self._warmer = None
+        self._index = None
+        self._index_lock = threading.Lock()
+
+    def names(self):
+        """
+        Return the name of all corpora
+        :return: the names
+        :rtype: list[str]
+        """
+        return list(self.corpora.keys())
+
+    def get(self, name, partial=False):
+        """
+        Return the corpus name, loaded (wait for the load if it is running, start it if it is not)
+        :param name: the name of the corpus
+        :type name: str
+        :param partial: True to return the corpus as soon as documents are searchable, while the load goes on in background
+        :type partial: bool
+        :return: the loaded corpus
+        :rtype: Corpus
+        :raise KeyError
+        """
+        corpus = self.corpora[name]
+        if corpus.is_loaded():
+            return corpus
+
+        with self._lock:
+            events = self._loads.get(name)
+            owner = events is None
+            if owner:
+                events = self._loads[name] = (threading.Event(), threading.Event())
+        done, published = events
+
+        if owner and partial:
+            self._pool().submit(self._load, name, events)
+        elif owner:
+            self._load(name, events)
+        (published if partial else done).wait()
+
+        # The outcome of a load is kept under the lock before done is set, a load started since can not hide it
+        with self._lock:
+            error = self._errors.get(name) if done.is_set() else None
+        if error is not None:
+            raise error
+        return corpus
+
+    def _load(self, name, events):
+        """
+        Load the corpus name and wake up the threads waiting for it
+        :param name: the name of the corpus
+        :type name: str
+        :param events: the event set when the load is over, and the event set when the first documents are searchable
+        :type events: (threading.Event, threading.Event)
+        """
+        done, published = events
+        corpus = self.corpora[name]
+        failure = None
+        try:
+            corpus.on_publish = lambda _: published.set()
+            corpus.load(self.count)
+            # Corpus read from his csv: the index snapshot is written so the next start skip the tokenisation
+            if corpus.is_saved() and not corpus.index_saved:
+                corpus.save_index()
+        except Exception as error:
+            print(f"Could not load {name} corpus: {error}", file=sys.stderr)
+            failure = error
+        finally:
+            corpus.on_publish = None
+            with self._lock:
+                if failure is None:
+                    self._errors.pop(name, None)
+                else:
+                    # A failed load is forgotten, so the next get try again
+                    self._errors[name] = failure
+                    del self._loads[name]
+            done.set()
+            published.set()
+
+    def _pool(self):
+        """
+        Return the threads used to load corpora in background for partial gets (one per corpus, so a load never waits
+        for a thread held by a warm-up)
+        :return: the executor
+        :rtype: ThreadPoolExecutor
+        """
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=len(self.corpora), thread_name_prefix="corpus")
+            return self._executor
+
+    def warm_up(self, workers=None):
+        """
+        Start the load of all corpora in background threads. The warm-up has its own threads: a warm-up waiting for a
+        load started by a partial get must not hold the thread that load is queued for
+        :param workers: the number of thread (one per corpus if None)
+        :type workers: int
+        """
+        with self._lock:
+            if self._warmer is None:
+                self._warmer = ThreadPoolExecutor(max_workers=workers or len(self.corpora), thread_name_prefix="warm-up")
+        for name in self.corpora:
+            self._warmer.submit(self._warm, name)
+
+    def _warm(self, name):
+        """
+        Load the corpus name in background, errors are kept to be raised by get
+        :param name: the name of the corpus
+        :type name: str
+        """
+        try:
+            self.get(name)
+        except Exception:
+            pass
+
+    def global_index(self):
+        """
+        Return the index of all corpora together (wait for their load), built again when a corpus changed since the
+        last call. A corpus that could not be loaded is left out.
+        :return: the global index
+        :rtype: GlobalIndex
+        """
+        corpora = []
+        for name in self.corpora:
+            try:
+                corpora.append(self.get(name))
+            except Exception:
+                continue
+
+        with self._index_lock:
+            if self._index is None or not self._index.is_current(corpora):
+                self._index = GlobalIndex(corpora)
+            return self._index
+
+    def is_ready(self, name):
+        """
+        Return if the corpus name is loaded
+        :param name: the name of the corpus
+        :type name: str
+        :return: True if the corpus is loaded
+        :rtype: bool
+        """
+        return self.corpora[name].is_loaded()
+
+    def status(self):
+        """
+        Return the state of each corpus, "pending" | "loading" | "partial" (searchable, still loading) | "ready" | "error"
+        :return: the state of each corpus by name
+        :rtype: dict[str, str]
+        """
+        with self._lock:
+            loads = dict(self._loads)
+            errors = set(self._errors)
+        # A failed load is removed from the loads, a corpus in the loads is being loaded (again)
+        return {
+            name: "ready" if corpus.is_loaded() else
+            ("partial" if loads[name][1].is_set() else "loading") if name in loads else "error" if name in errors else "pending"
+            for name, corpus in self.corpora.items()
+        }
+
+    def __getitem__(self, name):
+        return self.get(name)
+
+    def __str__(self):
+        return f"CorpusRegistry({', '.join(f'{name}={state}' for name, state in self.status().items())})"
+
+    def __repr__(self):
+        return self.__str__()
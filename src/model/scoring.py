@@ -0,0 +1,157 @@
+import numpy as np
+from scipy.sparse import csr_matrix
+
+from src.model.weighting import l2_normalize
+
+
+class ScoringEngine:
+    """
+    A class used to rank the documents of a corpus by cosine similarity with a query
+
+    Attributes
+    ----------
+    matrix : csr_matrix
+        the document vectors, L2 normalized, with word as column and document as row
+
+    Methods
+    -------
+    query_vector(term_ids)
+        Return the L2 normalized sparse query vector of term_ids
+    score(vector)
+        Return the cosine similarity between vector and each document
+    query_matrix(queries)
+        Return the L2 normalized sparse query matrix of queries, one row per query
+    search(term_ids, k, rows=None)
+        Return the <k> best document ids and their scores for the query made of term_ids (only among rows if given)
+    search_many(queries, k)
+        Return the <k> best document ids and their scores for each query, with a single matrix product
+    top_k(scores, k)
+        Return the ids of the <k> highest scores, best first
+    top_k_many(scores, k)
+        Return the ids of the <k> highest scores of each row, best first
+    """
+
+    def __init__(self, matrix):
+        self.matrix = l2_normalize(matrix)
+
+    def query_vector(self, term_ids):
+        """
+        Return the L2 normalized sparse query vector of term_ids
+        :param term_ids: the ids of the query words (unknown words must be filtered out)
+        :type term_ids: list[int]
+        :return: the query vector, of shape (1, vocabulary size)
+        :rtype: csr_matrix
+        """
+        return self.query_matrix([term_ids])
+
+    def query_matrix(self, queries):
+        """
+        Return the L2 normalized sparse query matrix of queries, one row per query
+        :param queries: the ids of the words of each query (unknown words must be filtered out)
+        :type queries: list[list[int]]
+        :return: the query matrix, of shape (query count, vocabulary size)
+        :rtype: csr_matrix
+        """
+        rows = [np.unique(np.asarray(term_ids, dtype=np.int64)) for term_ids in queries]
+        lengths = np.array([len(row) for row in rows], dtype=np.int64)
+        indptr = np.concatenate([[0], np.cumsum(lengths)])
+        indices = np.concatenate(rows) if len(rows) > 0 else np.empty(0, dtype=np.int64)
+        data = np.repeat(1 / np.sqrt(np.maximum(lengths, 1)), lengths)
+        return csr_matrix((data, indices, indptr), shape=(len(rows), self.matrix.shape[1]))
+
+    def score(self, vector):
+        """
+        Return the cosine similarity between vector and each document
+        :param vector: the query vector
+        :type vector: csr_matrix
+        :return: the score of each document
+        :rtype: ndarray
+        """
+        return (self.matrix @ vector.T).toarray().ravel()
+
+    def search(self, term_ids, k, rows=None):
+        """
+        Return the <k> best document ids and their scores for the query made of term_ids
+        :param term_ids: the ids of the query words
+        :type term_ids: list[int]
+        :param k: the number of document to return
+        :type k: int
+        :param rows: the sorted ids of the documents to rank (None to rank all documents)
+        :type rows: ndarray
+        :return: the document ids and their scores, best first
+        :rtype: (ndarray, ndarray)
+        """
+        vector = self.query_vector(term_ids)
+        if rows is None:
+            scores = self.score(vector)
+            ids = self.top_k(scores, k)
+            return ids, scores[ids]
+
+        rows = np.asarray(rows, dtype=np.int64)
+        scores = (self.matrix[rows] @ vector.T).toarray().ravel()
+        best = self.top_k(scores, k)
+        return rows[best], scores[best]
+
+    def search_many(self, queries, k):
+        """
+        Return the <k> best document ids and their scores for each query, with a single matrix product
+        :param queries: the ids of the words of each query
+        :type queries: list[list[int]]
+        :param k: the number of document to return per query
+        :type k: int
+        :return: the document ids and their scores of each query, best first
+        :rtype: (ndarray, ndarray)
+        """
+        scores = (self.matrix @ self.query_matrix(queries).T).T.toarray()
+        ids = self.top_k_many(scores, k)
+        return ids, np.take_along_axis(scores, ids, axis=1)
+
+    @staticmethod
+    def top_k(scores, k):
+        """
+        Return the ids of the <k> highest scores, best first (ties are ordered by decreasing id, as the full sort did)
+        :param scores: the scores
+        :type scores: ndarray
+        :param k: the number of ids to return
+        :type k: int
+        :return: the ids
+        :rtype: ndarray
+        """
+        return ScoringEngine.top_k_many(np.asarray(scores)[np.newaxis, :], k)[0]
+
+    @staticmethod
+    def top_k_many(scores, k):
+        """
+        Return the ids of the <k> highest scores of each row, best first (ties are ordered by decreasing id, as the full
+        sort did)
+        :param scores: the scores, one row per query
+        :type scores: ndarray
+        :param k: the number of ids to return per row
+        :type k: int
+        :return: the ids, of shape (row count, k)
+        :rtype: ndarray
+        """
+        nrow, n = scores.shape
+        k = max(0, min(k, n))
+        if k == 0 or nrow == 0:
+            return np.empty((nrow, 0), dtype=np.int64)
+
+        if k < n:
+            # Partial selection of the k-th highest score of each row, then every id above it and the last tied ids
+            threshold = np.partition(scores, n - k, axis=1)[:, n - k, np.newaxis]
+            above = scores > threshold
+            tied = scores == threshold
+            missing = k - above.sum(axis=1, keepdims=True)
+            selected = above | (tied & (np.cumsum(tied[:, ::-1], axis=1)[:, ::-1] <= missing))
+            candidates = np.nonzero(selected)[1].reshape(nrow, k)
+        else:
+            candidates = np.tile(np.arange(n), (nrow, 1))
+
+        order = np.lexsort((-candidates, -np.take_along_axis(scores, candidates, axis=1)), axis=-1)
+        return np.take_along_axis(candidates, order, axis=1)
+
+    def __str__(self):
+        return f"ScoringEngine(documents={self.matrix.shape[0]}, terms={self.matrix.shape[1]})"
+
+    def __repr__(self):
+        return self.__str__()
@@ -0,0 +1,136 @@
+"""
+    Versioned binary snapshot of a corpus index, stored next to the corpus csv (<corpus name>.idx folder).
+    Each array is saved as a .npy file so it can be memory-mapped, the meta.json file hold the version and the
+    size and modification time of the csv the snapshot was built from.
+"""
+
+import json
+import os
+import shutil
+import threading
+
+import numpy as np
+
+VERSION = 3
+META_FILE = "meta.json"
+
+
+def snapshot_path(file_path):
+    """
+    Return the snapshot folder of a corpus file
+    :param file_path: the path to the saved corpus
+    :type file_path: Path
+    :return: the path to the snapshot folder
+    :rtype: Path
+    """
+    return file_path.with_suffix(".idx")
+
+
+def source_stamp(file_path):
+    """
+    Return the size and modification time of a file, used to know if a snapshot is fresh
+    :param file_path: the path of the file
+    :type file_path: Path
+    :return: the stamp of the file
+    :rtype: dict[str, int]
+    """
+    stat = os.stat(file_path)
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def encode_strings(strings):
+    """
+    Return a list of string as one utf-8 buffer and the offsets of each string into it
+    :param strings: the strings to encode
+    :type strings: list[str]
+    :return: the buffer and the offsets (len(strings) + 1 values)
+    :rtype: (ndarray, ndarray)
+    """
+    encoded = [string.encode("utf-8") for string in strings]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(string) for string in encoded], out=offsets[1:])
+    return np.frombuffer(b"".join(encoded), dtype=np.uint8), offsets
+
+
+def decode_strings(buffer, offsets):
+    """
+    Return the list of string encoded by encode_strings
+    :param buffer: the utf-8 buffer
+    :type buffer: ndarray
+    :param offsets: the offsets of each string into the buffer
+    :type offsets: ndarray
+    :return: the strings
+    :rtype: list[str]
+    """
+    raw = buffer.tobytes()
+    bounds = offsets.tolist()
+    return [raw[bounds[i]:bounds[i + 1]].decode("utf-8") for i in range(len(bounds) - 1)]
+
+
+def _load_array(path):
+    """
+    Return the memory-mapped array saved at path (empty arrays can not be mapped and are read)
+    :param path: the path of the .npy file
+    :type path: Path
+    :return: the array
+    :rtype: ndarray
+    """
+    try:
+        return np.load(path, mmap_mode="r", allow_pickle=False)
+    except ValueError:
+        return np.load(path, allow_pickle=False)
+
+
+def write(folder, source_path, arrays, **meta):
+    """
+    Write a snapshot, replacing the previous one (each writer has his own temporary folder, so processes or threads
+    writing the same snapshot at the same time do not mix their files)
+    :param folder: the snapshot folder
+    :type folder: Path
+    :param source_path: the file the snapshot is built from
+    :type source_path: Path
+    :param arrays: the arrays to save
+    :type arrays: dict[str, ndarray]
+    :param meta: extra values saved into meta.json
+    """
+    tmp_folder = folder.with_name(f"{folder.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    shutil.rmtree(tmp_folder, ignore_errors=True)
+    os.makedirs(tmp_folder)
+
+    for key, array in arrays.items():
+        np.save(tmp_folder.joinpath(f"{key}.npy"), np.ascontiguousarray(array), allow_pickle=False)
+
+    with open(tmp_folder.joinpath(META_FILE), "w") as file:
+        json.dump(dict(meta, version=VERSION, source=source_stamp(source_path), arrays=list(arrays.keys())), file)
+
+    shutil.rmtree(folder, ignore_errors=True)
+    try:
+        os.replace(tmp_folder, folder)
+    except OSError:
+        # Another writer replaced the snapshot in the meantime, his snapshot is kept
+        shutil.rmtree(tmp_folder, ignore_errors=True)
+
+
+def read(folder, source_path, **expected):
+    """
+    Return the memory-mapped arrays and the meta of a snapshot, or None if the snapshot is missing or stale
+    :param folder: the snapshot folder
+    :type folder: Path
+    :param source_path: the file the snapshot must be built from
+    :type source_path: Path
+    :param expected: meta values the snapshot must match
+    :return: the arrays and the meta
+    :rtype: (dict[str, ndarray], dict) | None
+    """
+    try:
+        with open(folder.joinpath(META_FILE)) as file:
+            meta = json.load(file)
+        if meta["version"] != VERSION or meta["source"] != source_stamp(source_path):
+            return None
+        if any(meta.get(key) != value for key, value in expected.items()):
+            return None
+        arrays = {key: _load_array(folder.joinpath(f"{key}.npy")) for key in meta["arrays"]}
+    except (OSError, ValueError, KeyError):
+        return None
+
+    return arrays, meta
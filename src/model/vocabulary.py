@@ -0,0 +1,148 @@
+import numpy as np
+
+
+class Vocabulary:
+    """
+    A class used to represent the vocabulary of a corpus, stored as columns
+
+    Attributes
+    ----------
+    term2id : dict[str, int]
+        the dict that map each unique word of the corpus to his column id
+    id2term : ndarray
+        the array of words, indexed by column id
+    freq : ndarray
+        the total occurrence of each word in the corpus, indexed by column id
+    document_freq : ndarray
+        the number of document that contain each word, indexed by column id
+
+    Methods
+    -------
+    add(term)
+        Return the id of term, registering it if it is unknown
+    get_id(term, default=-1)
+        Return the id of term or default if term is unknown
+    get_term(index)
+        Return the term at index
+    get_terms()
+        Return all terms ordered by id (the column labels of the corpus matrices)
+    update(mat_TF)
+        Add the freq and document_freq of the rows of a term frequency matrix
+    select(keep)
+        Return a vocabulary of the kept terms only, their ids are shifted down in order
+    from_arrays(terms, freq, document_freq)
+        Create a vocabulary from his columns
+    """
+
+    def __init__(self):
+        self.term2id = {}
+        self.id2term = np.empty(0, dtype=object)
+        self.freq = np.zeros(0, dtype=int)
+        self.document_freq = np.zeros(0, dtype=int)
+        self._terms = []
+
+    def add(self, term):
+        """
+        Return the id of term, registering it if it is unknown
+        :param term: the term to add
+        :type term: str
+        :return: the id of the term
+        :rtype: int
+        """
+        index = self.term2id.get(term)
+        if index is None:
+            index = self.term2id[term] = len(self._terms)
+            self._terms.append(term)
+        return index
+
+    def get_id(self, term, default=-1):
+        """
+        Return the id of term or default if term is unknown
+        :param term: the term to look for
+        :type term: str
+        :param default: the value to return if term is unknown
+        :type default: int
+        :return: the id of the term
+        :rtype: int
+        """
+        return self.term2id.get(term, default)
+
+    def get_term(self, index):
+        """
+        Return the term at index
+        :param index: the id of the term
+        :type index: int
+        :return: the term
+        :rtype: str
+        :raise IndexError
+        """
+        return self._terms[index]
+
+    def get_terms(self):
+        """
+        Return all terms ordered by id (the column labels of the corpus matrices)
+        :return: the terms
+        :rtype: ndarray
+        """
+        return self.id2term
+
+    def update(self, mat_TF):
+        """
+        Add the freq and document_freq of the rows of a term frequency matrix (the rows of newly indexed documents)
+        :param mat_TF: the term frequency matrix, without duplicate entries, with word as column (one per term) and document as row
+        :type mat_TF: csr_matrix
+        """
+        size = len(self._terms)
+        self.id2term = np.concatenate([self.id2term, np.array(self._terms[len(self.id2term):], dtype=object)])
+        self.freq = np.concatenate([self.freq, np.zeros(size - len(self.freq), dtype=int)])
+        self.freq += np.asarray(mat_TF.sum(axis=0)).ravel().astype(int)
+        self.document_freq = np.concatenate([self.document_freq, np.zeros(size - len(self.document_freq), dtype=int)])
+        self.document_freq += np.bincount(mat_TF.indices, minlength=size)
+
+    def select(self, keep):
+        """
+        Return a vocabulary of the kept terms only, their ids are shifted down in order (this vocabulary is unchanged,
+        so the terms that are not kept still count the documents added later)
+        :param keep: True for each term to keep, indexed by id
+        :type keep: ndarray
+        :return: the vocabulary of the kept terms and their ids in this vocabulary
+        :rtype: (Vocabulary, ndarray)
+        """
+        kept = np.flatnonzero(keep)
+        return Vocabulary.from_arrays(self.id2term[kept], self.freq[kept], self.document_freq[kept]), kept
+
+    @staticmethod
+    def from_arrays(terms, freq, document_freq):
+        """
+        Create a vocabulary from his columns
+        :param terms: the terms ordered by id
+        :type terms: list[str]
+        :param freq: the total occurrence of each term
+        :type freq: ndarray
+        :param document_freq: the number of document that contain each term
+        :type document_freq: ndarray
+        :return: the vocabulary
+        :rtype: Vocabulary
+        """
+        vocab = Vocabulary()
+        vocab._terms = list(terms)
+        vocab.term2id = {term: i for i, term in enumerate(vocab._terms)}
+        vocab.id2term = np.array(vocab._terms, dtype=object)
+        vocab.freq = freq
+        vocab.document_freq = document_freq
+        return vocab
+
+    def __len__(self):
+        return len(self._terms)
+
+    def __contains__(self, term):
+        return term in self.term2id
+
+    def __iter__(self):
+        return iter(self._terms)
+
+    def __str__(self):
+        return f"Vocabulary(terms={len(self)})"
+
+    def __repr__(self):
+        return self.__str__()
@@ -0,0 +1,129 @@
+"""
+    Weighting schemes used to build the term frequency-inverse document frequency matrix of a corpus.
+    Every function works on the stored values of a csr_matrix, so the matrices never leave the sparse form.
+"""
+
+import numpy as np
+from scipy.sparse import csr_matrix
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+
+def _safe_inverse(values):
+    """
+    Return 1 / values, with 0 where values is 0
+    :param values: the values to inverse
+    :type values: ndarray
+    :return: the inverse of values
+    :rtype: ndarray
+    """
+    values = np.asarray(values, dtype=float)
+    inverse = np.zeros_like(values)
+    np.divide(1.0, values, out=inverse, where=values != 0)
+    return inverse
+
+
+def scale(matrix, row=None, col=None):
+    """
+    Return diag(row) x matrix x diag(col), computed on the stored values only
+    :param matrix: the matrix to scale
+    :type matrix: csr_matrix
+    :param row: the factor of each row (None to keep rows)
+    :type row: ndarray
+    :param col: the factor of each column (None to keep columns)
+    :type col: ndarray
+    :return: the scaled matrix
+    :rtype: csr_matrix
+    """
+    data = matrix.data.astype(float)
+    if row is not None:
+        data *= np.repeat(np.asarray(row, dtype=float), np.diff(matrix.indptr))
+    if col is not None:
+        data *= np.asarray(col, dtype=float)[matrix.indices]
+    return csr_matrix((data, matrix.indices.copy(), matrix.indptr.copy()), shape=matrix.shape)
+
+
+def row_norms(matrix):
+    """
+    Return the L2 norm of each row of matrix
+    :param matrix: the matrix
+    :type matrix: csr_matrix
+    :return: the norm of each row
+    :rtype: ndarray
+    """
+    return np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1), dtype=float).ravel())
+
+
+def l2_normalize(matrix):
+    """
+    Return matrix with each row divided by his L2 norm (empty rows stay empty)
+    :param matrix: the matrix to normalize
+    :type matrix: csr_matrix
+    :return: the normalized matrix
+    :rtype: csr_matrix
+    """
+    return scale(matrix, row=_safe_inverse(row_norms(matrix)))
+
+
+def idf(document_freq, ndoc):
+    """
+    Return the inverse document frequency of each word, log(ndoc / document_freq)
+    :param document_freq: the number of document that contain each word
+    :type document_freq: ndarray
+    :param ndoc: the number of document in the corpus
+    :type ndoc: int
+    :return: the inverse document frequency of each word
+    :rtype: ndarray
+    """
+    return np.log(ndoc * _safe_inverse(document_freq), where=document_freq > 0, out=np.zeros(len(document_freq)))
+
+
+def _tf(mat_TF, document_len):
+    return scale(mat_TF, row=_safe_inverse(document_len))
+
+
+def _log_tf(mat_TF, document_len):
+    matrix = mat_TF.astype(float)
+    matrix.data = 1 + np.log(matrix.data)
+    return matrix
+
+
+def _bm25_tf(mat_TF, document_len):
+    document_len = np.asarray(document_len, dtype=float)
+    average_len = document_len.mean() if len(document_len) > 0 else 0
+    norm = 1 - BM25_B + BM25_B * document_len * (1 / average_len if average_len > 0 else 0)
+    matrix = mat_TF.astype(float)
+    matrix.data = matrix.data * (BM25_K1 + 1) / (matrix.data + BM25_K1 * np.repeat(norm, np.diff(matrix.indptr)))
+    return matrix
+
+
+SCHEMES = {
+    "tf": (_tf, False),
+    "log": (_log_tf, False),
+    "bm25": (_bm25_tf, False),
+    "l2": (_tf, True),
+}
+
+
+def weight(mat_TF, document_freq, document_len, scheme="tf"):
+    """
+    Return the term frequency-inverse document frequency matrix of a corpus
+    :param mat_TF: the term frequency matrix with word as column and document as row
+    :type mat_TF: csr_matrix
+    :param document_freq: the number of document that contain each word
+    :type document_freq: ndarray
+    :param document_len: the number of word of each document
+    :type document_len: ndarray
+    :param scheme: Weighting scheme, can be "tf" (tf / len) | "log" (1 + log(tf)) | "bm25" (bm25 saturation) | "l2" (tf / len with L2 normalized rows)
+    :type scheme: str
+    :return: the weighted matrix
+    :rtype: csr_matrix
+    :raise ValueError
+    """
+    if scheme not in SCHEMES:
+        raise ValueError(f"Unknown weighting scheme {scheme}, expected one of {list(SCHEMES.keys())}")
+
+    tf, normalize = SCHEMES[scheme]
+    matrix = scale(tf(mat_TF, document_len), col=idf(document_freq, mat_TF.shape[0]))
+    return l2_normalize(matrix) if normalize else matrix
@@ -0,0 +1,60 @@
+import io
+from datetime import datetime
+from unittest import TestCase, main
+
+from sys import platform, path
+
+if platform == "win32":
+    path.append("./")
+
+from src.model.document import Document
+from src.utility.atom import read_entries
+
+FEED = b"""<?xml version="1.0" encoding="UTF-8"?>
+<feed xmlns="http://www.w3.org/2005/Atom" xmlns:arxiv="http://arxiv.org/schemas/atom">
+  <title>ArXiv Query</title>
+  <entry>
+    <id>http://arxiv.org/abs/1</id>
+    <published>2023-01-01T10:00:00Z</published>
+    <title>Chess
+      engines</title>
+    <summary>  a long summary about chess engines and how they search  </summary>
+    <author><name>Alice</name></author>
+    <author><name>Bob</name><arxiv:affiliation>Lab</arxiv:affiliation></author>
+    <author><name>Carol</name></author>
+  </entry>
+  <entry>
+    <id>http://arxiv.org/abs/2</id>
+    <summary>short</summary>
+    <author><name>Dave</name></author>
+  </entry>
+  <entry>
+    <summary>another long summary, without title nor identifier</summary>
+    <author><name>Eve</name></author>
+  </entry>
+</feed>"""
+
+
+class TestAtom(TestCase):
+
+    def test_read_entries(self):
+        entries = list(read_entries(io.BytesIO(FEED), start=10, min_summary=20))
+        self.assertEqual(len(entries), 3)
+        self.assertIsNone(entries[1])
+        first, last = entries[0], entries[2]
+        self.assertEqual((first.id, first.published, first.api_index), ("http://arxiv.org/abs/1", "2023-01-01T10:00:00Z", 10))
+        self.assertEqual(first.summary, "a long summary about chess engines and how they search")
+        self.assertEqual(first.authors, ["Alice", "Bob", "Carol"])
+        self.assertEqual((last.id, last.title, last.published, last.api_index), (None, None, None, 12))
+
+    def test_from_arxiv(self):
+        first, _, last = read_entries(io.BytesIO(FEED), min_summary=20)
+        document = Document.from_arxiv(first)
+        self.assertEqual((document.get_author(), document.get_co_authors()), ("Alice", ["Bob", "Carol"]))
+        self.assertEqual((document.get_url(), document.get_date()), ("http://arxiv.org/abs/1", datetime(2023, 1, 1, 10)))
+        document = Document.from_arxiv(last)
+        self.assertEqual((document.get_title(), document.get_url(), document.get_author()), ("Empty", "Empty", "Eve"))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,10 +1,64 @@
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from sys import path, platform
-from unittest import TestCase, main
+from pathlib import Path
+from types import SimpleNamespace
+from unittest import TestCase, main, mock
+from urllib.parse import urlparse, parse_qs
 
 if platform == "win32":
     path.append("./")
 
+from src.model.document import RedditDocument
+from src.utility import config
 from src.utility.data_query import DataQuery
+from src.utility.fetch_scheduler import FetchScheduler
+from src.utility.response_cache import ResponseCache
+
+
+class ArxivStub(BaseHTTPRequestHandler):
+    """
+    A fake arxiv api: entry i has a short summary if i is a multiple of 7, the results end after TOTAL entries.
+    The next requests fail with the statuses of FAULTS ("drop" closes the connection without answer).
+    """
+    protocol_version = "HTTP/1.1"
+    TOTAL = 180
+    DELAY = 0.0
+    FAULTS = []
+    requests = []
+
+    def do_GET(self):
+        query = parse_qs(urlparse(self.path).query)
+        start, size = int(query["start"][0]), int(query["max_results"][0])
+        self.requests.append((start, size, self.client_address))
+        time.sleep(self.DELAY)
+
+        fault = self.FAULTS.pop(0) if self.FAULTS else None
+        if fault == "drop":
+            self.close_connection = True
+            return
+        if fault is not None:
+            self.send_response(fault)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        entries = "".join(
+            f"<entry><id>http://arxiv.org/abs/{i}</id><title>Paper {i}</title><published>2023-01-01T00:00:00Z</published>"
+            f"<summary>{'short' if i % 7 == 0 else 'long summary ' * 10}</summary><author><name>Author {i}</name></author></entry>"
+            for i in range(start, min(start + size, self.TOTAL))
+        )
+        body = f'<?xml version="1.0" encoding="UTF-8"?><feed xmlns="http://www.w3.org/2005/Atom">{entries}</feed>'.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/atom+xml")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
 
 
 class TestDataQuery(TestCase):
@@ -26,5 +80,176 @@ class TestDataQuery(TestCase):
         self.assertEqual(res[-1].get_api_index(), res1[0].get_api_index())
 
 
+
+class TestDataQueryStub(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), ArxivStub)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.url = f"http://127.0.0.1:{cls.server.server_address[1]}/api/query"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        ArxivStub.requests = []
+        ArxivStub.DELAY = 0.0
+        ArxivStub.FAULTS = []
+        self.scheduler = FetchScheduler("arxiv", retries=2, backoff=0.01, retry_on=DataQuery.ARXIV_SCHEDULER.retry_on, min_size=10)
+        patchers = (
+            mock.patch.object(DataQuery, "ARXIV_API_URL", self.url),
+            mock.patch.object(DataQuery, "CACHE", None),
+            mock.patch.object(DataQuery, "ARXIV_SCHEDULER", self.scheduler),
+            mock.patch.object(DataQuery, "REDDIT_SCHEDULER", FetchScheduler("reddit")),
+        )
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    @staticmethod
+    def expected(count, offset=0):
+        indexes = [i for i in range(offset + 1, ArxivStub.TOTAL) if i % 7 != 0]
+        return indexes[0:count]
+
+    def test_arxiv(self):
+        with mock.patch.object(config, "ARXIV_PAGE_SIZE", 10):
+            documents = DataQuery.arxiv("test", 35)
+            self.assertEqual([doc.get_api_index() for doc in documents], self.expected(35))
+            self.assertEqual(documents[0].get_url(), "http://arxiv.org/abs/1")
+
+            resumed = DataQuery.arxiv("test", 5, documents[-1].get_api_index())
+            self.assertEqual([doc.get_api_index() for doc in resumed], self.expected(40)[35:40])
+
+    def test_arxiv_end(self):
+        with mock.patch.object(config, "ARXIV_PAGE_SIZE", 50):
+            documents = DataQuery.arxiv("test", 500)
+        self.assertEqual([doc.get_api_index() for doc in documents], self.expected(500))
+
+    def test_pooled_connections(self):
+        with mock.patch.object(config, "ARXIV_PAGE_SIZE", 5):
+            DataQuery.arxiv("test", 100)
+        self.assertGreater(len(ArxivStub.requests), config.FETCH_WORKERS)
+        self.assertLessEqual(len({client for _, _, client in ArxivStub.requests}), config.FETCH_WORKERS)
+
+    def test_all_concurrent(self):
+        ArxivStub.DELAY = 0.3
+
+        def reddit_pages(theme, count, offset=""):
+            time.sleep(0.6)
+            yield [RedditDocument(title=str(i), author="", date="", url="", text="") for i in range(count)]
+
+        with mock.patch.object(DataQuery, "reddit_pages", side_effect=reddit_pages), mock.patch.object(config, "ARXIV_PAGE_SIZE", 10):
+            start = time.perf_counter()
+            documents = DataQuery.all("test", 40)
+            elapsed = time.perf_counter() - start
+        # Two rounds of arxiv pages (0.6s) while reddit is queried (0.6s), 1.2s one after the other
+        self.assertEqual([doc.get_api_index() for doc in documents[20:40]], self.expected(20))
+        self.assertLess(elapsed, 1.0)
+
+    def test_all_pages(self):
+        ArxivStub.DELAY = 0.1
+
+        def reddit_pages(theme, count, offset=""):
+            for i in range(0, count, 5):
+                time.sleep(0.15)
+                yield [RedditDocument(title=str(i + j), author="", date="", url="", text="", fullname=str(i + j)) for j in range(5)]
+
+        with mock.patch.object(DataQuery, "reddit_pages", side_effect=reddit_pages), mock.patch.object(config, "ARXIV_PAGE_SIZE", 5):
+            pages = [[doc.get_type() for doc in page] for page in DataQuery.all_pages("test", 30)]
+        # The arxiv pages are received between the reddit pages, as soon as they are fetched
+        self.assertEqual(sum(map(len, pages)), 30)
+        sources = [page[0] for page in pages]
+        self.assertEqual(sources.count("reddit"), 3)
+        self.assertLess(sources.index("arxiv"), len(sources) - sources[::-1].index("reddit") - 1)
+        self.assertTrue(all(len(set(page)) == 1 for page in pages))
+
+    def test_retry(self):
+        ArxivStub.FAULTS = [503, "drop", 500, 429]
+        with mock.patch.object(config, "ARXIV_PAGE_SIZE", 10):
+            documents = DataQuery.arxiv("test", 35)
+        self.assertEqual([doc.get_api_index() for doc in documents], self.expected(35))
+        self.assertEqual(self.scheduler.stats()["failures"], 4)
+
+    def test_give_up(self):
+        ArxivStub.FAULTS = [503] * 3
+        with mock.patch.object(config, "ARXIV_PAGE_SIZE", 50):
+            documents = DataQuery.arxiv("test", 10)
+        self.assertEqual(documents, [])
+        self.assertEqual(self.scheduler.stats()["failures"], 3)
+
+    def test_adaptive_size(self):
+        with mock.patch.object(config, "ARXIV_PAGE_SIZE", 100):
+            documents = DataQuery.arxiv("test", 60)
+        # 8 entries of the first page are rejected, the 2nd page asks for the missing documents and a margin
+        self.assertEqual([size for _, size, _ in ArxivStub.requests], [60, 9])
+        self.assertEqual([doc.get_api_index() for doc in documents], self.expected(60))
+
+        ArxivStub.requests = []
+        ArxivStub.DELAY = 0.3
+        self.scheduler.target_latency = 0.05
+        with mock.patch.object(config, "ARXIV_PAGE_SIZE", 50):
+            DataQuery.arxiv("test", 150)
+        # The page size limit is halved by each page slower than the target latency
+        sizes = sorted(size for _, size, _ in ArxivStub.requests)
+        self.assertEqual(sizes[-3:], [50, 50, 50])
+        self.assertEqual(set(sizes[:-3]), {10})
+        self.assertEqual(self.scheduler.stats()["limit"], 10)
+
+    def test_response_cache(self):
+        with tempfile.TemporaryDirectory() as folder, mock.patch.object(config, "ARXIV_PAGE_SIZE", 10):
+            DataQuery.CACHE = ResponseCache(Path(folder))
+            documents = DataQuery.arxiv("test", 35)
+            requested = len(ArxivStub.requests)
+
+            cached = DataQuery.arxiv("test", 35)
+            self.assertEqual(len(ArxivStub.requests), requested)
+            self.assertEqual([doc.get_url() for doc in cached], [doc.get_url() for doc in documents])
+
+            # Offline: the cached pages are read, the missing ones end the results without request
+            DataQuery.CACHE = ResponseCache(Path(folder), ttl=0, replay=True)
+            replayed = DataQuery.arxiv("test", 100)
+            self.assertEqual(len(ArxivStub.requests), requested)
+            self.assertEqual([doc.get_api_index() for doc in replayed], self.expected(requested * 10)[:len(replayed)])
+            self.assertGreaterEqual(len(replayed), 35)
+
+    def test_replay_after_slow_pages(self):
+        # The page size limit learned from slow pages is kept between queries, the replay still asks for the cached pages
+        with tempfile.TemporaryDirectory() as folder, mock.patch.object(config, "ARXIV_PAGE_SIZE", 50):
+            DataQuery.CACHE = ResponseCache(Path(folder))
+            ArxivStub.DELAY = 0.3
+            self.scheduler.target_latency = 0.05
+            documents = DataQuery.arxiv("test", 60)
+            self.assertLess(self.scheduler.limit, 50)
+            requested = len(ArxivStub.requests)
+
+            DataQuery.CACHE = ResponseCache(Path(folder), replay=True)
+            replayed = DataQuery.arxiv("test", 60)
+            self.assertEqual(len(ArxivStub.requests), requested)
+            self.assertEqual([doc.get_url() for doc in replayed], [doc.get_url() for doc in documents])
+
+    def test_reddit_cache(self):
+        posts = [SimpleNamespace(title=f"Post {i}", author_flair_text=None, created_utc=1672531200 + i, url=f"r/{i}",
+                                 selftext="long text " * (i % 3) * 10, comments=[1, 2], name=str(i)) for i in range(8)]
+        subreddit = mock.Mock()
+        subreddit.hot.side_effect = lambda limit, params: posts[int(params["after"] or -1) + 1:][:limit]
+        reddit = mock.Mock(**{"subreddit.return_value": subreddit})
+
+        with tempfile.TemporaryDirectory() as folder, mock.patch.object(DataQuery, "REDDIT", reddit):
+            DataQuery.CACHE = ResponseCache(Path(folder))
+            documents = DataQuery.reddit("test", 4)
+            calls = subreddit.hot.call_count
+
+            DataQuery.CACHE = ResponseCache(Path(folder), replay=True)
+            replayed = DataQuery.reddit("test", 4)
+            self.assertEqual(subreddit.hot.call_count, calls)
+
+        self.assertEqual([doc.get_fullname() for doc in documents], ["1", "2", "4", "5"])
+        self.assertEqual([doc.get_fullname() for doc in replayed], ["1", "2", "4", "5"])
+        self.assertEqual((replayed[0].get_author(), replayed[0].get_comment_count()), ("Unknown", 2))
+
+
 if __name__ == '__main__':
     main()
@@ -0,0 +1,111 @@
+import shutil
+import tempfile
+from pathlib import Path
+from unittest import TestCase, main, mock
+
+from sys import platform, path
+
+if platform == "win32":
+    path.append("./")
+
+import pandas as pd
+
+from src.model.corpus import Corpus
+from src.model.database import CorpusDatabase
+from src.utility import config
+
+
+class TestCorpusDatabase(TestCase):
+
+    FULL = Corpus("chess")
+    FULL.load(500)
+
+    def setUp(self):
+        self.folder = Path(tempfile.mkdtemp())
+        df = pd.read_csv(config.DATA_FOLDER.joinpath("chess.csv"), sep=config.CSV_SEP, index_col=0)
+        df.iloc[0:300, :].to_csv(self.folder.joinpath("chess.csv"), sep=config.CSV_SEP)
+        self.database = CorpusDatabase(self.folder.joinpath("chess.db"))
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def assertSameDocuments(self, documents, expected):
+        self.assertEqual([doc.get_url() for doc in documents], [doc.get_url() for doc in expected])
+        self.assertEqual([str(doc.get_date()) for doc in documents], [str(doc.get_date()) for doc in expected])
+        self.assertEqual([doc.get_text() for doc in documents], [doc.get_text() for doc in expected])
+
+    def test_migrate(self):
+        self.assertEqual(self.database.migrate(self.folder.joinpath("chess.csv")), 300)
+        self.assertEqual(self.database.count(), 300)
+        documents = self.database.read(100, 50)
+        self.assertSameDocuments(documents, list(self.FULL.id2doc.values())[50:150])
+        arxiv = [doc for doc in documents if doc.get_type() == "arxiv"]
+        expected = [doc for doc in list(self.FULL.id2doc.values())[50:150] if doc.get_type() == "arxiv"]
+        self.assertEqual([doc.get_co_authors() for doc in arxiv], [doc.get_co_authors() for doc in expected])
+
+    def test_interrupted_migrate(self):
+        append = CorpusDatabase.append
+        calls = []
+
+        def fail(database, documents):
+            calls.append(len(documents))
+            if len(calls) == 2:
+                raise KeyboardInterrupt()
+            append(database, documents)
+
+        with mock.patch.object(config, "LOAD_CHUNK_SIZE", 100), mock.patch.object(CorpusDatabase, "append", autospec=True, side_effect=fail):
+            self.assertRaises(KeyboardInterrupt, self.database.migrate, self.folder.joinpath("chess.csv"))
+        # Nothing is left of the interrupted migration, it is done again as a whole
+        self.assertEqual(sorted(path.name for path in self.folder.iterdir()), ["chess.csv"])
+        self.assertEqual(self.database.migrate(self.folder.joinpath("chess.csv")), 300)
+        self.assertEqual(self.database.count(), 300)
+
+    def test_append(self):
+        expected = list(self.FULL.id2doc.values())
+        self.database.append(expected[0:10])
+        self.database.append(expected[10:20])
+        self.assertSameDocuments(self.database.read(100), expected[0:20])
+
+        reddit = [doc for doc in expected[0:20] if doc.get_type() == "reddit"]
+        arxiv = [doc for doc in expected[0:20] if doc.get_type() == "arxiv"]
+        self.assertEqual(self.database.resume_offsets(), (reddit[-1].get_fullname() if reddit else "", max([doc.get_api_index() for doc in arxiv], default=0)))
+
+    def test_corpus(self):
+        with mock.patch.object(config, "STORAGE", "sqlite"), mock.patch.object(config, "DATA_FOLDER", self.folder):
+            corpus = Corpus("chess")
+            corpus.load(200)
+            self.assertTrue(self.database.path.is_file())
+            self.assertEqual(self.database.count(), 300)
+            self.assertEqual(corpus.get_document_count(), 200)
+            self.assertTrue(corpus.is_saved())
+            self.assertSameDocuments(corpus.get_documents(), list(self.FULL.id2doc.values())[0:200])
+
+            documents = list(self.FULL.id2doc.values())
+            reddit = [doc.get_fullname() for doc in documents[0:300] if doc.get_type() == "reddit"]
+            arxiv = [doc.get_api_index() for doc in documents[0:300] if doc.get_type() == "arxiv"]
+            with mock.patch("src.model.corpus.DataQuery.all_pages", return_value=[documents[300:400], documents[400:500]]) as query:
+                corpus = Corpus("chess")
+                corpus.load(500)
+                query.assert_called_once_with("chess", 200, reddit[-1] if reddit else "", max(arxiv, default=0))
+            self.assertEqual(self.database.count(), 500)
+            self.assertSameDocuments(corpus.get_documents(), list(self.FULL.id2doc.values()))
+
+    def test_save_part(self):
+        # The corpus holds the first 100 documents of a database of 300: the next rows are read, not fetched
+        with mock.patch.object(config, "STORAGE", "sqlite"), mock.patch.object(config, "DATA_FOLDER", self.folder):
+            corpus = Corpus("chess")
+            corpus.load(100)
+            corpus.save()
+            self.assertIsNone(corpus._source_rows)
+            self.assertEqual(self.database.count(), 300)
+
+            with mock.patch("src.model.corpus.DataQuery.all_pages", return_value=[]) as query:
+                corpus = Corpus("chess")
+                corpus.load(200)
+                query.assert_not_called()
+            self.assertEqual(corpus.get_document_count(), 200)
+            self.assertSameDocuments(corpus.get_documents(), list(self.FULL.id2doc.values())[0:200])
+
+
+if __name__ == '__main__':
+    main()
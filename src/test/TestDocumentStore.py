@@ -0,0 +1,63 @@
+from datetime import datetime
+from unittest import TestCase, main
+
+from sys import platform, path
+
+if platform == "win32":
+    path.append("./")
+
+from src.model.document import RedditDocument, ArxivDocument
+from src.model.document_store import DocumentStore
+
+
+class TestDocumentStore(TestCase):
+
+    DOCUMENTS = [
+        RedditDocument(title="Opening", author="alice", date="2023-01-05 10:00:00", url="r/1", text="chess opening",
+                       comment_count=3, fullname="t3_a"),
+        ArxivDocument(title="Engine", author="bob", date=datetime(2023, 2, 1, 8, 30), url="a/1", text="chess engine é",
+                      co_authors=["alice", "carol"], api_index=7),
+    ]
+
+    def setUp(self):
+        self.store = DocumentStore()
+        self.assertEqual(self.store.append(self.DOCUMENTS), range(0, 2))
+
+    def test_views(self):
+        reddit, arxiv = self.store[0], self.store[1]
+        self.assertIsInstance(reddit, RedditDocument)
+        self.assertEqual((reddit.get_title(), reddit.get_author(), reddit.get_url()), ("Opening", "alice", "r/1"))
+        self.assertEqual((reddit.get_comment_count(), reddit.get_fullname()), (3, "t3_a"))
+        self.assertEqual(reddit.get_date(), datetime(2023, 1, 5, 10))
+        self.assertEqual(arxiv.get_type(), "arxiv")
+        self.assertEqual(arxiv.get_text(), "chess engine é")
+        self.assertEqual((arxiv.get_co_authors(), arxiv.get_api_index()), (["alice", "carol"], 7))
+        self.assertEqual(self.store[1], arxiv)
+        self.assertNotEqual(self.store[0], arxiv)
+        self.assertFalse(hasattr(arxiv, "__dict__"))
+
+    def test_mapping(self):
+        self.assertEqual(len(self.store), 2)
+        self.assertEqual(list(self.store.keys()), [0, 1])
+        self.assertEqual([doc.get_title() for doc in self.store.values()], ["Opening", "Engine"])
+        self.assertRaises(KeyError, self.store.__getitem__, 2)
+
+    def test_append(self):
+        self.assertEqual(self.store.append([self.store[1]]), range(2, 3))
+        self.assertEqual(self.store[2].get_co_authors(), ["alice", "carol"])
+        self.assertEqual(list(self.store.column("title")), ["Opening", "Engine", "Engine"])
+
+    def test_arrays(self):
+        store = DocumentStore.from_arrays(self.store.arrays())
+        self.assertEqual([doc.get_text() for doc in store.values()], ["chess opening", "chess engine é"])
+
+    def test_to_dict(self):
+        columns = self.store.to_dict()
+        self.assertEqual(columns["date"], ["2023-01-05 10:00:00", "2023-02-01 08:30:00"])
+        self.assertEqual(columns["co_authors"], [None, ["alice", "carol"]])
+        self.assertEqual(columns["comment_count"], [3, None])
+        self.assertEqual(columns["type"], ["reddit", "arxiv"])
+
+
+if __name__ == '__main__':
+    main()
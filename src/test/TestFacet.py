@@ -0,0 +1,56 @@
+from datetime import datetime
+from unittest import TestCase, main
+
+from sys import platform, path
+
+if platform == "win32":
+    path.append("./")
+
+import numpy as np
+
+from src.model.author import Author
+from src.model.document import RedditDocument, ArxivDocument
+from src.model.facet import FacetIndex, to_datetime64
+
+
+class TestFacetIndex(TestCase):
+
+    DOCUMENTS = [
+        RedditDocument(title="a", author="alice", date="2023-01-05 10:00:00", url="", text="chess opening"),
+        ArxivDocument(title="b", author="bob", date=datetime(2023, 2, 1, 8, 30), url="", text="chess engine", co_authors=["alice"]),
+        RedditDocument(title="c", author="alice", date="2023-01-20 23:59:59", url="", text="chess endgame"),
+        ArxivDocument(title="d", author="carol", date="not a date", url="", text="go engine"),
+    ]
+    INDEX = FacetIndex(DOCUMENTS, Author.dict_from_documents(DOCUMENTS))
+
+    def test_dates(self):
+        self.assertEqual(str(self.INDEX.dates[1]), "2023-02-01T08:30:00")
+        self.assertTrue(np.isnat(self.INDEX.dates[3]))
+        self.assertEqual(len(to_datetime64([])), 0)
+
+    def test_rows(self):
+        self.assertEqual(list(self.INDEX.rows("type", "reddit")), [0, 2])
+        self.assertEqual(list(self.INDEX.rows("type", "arxiv")), [1, 3])
+        self.assertEqual(list(self.INDEX.rows("author", "alice")), [0, 1, 2])
+        self.assertEqual(list(self.INDEX.rows("month", "2023-01")), [0, 2])
+        self.assertEqual(list(self.INDEX.rows("month", "2023-03")), [])
+        self.assertRaises(ValueError, self.INDEX.rows, "title", "a")
+
+    def test_mask(self):
+        self.assertEqual(list(self.INDEX.mask("author", "bob")), [False, True, False, False])
+
+    def test_between(self):
+        self.assertEqual(list(self.INDEX.between("2023-01-20", "2023-02-01")), [1, 2])
+        self.assertEqual(list(self.INDEX.between("2023-01-20 23:59:59", "2023-02-01 08:29:59")), [2])
+        self.assertEqual(list(self.INDEX.between(end="2023-01")), [0, 2])
+        self.assertEqual(list(self.INDEX.between()), [0, 1, 2])
+        self.assertEqual(list(self.INDEX.between("2023-03-01", "2023-01-01")), [])
+        self.assertRaises(ValueError, self.INDEX.between, "yesterday")
+
+    def test_values(self):
+        self.assertEqual(self.INDEX.values("month"), ["2023-01", "2023-02"])
+        self.assertEqual(self.INDEX.values("author"), ["alice", "bob", "carol"])
+
+
+if __name__ == '__main__':
+    main()
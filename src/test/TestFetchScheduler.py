@@ -0,0 +1,79 @@
+import time
+from unittest import TestCase, main, mock
+
+from sys import platform, path
+
+if platform == "win32":
+    path.append("./")
+
+from src.utility.fetch_scheduler import TokenBucket, FetchScheduler
+
+
+class TestTokenBucket(TestCase):
+
+    def test_rate(self):
+        bucket = TokenBucket(rate=50, capacity=2)
+        start = time.perf_counter()
+        waits = [bucket.acquire() for _ in range(6)]
+        elapsed = time.perf_counter() - start
+        # 2 requests at once, then one every 20ms
+        self.assertEqual(waits[0:2], [0.0, 0.0])
+        self.assertGreaterEqual(elapsed, 0.075)
+        self.assertLess(elapsed, 0.5)
+
+    def test_no_limit(self):
+        self.assertEqual(TokenBucket().acquire(), 0.0)
+
+
+class TestFetchScheduler(TestCase):
+
+    def setUp(self):
+        self.scheduler = FetchScheduler("test", retries=3, backoff=1.0, max_backoff=3.0, retry_on=(IOError,), min_size=10)
+        patcher = mock.patch("time.sleep")
+        self.sleep = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_retry(self):
+        fetch = mock.Mock(side_effect=[IOError("503"), IOError("503"), IOError("503"), "page"])
+        self.assertEqual(self.scheduler.call(fetch, 10), "page")
+        delays = [call.args[0] for call in self.sleep.call_args_list]
+        # Jittered delays bounded by 1s, 2s then 3s (max_backoff)
+        self.assertEqual(len(delays), 3)
+        self.assertTrue(all(0 <= delay <= bound for delay, bound in zip(delays, [1.0, 2.0, 3.0])))
+        self.assertEqual([metric["attempt"] for metric in self.scheduler.metrics], [0, 1, 2, 3])
+        self.assertEqual(self.scheduler.stats()["failures"], 3)
+
+    def test_give_up(self):
+        fetch = mock.Mock(side_effect=IOError("503"))
+        self.assertRaises(IOError, self.scheduler.call, fetch)
+        self.assertEqual(fetch.call_count, 4)
+        fetch = mock.Mock(side_effect=ValueError("bad request"))
+        self.assertRaises(ValueError, self.scheduler.call, fetch)
+        self.assertEqual(fetch.call_count, 1)
+
+    def test_plan(self):
+        self.assertEqual(self.scheduler.plan(250, 100), (100, 3))
+        self.scheduler.observe(100, 50)
+        self.assertAlmostEqual(self.scheduler.acceptance, 0.85)
+        self.assertEqual(self.scheduler.plan(17, 100), (20, 1))
+        self.scheduler.start()
+        self.assertEqual(self.scheduler.plan(17, 100), (17, 1))
+
+    def test_latency(self):
+        self.scheduler.target_latency = 1.0
+        with mock.patch("time.perf_counter", side_effect=[0.0, 2.0, 0.0, 2.0, 0.0, 2.0]):
+            for _ in range(3):
+                self.scheduler.call(lambda: None, 100)
+        self.assertEqual(self.scheduler.limit, 12)
+        self.assertEqual(self.scheduler.plan(1000, 100), (12, 84))
+        self.assertEqual(self.scheduler.plan(1000, 100, adaptive=False), (100, 10))
+
+        with mock.patch("time.perf_counter", side_effect=[0.0, 0.0] * 10):
+            for _ in range(10):
+                self.scheduler.call(lambda: None, 12)
+        self.assertGreater(self.scheduler.limit, 12)
+        self.assertEqual(self.scheduler.plan(1000, 100)[0], min(100, self.scheduler.limit))
+
+
+if __name__ == '__main__':
+    main()
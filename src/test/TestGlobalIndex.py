@@ -0,0 +1,96 @@
+from unittest import TestCase, main, mock
+
+from sys import platform, path
+
+if platform == "win32":
+    path.append("./")
+
+import numpy as np
+
+from src.model.corpus import Corpus
+from src.model.global_index import GlobalIndex
+from src.model.registry import CorpusRegistry
+
+
+class TestGlobalIndex(TestCase):
+
+    FOOTBALL = Corpus("football")
+    FOOTBALL.load(100)
+    CHESS = Corpus("chess")
+    CHESS.load(100)
+
+    def setUp(self):
+        self.index = GlobalIndex([self.FOOTBALL, self.CHESS])
+
+    def test_vocabulary(self):
+        self.assertEqual(set(self.index.vocab), set(self.FOOTBALL.vocab) | set(self.CHESS.vocab))
+        for word in ["chess", "football", "game"]:
+            expected = sum(corpus.vocab.document_freq[corpus.vocab.get_id(word)] for corpus in (self.FOOTBALL, self.CHESS) if word in corpus.vocab)
+            self.assertEqual(self.index.vocab.document_freq[self.index.vocab.get_id(word)], expected)
+
+    def test_rows(self):
+        self.assertEqual(self.index.rows("football"), range(0, 100))
+        self.assertEqual(self.index.rows("chess"), range(100, 200))
+        self.assertEqual(list(np.bincount(self.index.corpus_ids)), [100, 100])
+        self.assertRaises(KeyError, self.index.rows, "python")
+
+    def test_view(self):
+        view = self.index.view("chess")
+        self.assertTrue(np.shares_memory(view.data, self.index.mat_TF.data))
+        self.assertTrue(np.shares_memory(view.indices, self.index.mat_TF.indices))
+        self.assertEqual((view[:, self.index.columns["chess"]] != self.CHESS.mat_TF).nnz, 0)
+        self.assertEqual(view.shape, (100, len(self.index.vocab)))
+
+    def test_search(self):
+        # Same ranking as a single corpus made of the documents of both corpora
+        both = Corpus("both")
+        both._reset()
+        both._append([*self.FOOTBALL.id2doc.values(), *self.CHESS.id2doc.values()], prune=False)
+        expected_ids, expected_scores = both.engine.search([both.vocab.get_id("chess"), both.vocab.get_id("game")], 10)
+
+        rows, scores = self.index.rank("chess game", 10)
+        np.testing.assert_allclose(scores, expected_scores)
+        self.assertEqual(set(rows), set(expected_ids))
+
+        results = self.index.search("chess game", 10)
+        self.assertEqual([doc.get_url() for _, doc in results], [both.id2doc[i].get_url() for i in rows])
+        self.assertEqual({name for name, _ in results} - {"football", "chess"}, set())
+        self.assertEqual(self.index.search("zzzunknownzzz", 10), [])
+
+    def test_means(self):
+        for kind in ["tf", "tfidf"]:
+            np.testing.assert_allclose(self.index.term_means(kind, "chess")[self.index.columns["chess"]], self.CHESS.term_means(kind))
+            top = self.index.top_terms(kind, "football", 5)
+            words = self.index.vocab.get_terms()[top].tolist()
+            np.testing.assert_allclose(self.index.term_means(kind, "football")[top], self.FOOTBALL.term_means(kind)[self.FOOTBALL.top_terms(kind, 5)])
+            np.testing.assert_allclose(self.index.term_means(kind, "chess")[top], self.CHESS.term_means(kind, words))
+
+    def test_empty(self):
+        index = GlobalIndex([])
+        self.assertEqual(index.search("chess", 10), [])
+        self.assertEqual(index.mat_TF.shape, (0, 0))
+        self.assertRaises(KeyError, index.term_means, "tf", "chess")
+
+    def test_current(self):
+        corpus = Corpus("chess")
+        corpus.load(50)
+        index = GlobalIndex([self.FOOTBALL, corpus])
+        self.assertTrue(index.is_current([self.FOOTBALL, corpus]))
+        self.assertFalse(index.is_current([corpus, self.FOOTBALL]))
+
+        corpus._append(list(self.CHESS.id2doc.values())[50:60])
+        self.assertFalse(index.is_current([self.FOOTBALL, corpus]))
+
+    def test_registry(self):
+        registry = CorpusRegistry(["football", "chess"], 100)
+        registry.corpora = {"football": self.FOOTBALL, "chess": self.CHESS}
+        index = registry.global_index()
+        self.assertEqual(index.names, ["football", "chess"])
+        self.assertIs(registry.global_index(), index)
+
+        with mock.patch.object(registry.corpora["chess"], "mat_TF", self.CHESS.mat_TF.copy()):
+            self.assertIsNot(registry.global_index(), index)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,212 @@
+import shutil
+import tempfile
+from pathlib import Path
+from unittest import TestCase, main, mock
+
+from sys import platform, path
+
+if platform == "win32":
+    path.append("./")
+
+import numpy as np
+import pandas as pd
+
+from src.model.corpus import Corpus
+from src.utility import config
+from src.utility.tokenizer import Tokenizer, ENGLISH_STOPWORDS
+
+
+class TestIndex(TestCase):
+
+    FULL = Corpus("football")
+    FULL.load(200)
+
+    def setUp(self):
+        self.folder = Path(tempfile.mkdtemp())
+        df = pd.read_csv(config.DATA_FOLDER.joinpath("football.csv"), sep=config.CSV_SEP, index_col=0)
+        df.iloc[0:100, :].to_csv(self.folder.joinpath("football.csv"), sep=config.CSV_SEP)
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def assertSameIndex(self, corpus):
+        self.assertEqual(list(corpus.vocab), list(self.FULL.vocab))
+        self.assertEqual((corpus.mat_TF != self.FULL.mat_TF).nnz, 0)
+        self.assertEqual(list(corpus.vocab.freq), list(self.FULL.vocab.freq))
+        self.assertEqual(list(corpus.vocab.document_freq), list(self.FULL.vocab.document_freq))
+        self.assertAlmostEqual(abs(corpus.mat_TFxIDF - self.FULL.mat_TFxIDF).max(), 0)
+        self.assertEqual(corpus.get_author_count(), self.FULL.get_author_count())
+
+    def test_extend(self):
+        corpus = Corpus("football")
+        corpus.file_path = self.folder.joinpath("football.csv")
+        corpus.load(100)
+        self.assertEqual(corpus.mat_TF.shape[0], 100)
+
+        missing = list(self.FULL.id2doc.values())[100:200]
+        with mock.patch("src.model.corpus.DataQuery.all_pages", return_value=[missing[0:40], missing[40:100]]) as query:
+            corpus.load(200)
+            self.assertEqual(query.call_args.args[1], 100)
+
+        self.assertTrue(corpus.is_same("football", 200))
+        self.assertFalse(corpus.is_saved())
+        self.assertSameIndex(corpus)
+
+    def test_extend_source(self):
+        # The csv holds more rows than the loaded corpus: they are read, the apis are not queried
+        shutil.copy(config.DATA_FOLDER.joinpath("football.csv"), self.folder.joinpath("football.csv"))
+        corpus = Corpus("football")
+        corpus.file_path = self.folder.joinpath("football.csv")
+        corpus.load(100)
+        self.assertIsNone(corpus._source_rows)
+
+        with mock.patch("src.model.corpus.DataQuery.all_pages", return_value=[]) as query:
+            corpus.load(200)
+            query.assert_not_called()
+        self.assertTrue(corpus.is_same("football", 200))
+        self.assertTrue(corpus.is_saved())
+        self.assertSameIndex(corpus)
+
+    def test_extend_snapshot(self):
+        corpus = Corpus("football")
+        corpus.file_path = self.folder.joinpath("football.csv")
+        corpus.load(100)
+        corpus.save_index()
+
+        restored = Corpus("football")
+        restored.file_path = corpus.file_path
+        missing = list(self.FULL.id2doc.values())[100:200]
+        with mock.patch("src.model.corpus.DataQuery.all_pages", return_value=[missing]):
+            restored.load(200)
+        self.assertSameIndex(restored)
+
+    def test_extend_pruned(self):
+        # The words dropped by min_df in the first 100 documents are kept once the next documents contain them
+        tokenizer = Tokenizer(stopwords=ENGLISH_STOPWORDS, min_df=2)
+        expected = Corpus("football", tokenizer=tokenizer)
+        expected._reset()
+        expected._append(list(self.FULL.id2doc.values())[0:200])
+
+        corpus = Corpus("football", tokenizer=tokenizer)
+        corpus.file_path = self.folder.joinpath("football.csv")
+        corpus.load(100)
+        corpus.save_index()
+        self.assertLess(len(corpus.vocab), len(corpus._full_vocab))
+
+        missing = list(self.FULL.id2doc.values())[100:200]
+        for extended in [corpus, Corpus("football", tokenizer=tokenizer)]:
+            extended.file_path = corpus.file_path
+            with mock.patch("src.model.corpus.DataQuery.all_pages", return_value=[missing[0:40], missing[40:100]]), \
+                    mock.patch.object(extended, "_prune", wraps=extended._prune) as prune:
+                extended.load(200)
+            self.assertEqual(prune.call_count, 1)
+            self.assertEqual(list(extended.vocab), list(expected.vocab))
+            self.assertEqual((extended.mat_TF != expected.mat_TF).nnz, 0)
+            self.assertEqual(list(extended.vocab.document_freq), list(expected.vocab.document_freq))
+            self.assertEqual(list(extended.document_len), list(expected.document_len))
+
+    def test_published_pages(self):
+        corpus = Corpus("football")
+        corpus.file_path = self.folder.joinpath("football.csv")
+        published = []
+
+        def on_publish(partial):
+            # The pages already indexed can be searched while the load is running
+            published.append((partial.progress(), len(partial.sort_by_score("football", 500))))
+
+        corpus.on_publish = on_publish
+        missing = list(self.FULL.id2doc.values())[100:200]
+        with mock.patch.object(config, "LOAD_CHUNK_SIZE", 40), \
+                mock.patch("src.model.corpus.DataQuery.all_pages", return_value=[missing[0:30], missing[30:100]]):
+            corpus.load(200)
+
+        self.assertEqual([progress["indexed"] for progress, _ in published], [40, 80, 100, 130, 200])
+        self.assertTrue(all(progress["fetched"] >= progress["indexed"] and progress["target"] == 200 for progress, _ in published))
+        counts = [count for _, count in published]
+        self.assertEqual(counts, sorted(counts))
+        self.assertEqual(counts[-1], len(self.FULL.sort_by_score("football", 500)))
+        self.assertEqual(corpus.progress(), dict(target=200, fetched=200, indexed=200))
+        self.assertSameIndex(corpus)
+
+    def test_streamed_load(self):
+        tokenizer = Tokenizer(stopwords=ENGLISH_STOPWORDS, min_df=2, max_df=0.5)
+        expected = Corpus("football", tokenizer=tokenizer)
+        expected._reset()
+        expected._append(list(self.FULL.id2doc.values())[0:150])
+
+        corpus = Corpus("football", tokenizer=tokenizer)
+        with mock.patch.object(config, "LOAD_CHUNK_SIZE", 32), mock.patch.object(corpus, "_prune", wraps=corpus._prune) as prune:
+            corpus.load(150)
+        # The vocabulary is pruned once, after the last chunk
+        self.assertEqual(prune.call_count, 1)
+        self.assertEqual(list(corpus.vocab), list(expected.vocab))
+        self.assertEqual((corpus.mat_TF != expected.mat_TF).nnz, 0)
+        self.assertIsNone(corpus._source_rows)
+
+        corpus = Corpus("football")
+        corpus.file_path = self.folder.joinpath("football.csv")
+        corpus._reset()
+        corpus._read_source(500)
+        self.assertEqual((corpus.get_document_count(), corpus._source_rows), (100, 100))
+
+    def test_term_means(self):
+        dense = pd.DataFrame(self.FULL.mat_TFxIDF.toarray(), columns=self.FULL.vocab.get_terms()).mean(axis=0)
+        np.testing.assert_allclose(self.FULL.term_means("tfidf"), dense.values)
+        self.assertEqual(list(self.FULL.vocab.get_terms()[self.FULL.top_terms("tfidf", 10)]), list(dense.nlargest(10).index))
+        np.testing.assert_allclose(self.FULL.term_means("tf", ["football", "unknownword"]), [self.FULL.term_means("tf")[self.FULL.vocab.get_id("football")], 0])
+        self.assertIs(self.FULL.term_means("tf"), self.FULL.term_means("tf"))
+
+    def test_filters(self):
+        ranking = self.FULL.sort_by_score("football match", self.FULL.ndoc)
+        dates = sorted(str(doc.get_date()) for doc in ranking)
+        start, end = dates[50][0:10], dates[150][0:10]
+        expected = [doc for doc in ranking if start <= str(doc.get_date())[0:10] <= end and doc.get_type() == "reddit"][0:10]
+        self.assertEqual(self.FULL.sort_by_score("football match", 10, start=start, end=end, source="reddit"), expected)
+
+        author = ranking[0].get_author()
+        expected = [doc for doc in ranking if doc in self.FULL.authors[author].get_documents()][0:5]
+        self.assertEqual(self.FULL.sort_by_score("football match", 5, author=author), expected)
+        self.assertEqual(self.FULL.sort_by_score("football", 5, author="nobody"), [])
+        self.assertEqual(len(self.FULL.filter_rows(author="nobody")), 0)
+        self.assertIsNone(self.FULL.filter_rows())
+
+    def test_result_cache(self):
+        corpus = Corpus("football")
+        corpus.load(50)
+        first = corpus.sort_by_score("Football match", 5)
+        self.assertEqual(corpus.sort_by_score("match  football football", 5), first)
+        self.assertEqual((corpus.results.hits, corpus.results.misses), (1, 1))
+        corpus.sort_by_score("football match", 5, source="arxiv")
+        self.assertEqual(corpus.results.misses, 2)
+
+        corpus._append(list(self.FULL.id2doc.values())[50:200])
+        self.assertEqual(len(corpus.results), 0)
+        urls = [doc.get_url() for doc in corpus.sort_by_score("football match", 5)]
+        self.assertEqual(urls, [doc.get_url() for doc in self.FULL.sort_by_score("football match", 5)])
+        self.assertEqual(corpus.results.misses, 3)
+
+    def test_sorted_views(self):
+        documents = list(self.FULL.id2doc.values())
+        self.assertEqual(self.FULL.get_documents("date"), sorted(documents, key=lambda doc: doc.get_date()))
+        self.assertEqual(self.FULL.get_documents("title"), sorted(documents, key=lambda doc: doc.get_title()))
+        self.assertEqual(self.FULL.get_authors("document_count"), sorted(self.FULL.get_authors(), key=lambda author: author.get_document_count()))
+        self.assertIs(self.FULL._order("date"), self.FULL._order("date"))
+
+        dates = sorted(str(doc.get_date()) for doc in documents)
+        self.assertEqual(str(self.FULL.min_date()), dates[0])
+        self.assertEqual(str(self.FULL.max_date()), dates[-1])
+        start, end = dates[20][0:10], dates[120][0:10]
+        expected = [doc for doc in self.FULL.get_documents("date") if start <= str(doc.get_date())[0:10] <= end]
+        self.assertEqual(self.FULL.documents_between(start, end), expected)
+
+    def test_facet_means(self):
+        reddit = [i for i, doc in self.FULL.id2doc.items() if doc.get_type() == "reddit"]
+        dense = pd.DataFrame(self.FULL.mat_TFxIDF[reddit].toarray(), columns=self.FULL.vocab.get_terms()).mean(axis=0)
+        np.testing.assert_allclose(self.FULL.term_means("tfidf", facet=("type", "reddit")), dense.values)
+        self.assertEqual(list(self.FULL.vocab.get_terms()[self.FULL.top_terms("tfidf", 10, ("type", "reddit"))]), list(dense.nlargest(10).index))
+        self.assertIs(self.FULL.facet_matrix("tf", ("type", "arxiv")), self.FULL.facet_matrix("tf", ("type", "arxiv")))
+        self.assertEqual(self.FULL.facet_matrix("tf", ("type", "arxiv")).shape[0], self.FULL.ndoc - len(reddit))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+from unittest import TestCase, main
+
+from sys import platform, path
+
+if platform == "win32":
+    path.append("./")
+
+from src.model import indexer
+from src.model.vocabulary import Vocabulary
+from src.utility.tokenizer import Tokenizer
+
+
+class TestIndexer(TestCase):
+
+    TEXTS = ["The ball, the goal!", "A chess board", "", "The board and the ball"] * 5
+    TOKENIZER = Tokenizer()
+
+    def test_tokenize_chunk(self):
+        terms, indices, indptr, data = indexer.tokenize_chunk(self.TEXTS[0:2], self.TOKENIZER)
+        self.assertEqual(terms, ["the", "ball", "goal", "a", "chess", "board"])
+        self.assertEqual(list(indptr), [0, 3, 6])
+        self.assertEqual(list(data[0:3]), [2, 1, 1])
+
+    def test_chunks(self):
+        serial_vocab = Vocabulary()
+        serial = indexer.merge(serial_vocab, indexer.tokenize(self.TEXTS, self.TOKENIZER, chunk_size=len(self.TEXTS)))
+
+        chunked_vocab = Vocabulary()
+        chunked = indexer.merge(chunked_vocab, indexer.tokenize(self.TEXTS, self.TOKENIZER, chunk_size=3))
+        self.assertEqual(list(chunked_vocab), list(serial_vocab))
+        self.assertEqual((chunked != serial).nnz, 0)
+        self.assertEqual(chunked.shape, (len(self.TEXTS), len(serial_vocab)))
+
+    def test_workers(self):
+        serial_vocab = Vocabulary()
+        serial = indexer.merge(serial_vocab, indexer.tokenize(self.TEXTS, self.TOKENIZER, chunk_size=3))
+
+        parallel_vocab = Vocabulary()
+        parallel = indexer.merge(parallel_vocab, indexer.tokenize(self.TEXTS, self.TOKENIZER, workers=2, chunk_size=3))
+        self.assertEqual(list(parallel_vocab), list(serial_vocab))
+        self.assertEqual((parallel != serial).nnz, 0)
+
+    def test_unpicklable_tokenizer(self):
+        # The tokenizer can not be sent to the processes: the texts are tokenized in this process
+        tokenizer = Tokenizer()
+        tokenizer.tokens = lambda text, tokens=tokenizer.tokens: tokens(text)
+        vocab = Vocabulary()
+        rows = indexer.merge(vocab, indexer.tokenize(self.TEXTS, tokenizer, workers=2, chunk_size=3))
+
+        serial_vocab = Vocabulary()
+        serial = indexer.merge(serial_vocab, indexer.tokenize(self.TEXTS, self.TOKENIZER, chunk_size=3))
+        self.assertEqual(list(vocab), list(serial_vocab))
+        self.assertEqual((rows != serial).nnz, 0)
+
+
+if __name__ == "__main__":
+    main()
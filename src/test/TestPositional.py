@@ -0,0 +1,42 @@
+from unittest import TestCase, main
+
+from sys import platform, path
+
+if platform == "win32":
+    path.append("./")
+
+from src.model.positional import PositionalIndex
+
+
+class TestPositionalIndex(TestCase):
+
+    INDEX = PositionalIndex([
+        "The World Cup final, the best game of the World Cup.",
+        "A chess world record",
+        "world cup",
+    ])
+
+    def test_postings(self):
+        docs, positions, offsets = self.INDEX.postings("World")
+        self.assertEqual(list(docs), [0, 0, 1, 2])
+        self.assertEqual(list(positions), [1, 9, 2, 0])
+        self.assertEqual(list(offsets), [4, 42, 8, 0])
+
+    def test_documents(self):
+        self.assertEqual(list(self.INDEX.documents("world")), [0, 1, 2])
+        self.assertEqual(list(self.INDEX.documents("unknown")), [])
+
+    def test_phrase(self):
+        self.assertEqual(list(self.INDEX.phrase_documents(["world", "cup"])), [0, 2])
+        self.assertEqual(list(self.INDEX.phrase_documents(["cup", "a"])), [])
+        self.assertEqual(len(self.INDEX.phrase(["world", "cup"])), 3)
+
+    def test_concordance(self):
+        result = self.INDEX.concordance(["world", "cup"], 2)
+        self.assertEqual(result[0], dict(left="the", pattern="world cup", right="final the"))
+        self.assertEqual(result[1], dict(left="of the", pattern="world cup", right=""))
+        self.assertEqual(result[2], dict(left="", pattern="world cup", right=""))
+
+
+if __name__ == "__main__":
+    main()
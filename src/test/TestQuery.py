@@ -0,0 +1,56 @@
+from unittest import TestCase, main
+
+from sys import platform, path
+
+if platform == "win32":
+    path.append("./")
+
+import numpy as np
+
+from src.model import query
+from src.model.positional import PositionalIndex
+
+
+class TestQuery(TestCase):
+
+    INDEX = PositionalIndex([
+        "Messi and Ronaldo at the World Cup",
+        "Messi scored again",
+        "Ronaldo world record",
+        "The cup of the world",
+    ])
+
+    def evaluate(self, string):
+        return list(query.parse(string).evaluate(self.INDEX, 4))
+
+    def test_is_boolean(self):
+        self.assertTrue(query.is_boolean("messi AND ronaldo"))
+        self.assertTrue(query.is_boolean('"world cup"'))
+        self.assertFalse(query.is_boolean("messi and ronaldo"))
+
+    def test_set_operations(self):
+        a = np.array([1, 3, 5, 7, 9])
+        b = np.array([3, 4, 5, 10])
+        self.assertEqual(list(query.intersect(a, b)), [3, 5])
+        self.assertEqual(list(query.difference(a, b)), [1, 7, 9])
+        self.assertEqual(list(query.intersect(a, np.array([], dtype=int))), [])
+
+    def test_operators(self):
+        self.assertEqual(self.evaluate("messi AND ronaldo"), [0])
+        self.assertEqual(self.evaluate("messi ronaldo"), [0])
+        self.assertEqual(self.evaluate("messi OR ronaldo"), [0, 1, 2])
+        self.assertEqual(self.evaluate("messi NOT ronaldo"), [1])
+        self.assertEqual(self.evaluate("NOT messi"), [2, 3])
+
+    def test_phrase(self):
+        self.assertEqual(self.evaluate('"world cup"'), [0])
+        self.assertEqual(self.evaluate('"world cup" OR (ronaldo AND NOT messi)'), [0, 2])
+
+    def test_invalid(self):
+        self.assertRaises(ValueError, query.parse, "(messi OR ronaldo")
+        self.assertRaises(ValueError, query.parse, "messi AND")
+        self.assertRaises(ValueError, query.parse, "messi )")
+
+
+if __name__ == "__main__":
+    main()
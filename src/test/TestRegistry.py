@@ -0,0 +1,134 @@
+import threading
+import time
+from unittest import TestCase, main, mock
+
+from sys import platform, path
+
+if platform == "win32":
+    path.append("./")
+
+from src.model.corpus import Corpus
+from src.model.registry import CorpusRegistry
+
+
+class TestCorpusRegistry(TestCase):
+
+    def test_single_flight(self):
+        registry = CorpusRegistry(["football"], 10)
+        calls = []
+
+        def load(corpus, count):
+            calls.append(count)
+            time.sleep(0.2)
+            corpus.loaded = True
+
+        with mock.patch.object(Corpus, "load", autospec=True, side_effect=load):
+            threads = [threading.Thread(target=registry.get, args=("football",)) for _ in range(5)]
+            for thread in threads:
+                thread.start()
+            time.sleep(0.05)
+            self.assertEqual(registry.status(), {"football": "loading"})
+            for thread in threads:
+                thread.join()
+
+        self.assertEqual(calls, [10])
+        self.assertTrue(registry.is_ready("football"))
+        self.assertEqual(registry.status(), {"football": "ready"})
+
+    def test_error(self):
+        registry = CorpusRegistry(["football"], 10)
+        with mock.patch.object(Corpus, "load", side_effect=RuntimeError("offline")):
+            self.assertRaises(RuntimeError, registry.get, "football")
+        self.assertEqual(registry.status(), {"football": "error"})
+
+    def test_retry(self):
+        registry = CorpusRegistry(["football"], 10)
+        started, resume = threading.Event(), threading.Event()
+        outcomes = []
+
+        def load(corpus, count):
+            if len(outcomes) == 0:
+                outcomes.append("failed")
+                raise RuntimeError("offline")
+            started.set()
+            resume.wait(5)
+            corpus.loaded = True
+
+        def get():
+            try:
+                outcomes.append(registry.get("football").is_loaded())
+            except RuntimeError:
+                outcomes.append("error")
+
+        with mock.patch.object(Corpus, "load", autospec=True, side_effect=load):
+            get()
+            retry = threading.Thread(target=get)
+            retry.start()
+            started.wait(5)
+            # The error of the failed load is kept until the retry is over, the retry is reported as loading
+            self.assertIn("football", registry._errors)
+            self.assertEqual(registry.status(), {"football": "loading"})
+            resume.set()
+            retry.join()
+
+        self.assertEqual(outcomes, ["failed", "error", True])
+        self.assertEqual(registry._errors, {})
+        self.assertEqual(registry.status(), {"football": "ready"})
+
+    def test_warm_up(self):
+        registry = CorpusRegistry(["football", "chess"], 10)
+
+        def load(corpus, count):
+            corpus.loaded = True
+
+        with mock.patch.object(Corpus, "load", autospec=True, side_effect=load):
+            registry.warm_up()
+            registry._warmer.shutdown(wait=True)
+        self.assertEqual(registry.status(), {"football": "ready", "chess": "ready"})
+
+    def test_warm_up_partial(self):
+        # A single warm-up thread waits for the load started by a partial get, that load runs on its own thread
+        registry = CorpusRegistry(["football", "chess"], 10)
+        started, resume = threading.Event(), threading.Event()
+
+        def load(corpus, count):
+            if corpus.get_name() == "football":
+                started.set()
+                resume.wait(5)
+            corpus.on_publish(corpus)
+            corpus.loaded = True
+
+        with mock.patch.object(Corpus, "load", autospec=True, side_effect=load):
+            registry.warm_up(workers=1)
+            started.wait(5)
+            get = threading.Thread(target=registry.get, args=("chess",), kwargs=dict(partial=True))
+            get.start()
+            resume.set()
+            get.join(5)
+            self.assertFalse(get.is_alive())
+            registry._warmer.shutdown(wait=True)
+        self.assertEqual(registry.status(), {"football": "ready", "chess": "ready"})
+
+    def test_partial(self):
+        registry = CorpusRegistry(["football"], 10)
+        resume = threading.Event()
+
+        def load(corpus, count):
+            corpus.ndoc = 5
+            corpus.on_publish(corpus)
+            resume.wait(5)
+            corpus.ndoc = count
+            corpus.loaded = True
+
+        with mock.patch.object(Corpus, "load", autospec=True, side_effect=load):
+            corpus = registry.get("football", partial=True)
+            self.assertEqual(corpus.get_document_count(), 5)
+            self.assertEqual(registry.status(), {"football": "partial"})
+            resume.set()
+            self.assertEqual(registry.get("football").get_document_count(), 10)
+        self.assertEqual(registry.status(), {"football": "ready"})
+        self.assertIsNone(corpus.on_publish)
+
+
+if __name__ == "__main__":
+    main()
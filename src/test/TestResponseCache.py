@@ -0,0 +1,81 @@
+import os
+import tempfile
+import time
+from pathlib import Path
+from unittest import TestCase, main, mock
+
+from sys import platform, path
+
+if platform == "win32":
+    path.append("./")
+
+from src.utility.response_cache import ResponseCache
+
+
+class TestResponseCache(TestCase):
+
+    def setUp(self):
+        folder = tempfile.TemporaryDirectory()
+        self.addCleanup(folder.cleanup)
+        self.folder = Path(folder.name)
+        self.cache = ResponseCache(self.folder, ttl=60, max_bytes=100)
+
+    def age(self, key, seconds):
+        path = self.folder.joinpath(key[:2], key)
+        stamp = time.time() - seconds
+        os.utime(path, (stamp, stamp))
+
+    def test_key(self):
+        self.assertEqual(ResponseCache.key("u", dict(a=1, b="x")), ResponseCache.key("u", dict(b="x", a="1")))
+        self.assertNotEqual(ResponseCache.key("u", dict(a=1)), ResponseCache.key("v", dict(a=1)))
+        self.assertNotEqual(ResponseCache.key("u", dict(a=1)), ResponseCache.key("u", dict(a=2)))
+
+    def test_get_put(self):
+        key = ResponseCache.key("u")
+        self.assertIsNone(self.cache.get(key))
+        self.cache.put(key, b"response")
+        self.assertEqual(self.cache.get(key), b"response")
+        self.assertEqual(self.cache.stats(), dict(entries=1, bytes=8, hits=1, misses=1, ratio=0.5))
+        self.cache.clear()
+        self.assertIsNone(self.cache.get(key))
+
+    def test_ttl(self):
+        key = ResponseCache.key("u")
+        self.cache.put(key, b"response")
+        self.age(key, 120)
+        self.assertIsNone(self.cache.get(key))
+        # Expired responses are still replayed offline
+        self.assertEqual(ResponseCache(self.folder, ttl=60, replay=True).get(key), b"response")
+
+    def test_eviction(self):
+        keys = [ResponseCache.key("u", dict(page=i)) for i in range(3)]
+        for i, key in enumerate(keys):
+            self.cache.put(key, bytes(40))
+            self.age(key, 10 - i)
+        self.assertEqual([self.cache.get(key) is None for key in keys], [True, False, False])
+        self.cache.put(ResponseCache.key("big"), bytes(101))
+        self.assertIsNone(self.cache.get(ResponseCache.key("big")))
+        self.assertEqual(self.cache.stats()["bytes"], 80)
+
+    def test_size(self):
+        keys = [ResponseCache.key("u", dict(page=i)) for i in range(3)]
+        with mock.patch.object(ResponseCache, "_files", autospec=True, side_effect=ResponseCache._files) as files:
+            for key in keys[0:2]:
+                self.cache.put(key, bytes(40))
+            self.cache.put(keys[0], bytes(20))
+            # Under budget the folder is not scanned
+            self.assertEqual(files.call_count, 0)
+            self.age(keys[1], 10)
+            self.cache.put(keys[2], bytes(50))
+            self.assertEqual(files.call_count, 1)
+        # The oldest response is evicted
+        self.assertEqual([self.cache.get(key) is None for key in keys], [False, True, False])
+        self.assertEqual(self.cache._size, 70)
+        self.assertEqual(self.cache.stats()["bytes"], 70)
+
+        # The size of the responses already on disk is counted when the cache is opened
+        self.assertEqual(ResponseCache(self.folder, max_bytes=100)._size, 70)
+
+
+if __name__ == '__main__':
+    main()
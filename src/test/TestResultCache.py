@@ -0,0 +1,62 @@
+from unittest import TestCase, main, mock
+
+from sys import platform, path
+
+if platform == "win32":
+    path.append("./")
+
+from src.utility.result_cache import ResultCache
+
+
+class TestResultCache(TestCase):
+
+    def test_get_put(self):
+        cache = ResultCache(max_entries=2, max_bytes=100)
+        self.assertIsNone(cache.get("a"))
+        cache.put("a", 1, 10)
+        self.assertEqual(cache.get("a"), 1)
+        self.assertEqual(cache.stats(), dict(entries=1, bytes=10, hits=1, misses=1, ratio=0.5))
+
+    def test_lru_entries(self):
+        cache = ResultCache(max_entries=2, max_bytes=100)
+        cache.put("a", 1, 10)
+        cache.put("b", 2, 10)
+        cache.get("a")
+        cache.put("c", 3, 10)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), 1)
+        self.assertEqual(cache.get("c"), 3)
+
+    def test_bytes(self):
+        cache = ResultCache(max_entries=10, max_bytes=25)
+        cache.put("a", 1, 10)
+        cache.put("b", 2, 10)
+        cache.put("c", 3, 10)
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.size, 20)
+        cache.put("d", 4, 30)
+        self.assertIsNone(cache.get("d"))
+        cache.put("b", 5, 5)
+        self.assertEqual((cache.get("b"), cache.size), (5, 15))
+
+    def test_ttl(self):
+        cache = ResultCache(ttl=60)
+        with mock.patch("src.utility.result_cache.time.monotonic", return_value=0):
+            cache.put("a", 1, 10)
+        with mock.patch("src.utility.result_cache.time.monotonic", return_value=30):
+            self.assertEqual(cache.get("a"), 1)
+        with mock.patch("src.utility.result_cache.time.monotonic", return_value=61):
+            self.assertIsNone(cache.get("a"))
+        self.assertEqual((len(cache), cache.size), (0, 0))
+
+    def test_clear(self):
+        cache = ResultCache()
+        cache.put("a", 1, 10)
+        cache.get("a")
+        cache.clear()
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(cache.stats()["hits"], 1)
+
+
+if __name__ == '__main__':
+    main()
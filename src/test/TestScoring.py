@@ -0,0 +1,57 @@
+from unittest import TestCase, main
+
+from sys import platform, path
+
+if platform == "win32":
+    path.append("./")
+
+import numpy as np
+from scipy.sparse import csr_matrix
+
+from src.model.scoring import ScoringEngine
+
+
+class TestScoringEngine(TestCase):
+
+    MATRIX = csr_matrix(np.array([[1.0, 0.0, 0.0], [1.0, 1.0, 0.0], [0.0, 0.0, 2.0], [0.0, 0.0, 0.0]]))
+    ENGINE = ScoringEngine(MATRIX)
+
+    def test_score(self):
+        dense = self.MATRIX.toarray()
+        vector = np.array([1.0, 1.0, 0.0])
+        norms = np.linalg.norm(dense, axis=1)
+        expected = np.divide(dense @ vector, norms * np.linalg.norm(vector), out=np.zeros(4), where=norms > 0)
+        np.testing.assert_allclose(self.ENGINE.score(self.ENGINE.query_vector([0, 1])), expected)
+
+    def test_search(self):
+        ids, scores = self.ENGINE.search([0, 1], 2)
+        self.assertEqual(list(ids), [1, 0])
+        self.assertAlmostEqual(scores[0], 1.0)
+
+    def test_search_many(self):
+        queries = [[0, 1], [2], [0]]
+        ids, scores = self.ENGINE.search_many(queries, 2)
+        self.assertEqual(ids.shape, (3, 2))
+        for i, term_ids in enumerate(queries):
+            single_ids, single_scores = self.ENGINE.search(term_ids, 2)
+            self.assertEqual(list(ids[i]), list(single_ids))
+            np.testing.assert_allclose(scores[i], single_scores)
+
+    def test_top_k(self):
+        scores = np.array([0.5, 0.1, 0.5, 0.9, 0.1])
+        self.assertEqual(list(ScoringEngine.top_k(scores, 2)), [3, 2])
+        self.assertEqual(list(ScoringEngine.top_k(scores, 3)), [3, 2, 0])
+        self.assertEqual(list(ScoringEngine.top_k(scores, 4)), [3, 2, 0, 4])
+        self.assertEqual(list(ScoringEngine.top_k(scores, 10)), [3, 2, 0, 4, 1])
+        self.assertEqual(list(ScoringEngine.top_k(scores, 0)), [])
+
+        # Same order as the full sort of the scores, reversed
+        scores = np.random.default_rng(0).integers(0, 5, (4, 50)) / 4
+        for k in [1, 7, 20, 50]:
+            ids = ScoringEngine.top_k_many(scores, k)
+            for i, row in enumerate(scores):
+                self.assertEqual(list(ids[i]), list(np.argsort(row, kind="stable")[::-1][0:k]))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+import os
+import shutil
+import tempfile
+import threading
+from pathlib import Path
+from unittest import TestCase, main
+
+from sys import platform, path
+
+if platform == "win32":
+    path.append("./")
+
+import numpy as np
+
+from src.model import snapshot
+from src.model.corpus import Corpus
+from src.utility import config
+
+
+class TestSnapshot(TestCase):
+
+    def setUp(self):
+        self.folder = Path(tempfile.mkdtemp())
+        self.source = self.folder.joinpath("test.csv")
+        self.source.write_text("source")
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def test_strings(self):
+        strings = ["ball", "", "café", "goal"]
+        buffer, offsets = snapshot.encode_strings(strings)
+        self.assertEqual(len(offsets), 5)
+        self.assertEqual(snapshot.decode_strings(buffer, offsets), strings)
+
+    def test_read_write(self):
+        folder = snapshot.snapshot_path(self.source)
+        self.assertIsNone(snapshot.read(folder, self.source))
+
+        snapshot.write(folder, self.source, {"values": np.arange(5), "empty": np.empty(0)}, ndoc=5)
+        arrays, meta = snapshot.read(folder, self.source, ndoc=5)
+        self.assertEqual(list(arrays["values"]), [0, 1, 2, 3, 4])
+        self.assertEqual(len(arrays["empty"]), 0)
+        self.assertEqual(meta["ndoc"], 5)
+        self.assertIsNone(snapshot.read(folder, self.source, ndoc=6))
+
+    def test_stale(self):
+        folder = snapshot.snapshot_path(self.source)
+        snapshot.write(folder, self.source, {"values": np.arange(5)})
+        self.source.write_text("modified source")
+        self.assertIsNone(snapshot.read(folder, self.source))
+
+    def test_concurrent_write(self):
+        folder = snapshot.snapshot_path(self.source)
+        errors = []
+
+        def write(value):
+            try:
+                for _ in range(20):
+                    snapshot.write(folder, self.source, {"values": np.full(1000, value)}, ndoc=value)
+            except Exception as error:
+                errors.append(error)
+
+        threads = [threading.Thread(target=write, args=(value,)) for value in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        # The snapshot is the one of a single writer, and no temporary folder is left
+        arrays, meta = snapshot.read(folder, self.source)
+        self.assertEqual(set(arrays["values"]), {meta["ndoc"]})
+        self.assertEqual(sorted(path.name for path in self.folder.iterdir()), sorted(["test.csv", folder.name]))
+
+    def test_corpus(self):
+        shutil.copy(config.DATA_FOLDER.joinpath("football.csv"), self.folder.joinpath("football.csv"))
+
+        corpus = Corpus("football")
+        corpus.file_path = self.folder.joinpath("football.csv")
+        corpus.load(50)
+        corpus.save_index()
+        self.assertTrue(os.path.isdir(snapshot.snapshot_path(corpus.file_path)))
+
+        restored = Corpus("football")
+        restored.file_path = corpus.file_path
+        restored.load(50)
+        self.assertTrue(restored.is_same("football", 50))
+        self.assertEqual(list(restored.vocab), list(corpus.vocab))
+        self.assertEqual((restored.mat_TF != corpus.mat_TF).nnz, 0)
+        self.assertEqual([doc.get_title() for doc in restored.get_documents()], [doc.get_title() for doc in corpus.get_documents()])
+        self.assertEqual(restored.get_author_count(), corpus.get_author_count())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+from unittest import TestCase, main
+
+from sys import platform, path
+
+if platform == "win32":
+    path.append("./")
+
+import numpy as np
+
+from src.utility.tokenizer import Tokenizer, ENGLISH_STOPWORDS
+from src.utility.utils import clean_text, split_string
+
+
+class TestTokenizer(TestCase):
+
+    TEXT = "The Goal-keeper's save, in the 90th minute!  Pneumonoultramicroscopicsilicovolcanoconiosis"
+
+    def test_tokens(self):
+        self.assertEqual(Tokenizer().tokenize(self.TEXT), split_string(clean_text(self.TEXT)))
+        self.assertEqual(Tokenizer().tokenize(""), [])
+
+    def test_stopwords(self):
+        tokens = Tokenizer(stopwords=ENGLISH_STOPWORDS).tokenize(self.TEXT)
+        self.assertEqual(tokens, ["goalkeepers", "save", "th", "minute"])
+
+    def test_stemmer(self):
+        calls = []
+
+        def stemmer(word):
+            calls.append(word)
+            return word.rstrip("s")
+
+        tokenizer = Tokenizer(stemmer=stemmer)
+        self.assertEqual(tokenizer.tokenize("goals goals goal"), ["goal", "goal", "goal"])
+        self.assertEqual(calls, ["goals", "goal"])
+
+    def test_keep(self):
+        document_freq = np.array([1, 2, 5, 10])
+        self.assertEqual(list(Tokenizer().keep(document_freq, 10)), [True, True, True, True])
+        self.assertEqual(list(Tokenizer(min_df=2).keep(document_freq, 10)), [False, True, True, True])
+        self.assertEqual(list(Tokenizer(max_df=0.5).keep(document_freq, 10)), [True, True, True, False])
+
+    def test_signature(self):
+        self.assertEqual(Tokenizer().signature(), Tokenizer().signature())
+        self.assertNotEqual(Tokenizer().signature(), Tokenizer(min_df=2).signature())
+        self.assertNotEqual(Tokenizer().signature(), Tokenizer(stopwords=ENGLISH_STOPWORDS).signature())
+
+
+if __name__ == "__main__":
+    main()
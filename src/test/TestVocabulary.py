@@ -0,0 +1,54 @@
+from unittest import TestCase, main
+
+from sys import platform, path
+
+if platform == "win32":
+    path.append("./")
+
+from scipy.sparse import csr_matrix
+
+from src.model.vocabulary import Vocabulary
+
+
+class TestVocabulary(TestCase):
+
+    def test_add(self):
+        vocab = Vocabulary()
+        self.assertEqual(vocab.add("ball"), 0)
+        self.assertEqual(vocab.add("goal"), 1)
+        self.assertEqual(vocab.add("ball"), 0)
+        self.assertEqual(len(vocab), 2)
+        self.assertTrue("goal" in vocab)
+        self.assertFalse("chess" in vocab)
+        self.assertEqual(vocab.get_id("goal"), 1)
+        self.assertEqual(vocab.get_id("chess"), -1)
+        self.assertEqual(vocab.get_term(1), "goal")
+        self.assertEqual(list(vocab), ["ball", "goal"])
+
+    def test_update(self):
+        vocab = Vocabulary()
+        for term in ["ball", "goal", "team"]:
+            vocab.add(term)
+        mat = csr_matrix([[2, 1, 0], [1, 0, 0], [0, 0, 4]])
+        vocab.update(mat)
+        self.assertEqual(list(vocab.get_terms()), ["ball", "goal", "team"])
+        self.assertEqual(list(vocab.freq), [3, 1, 4])
+        self.assertEqual(list(vocab.document_freq), [2, 1, 1])
+
+    def test_select(self):
+        vocab = Vocabulary()
+        for term in ["ball", "goal", "team"]:
+            vocab.add(term)
+        vocab.update(csr_matrix([[2, 1, 0], [1, 0, 0], [0, 0, 4]]))
+        selected, kept = vocab.select([True, False, True])
+        self.assertEqual(list(kept), [0, 2])
+        self.assertEqual(list(selected), ["ball", "team"])
+        self.assertEqual(selected.get_id("team"), 1)
+        self.assertEqual(list(selected.freq), [3, 4])
+        # The vocabulary keeps every term, a term not selected is still counted
+        self.assertEqual(vocab.add("goal"), 1)
+        self.assertEqual(len(vocab), 3)
+
+
+if __name__ == "__main__":
+    main()
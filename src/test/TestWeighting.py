@@ -0,0 +1,52 @@
+from unittest import TestCase, main
+
+from sys import platform, path
+
+if platform == "win32":
+    path.append("./")
+
+import numpy as np
+from scipy.sparse import csr_matrix, issparse
+
+from src.model.weighting import weight, l2_normalize, idf
+
+
+class TestWeighting(TestCase):
+
+    MAT_TF = csr_matrix(np.array([[2, 1, 0], [1, 0, 0], [0, 0, 4]]))
+    DOCUMENT_FREQ = np.array([2, 1, 1])
+    DOCUMENT_LEN = np.array([3, 1, 4])
+
+    def test_idf(self):
+        np.testing.assert_allclose(idf(self.DOCUMENT_FREQ, 3), np.log([1.5, 3, 3]))
+
+    def test_tf(self):
+        dense = self.MAT_TF.toarray() / self.DOCUMENT_LEN[:, None] * np.log([1.5, 3, 3])
+        matrix = weight(self.MAT_TF, self.DOCUMENT_FREQ, self.DOCUMENT_LEN, "tf")
+        self.assertTrue(issparse(matrix))
+        np.testing.assert_allclose(matrix.toarray(), dense)
+
+    def test_log(self):
+        matrix = weight(self.MAT_TF, self.DOCUMENT_FREQ, self.DOCUMENT_LEN, "log")
+        self.assertAlmostEqual(matrix[0, 0], (1 + np.log(2)) * np.log(1.5))
+        self.assertEqual(matrix.nnz, self.MAT_TF.nnz)
+
+    def test_bm25(self):
+        matrix = weight(self.MAT_TF, self.DOCUMENT_FREQ, self.DOCUMENT_LEN, "bm25")
+        self.assertEqual(matrix.nnz, self.MAT_TF.nnz)
+        self.assertTrue((matrix.data > 0).all())
+
+    def test_l2(self):
+        matrix = weight(self.MAT_TF, self.DOCUMENT_FREQ, self.DOCUMENT_LEN, "l2")
+        np.testing.assert_allclose(np.linalg.norm(matrix.toarray(), axis=1), [1, 1, 1])
+
+    def test_l2_empty_row(self):
+        matrix = l2_normalize(csr_matrix(np.array([[3.0, 4.0], [0.0, 0.0]])))
+        np.testing.assert_allclose(matrix.toarray(), [[0.6, 0.8], [0, 0]])
+
+    def test_unknown(self):
+        self.assertRaises(ValueError, weight, self.MAT_TF, self.DOCUMENT_FREQ, self.DOCUMENT_LEN, "unknown")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,11 +1,7 @@
-from src.model.corpus import Corpus
+from src.model.registry import CorpusRegistry
 
 corpus_size = 500
 
-corpus_dict = {
-    "football": Corpus("football"),
-    "basketball": Corpus("basketball"),
-    "chess": Corpus("chess"),
-    "computer": Corpus("computer"),
-    "python": Corpus("python"),
-}
\ No newline at end of file
+registry = CorpusRegistry(["football", "basketball", "chess", "computer", "python"], corpus_size)
+
+corpus_dict = registry.corpora
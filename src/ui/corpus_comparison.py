@@ -1,7 +1,6 @@
-import pandas as pd
 from dash import html, dcc, callback, Output, Input
 
-from src.ui.common import corpus_dict, corpus_size
+from src.ui.common import corpus_dict, registry
 
 corpus_names = list(corpus_dict.keys())
 
@@ -61,78 +60,27 @@ def update_labels(c1, c2):
     Input('content-tabs', 'value'),
 )
 def update_matrices(selected_corpus_1, selected_corpus_2, count, tab):
-    corpus_1 = corpus_dict[selected_corpus_1]
-    corpus_2 = corpus_dict[selected_corpus_2]
-
-    if not corpus_1.is_loaded():
-        corpus_1.load(corpus_size)
-    if not corpus_2.is_loaded():
-        corpus_2.load(corpus_size)
-
-    tf_matrix_df_1 = pd.DataFrame(corpus_1.mat_TF.toarray(), columns=list(corpus_1.vocab.keys()))
-    tf_matrix_df_2 = pd.DataFrame(corpus_2.mat_TF.toarray(), columns=list(corpus_2.vocab.keys()))
-    
-    average_values_1 = tf_matrix_df_1.mean(axis=0)
-    average_values_2 = tf_matrix_df_2.mean(axis=0)
-
-    tfidf_matrix_df_1 = pd.DataFrame(corpus_1.mat_TFxIDF.toarray(), columns=list(corpus_1.vocab.keys()))
-    tfidf_matrix_df_2 = pd.DataFrame(corpus_2.mat_TFxIDF.toarray(), columns=list(corpus_2.vocab.keys()))
-
-    average_values_idf_1 = tfidf_matrix_df_1.mean(axis=0)
-    average_values_idf_2 = tfidf_matrix_df_2.mean(axis=0)
-
-    top = {
-        'def':
-            {
-                'tf': average_values_1.nlargest(count).index,
-                'tfidf': average_values_idf_1.nlargest(count).index
-            },
-        'rev':
-            {
-                'tf': average_values_2.nlargest(count).index,
-                'tfidf': average_values_idf_2.nlargest(count).index
-            }
-    }
-
-    average_values_1 = average_values_1.reindex(average_values_1.index.union(average_values_2.index), fill_value=0)
-    average_values_2 = average_values_2.reindex(average_values_1.index, fill_value=0)
-    average_values_idf_1 = average_values_idf_1.reindex(average_values_idf_1.index.union(average_values_idf_2.index), fill_value=0)
-    average_values_idf_2 = average_values_idf_2.reindex(average_values_idf_1.index, fill_value=0)
-
-    tf_figure = {
-        'data': [
-            {
-                'x': top[tab]['tf'],
-                'y': average_values_1.loc[top[tab]['tf']],
-                'type': 'bar',
-                'name': selected_corpus_1
-            },
-            {
-                'x': top[tab]['tf'],
-                'y': average_values_2.loc[top[tab]['tf']],
-                'type': 'bar',
-                'name': selected_corpus_2
-            }
-        ],
-    }
-
-    tfidf_figure = {
-        'data': [
-            {
-                'x': top[tab]['tfidf'],
-                'y': average_values_idf_1.loc[top[tab]['tfidf']],
-                'type': 'bar',
-                'name': selected_corpus_1
-            },
-            {
-                'x': top[tab]['tfidf'],
-                'y': average_values_idf_2.loc[top[tab]['tfidf']],
-                'type': 'bar',
-                'name': selected_corpus_2
-            }
-        ],
-    }
-
-    return tf_figure, tfidf_figure
-
-    
+    corpus_1 = registry.get(selected_corpus_1)
+    corpus_2 = registry.get(selected_corpus_2)
+
+    # The corpus of the selected tab give the words to display, the other one is aligned on them
+    leader, other = (corpus_1, corpus_2) if tab == 'def' else (corpus_2, corpus_1)
+
+    figures = []
+    for kind in ['tf', 'tfidf']:
+        words = leader.vocab.get_terms()[leader.top_terms(kind, count)].tolist()
+        values = {leader.get_name(): leader.term_means(kind)[leader.top_terms(kind, count)], other.get_name(): other.term_means(kind, words)}
+
+        figures.append({
+            'data': [
+                {
+                    'x': words,
+                    'y': values[corpus.get_name()].tolist(),
+                    'type': 'bar',
+                    'name': name
+                }
+                for corpus, name in [(corpus_1, selected_corpus_1), (corpus_2, selected_corpus_2)]
+            ],
+        })
+
+    return figures[0], figures[1]
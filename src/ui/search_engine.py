@@ -1,14 +1,15 @@
 import pandas as pd
 from dash import html, dcc, callback, Output, Input, State
 
-from src.ui.common import corpus_dict, corpus_size
+from src.ui.common import corpus_dict, corpus_size, registry
 
 base_author_opt = {'label': "None", 'value': -1}
+all_corpora_opt = {'label': "All corpora", 'value': "*"}
 
 layout = html.Div([
     html.Label("Select the first corpus", htmlFor="corpus-selector"),
     dcc.Dropdown(
-        options=list(corpus_dict.keys()),
+        options=[*({'label': name, 'value': name} for name in corpus_dict.keys()), all_corpora_opt],
         value=list(corpus_dict.keys())[0],
         id="corpus-selector"
     ),
@@ -29,7 +30,8 @@ layout = html.Div([
     html.Label("Enter some keywords", htmlFor="keywords"),
     dcc.Input(
         id="keywords",
-        type="text"
+        type="text",
+        placeholder='words, "exact phrase", AND, OR, NOT, ( )'
     ),
 
     html.Button(
@@ -51,17 +53,19 @@ layout = html.Div([
     Input('corpus-selector', 'value'),
 )
 def set_author_and_date_on_corpus(corpus_name):
-    corpus = corpus_dict[corpus_name]
+    # Recherche dans tous les corpus : pas de filtre par auteur ni par date
+    if corpus_name == all_corpora_opt['value']:
+        return [base_author_opt], None, None, None, None
 
-    if not corpus.is_loaded():
-        corpus.load(corpus_size)
+    # Les filtres par défaut couvrent tout le corpus : ils sont construits sur le corpus chargé en entier
+    # (seule la recherche utilise le corpus partiel, ses documents suivants seraient exclus par les dates)
+    corpus = registry.get(corpus_name)
 
     opts = [{'label': v.get_name(), 'value': v.get_name()} for i, v in enumerate(corpus.get_authors())]
 
-    document_sort_by_date = corpus.get_documents(sort="date")
-
-    min_date = document_sort_by_date[0].get_date()
-    max_date = document_sort_by_date[-1].get_date()
+    # Dates extrêmes lues dans l'ordre des dates mis en cache par le corpus
+    min_date = corpus.min_date()
+    max_date = corpus.max_date()
 
     return [base_author_opt, *opts], min_date, max_date, max_date, min_date
 
@@ -78,31 +82,49 @@ def set_author_and_date_on_corpus(corpus_name):
     prevent_initial_call=True,
 )
 def on_search(btn, keywords, corpus_name, author, count, s_date, e_date):
+    if corpus_name == all_corpora_opt['value']:
+        return search_everywhere(keywords, count)
 
-    documents = corpus_dict[corpus_name].sort_by_score(keywords or "", corpus_size)
+    corpus = registry.get(corpus_name, partial=True)
+    filters = dict(author=None if author == -1 else author, start=s_date, end=e_date)
 
-    if len(documents) == 0:
-        return "None of there word are contain in the corpus"
-    else:
+    # Les filtres sont appliqués avant le classement, la page contient count documents s'il y en a assez
+    documents = corpus.sort_by_score(keywords or "", count, **filters)
 
-        documents = list(filter(lambda x: e_date >= x.get_date() >= s_date, documents))
+    # Résultats partiels tant que le corpus est en cours de chargement
+    progress = corpus.progress()
+    loading = "" if corpus.is_loaded() else f" (corpus loading: {progress['indexed']}/{progress['target']} documents indexed)"
 
-        if author != -1:
-            documents = list(filter(lambda x: x.get_author() == author, documents))
+    if len(documents) == 0:
+        rows = corpus.filter_rows(**filters)
+        return ("No document match your filters." if rows is not None and len(rows) == 0 else "None of there word are contain in the corpus") + loading
+    else:
+        return [
+            html.Div([f"{len(documents)} results.{loading}"], style={'marginBottom': "5px"}),
+            *[
+                html.Li([
+                    f"[{doc.get_type()}]\t\t",
+                    dcc.Link(doc.get_title(), href=doc.get_url(), target='_blank'),
+                ])
+                for doc in documents
+            ]
+        ]
 
-        if len(documents) <= 0:
-            return "No document match your filters."
 
-        if len(documents) > count:
-            documents = documents[0:count]
+def search_everywhere(keywords, count):
+    # Une seule requête sur l'index commun de tous les corpus (attend la fin de leur chargement)
+    results = registry.global_index().search(keywords or "", count)
 
+    if len(results) == 0:
+        return "None of there word are contain in the corpora"
+    else:
         return [
-            html.Div([f"{len(documents)} results."], style={'marginBottom': "5px"}),
+            html.Div([f"{len(results)} results."], style={'marginBottom': "5px"}),
             *[
                 html.Li([
-                    f"[{doc.get_type()}]\t\t",
+                    f"[{name}] [{doc.get_type()}]\t\t",
                     dcc.Link(doc.get_title(), href=doc.get_url(), target='_blank'),
                 ])
-                for doc in documents
+                for name, doc in results
             ]
         ]
@@ -1,7 +1,6 @@
-import pandas as pd
 from dash import html, dcc, callback, Output, Input
 
-from src.ui.common import corpus_dict, corpus_size
+from src.ui.common import corpus_dict, registry
 
 layout = html.Div([
     html.Label("Select the corpus", htmlFor="corpus-selector"),
@@ -33,39 +32,27 @@ layout = html.Div([
     Input('word-count-input', 'value')
 )
 def render_mrw(tab, select, count):
-    # Selection du bon corpus
-    corpus = corpus_dict[select]
+    # Selection du bon corpus (chargé une seule fois par le registre)
+    corpus = registry.get(select)
 
-    # Charger le corpus s'il ne l'est pas
-    if not corpus.is_loaded():
-        corpus.load(corpus_size)
+    # Moyennes par source, calculées une seule fois par chargement grâce à l'index des facettes
+    reddit_v = corpus.term_means("tfidf", facet=("type", "reddit"))
+    arxiv_v = corpus.term_means("tfidf", facet=("type", "arxiv"))
 
-    # Récuperation des id des document en fonction de sa source
-    reddit_ids = list(map(lambda kv: kv[0], filter(lambda kv: kv[1].get_type() == "reddit", corpus.id2doc.items())))
-    arxiv_ids = [i for i in range(corpus_size) if i not in reddit_ids]
-
-    reddit_df = pd.DataFrame(corpus.mat_TFxIDF[reddit_ids, :].toarray(), columns=list(corpus.vocab.keys()))
-    arxiv_df = pd.DataFrame(corpus.mat_TFxIDF[arxiv_ids, :].toarray(), columns=list(corpus.vocab.keys()))
-
-    reddit_v = reddit_df.mean(axis=0)
-    arxiv_v = arxiv_df.mean(axis=0)
-
-    top = {
-        "rva": reddit_v.nlargest(count).index,
-        "avr": arxiv_v.nlargest(count).index
-    }
+    top = corpus.top_terms("tfidf", int(count), facet=("type", "reddit" if tab == "rva" else "arxiv"))
+    words = corpus.vocab.get_terms()[top].tolist()
 
     return {
         'data': [
             {
-                'x': top[tab],
-                'y': reddit_v.loc[top[tab]],
+                'x': words,
+                'y': reddit_v[top].tolist(),
                 'type': 'bar',
                 'name': 'reddit'
             },
             {
-                'x': top[tab],
-                'y': arxiv_v.loc[top[tab]],
+                'x': words,
+                'y': arxiv_v[top].tolist(),
                 'type': 'bar',
                 'name': 'arxiv'
             }
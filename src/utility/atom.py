@@ -0,0 +1,61 @@
+"""
+    Streaming reader of the arxiv api responses (Atom feeds), entries are read one at a time from the response and
+    dropped once their record is built, so a page is read in constant memory whatever its size.
+"""
+
+from collections import namedtuple
+from xml.etree.ElementTree import iterparse
+
+ATOM = "{http://www.w3.org/2005/Atom}"
+
+ArxivEntry = namedtuple("ArxivEntry", ["id", "title", "summary", "published", "authors", "api_index"])
+ArxivEntry.__doc__ = """
+    The values of an arxiv entry used by Document.from_arxiv (None for a missing value)
+"""
+
+
+def _text(element):
+    """
+    Return the text of an element without the surrounding whitespaces
+    :param element: the element
+    :type element: Element
+    :return: the text ("" for an empty element)
+    :rtype: str
+    """
+    return (element.text or "").strip()
+
+
+def read_entries(stream, start=0, min_summary=0):
+    """
+    Read the entries of an arxiv feed one at a time, an entry with a summary shorter than min_summary is skipped
+    without building its record (None is yielded instead, so the caller can count the entries of the page)
+    :param stream: the response of the api
+    :type stream: BinaryIO
+    :param start: the api index of the first entry
+    :type start: int
+    :param min_summary: the minimum length of the summary
+    :type min_summary: int
+    :return: the record of each entry of the feed, None for a skipped entry
+    :rtype: Iterator[ArxivEntry | None]
+    :raise xml.etree.ElementTree.ParseError
+    """
+    root = None
+    index = start
+    for event, element in iterparse(stream, events=("start", "end")):
+        if root is None:
+            root = element
+        if event != "end" or element.tag != f"{ATOM}entry":
+            continue
+
+        summary = element.find(f"{ATOM}summary")
+        if len(_text(summary) if summary is not None else "") < min_summary:
+            yield None
+        else:
+            values = {name: element.find(f"{ATOM}{name}") for name in ("id", "title", "published")}
+            values = {name: None if value is None else _text(value) for name, value in values.items()}
+            authors = [_text(name) for name in element.iterfind(f"{ATOM}author/{ATOM}name")]
+            yield ArxivEntry(summary=None if summary is None else _text(summary), authors=authors, api_index=index, **values)
+
+        index += 1
+        # The entries read are dropped from the tree
+        root.clear()
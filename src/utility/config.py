@@ -4,6 +4,32 @@ REDDIT_SECRET = "qj8ZzIfpLH8wMcN99i0GfBG-K2gFUQ"
 REDDIT_CID = "YvHn5bV1pAosVjV0XmrxDg"
 REDDIT_AGENT = "search_engine"
 
+ARXIV_API_URL = "http://export.arxiv.org/api/query"
+ARXIV_PAGE_SIZE = 100  # entries per arxiv request
+FETCH_WORKERS = 4  # arxiv pages requested at the same time (pooled connections), 1 to request them one after the other
+FETCH_TIMEOUT = 30  # seconds
+FETCH_RETRIES = 3  # retries of a failed request
+FETCH_BACKOFF = 1.0  # seconds, maximum wait before the first retry (doubled at each retry)
+FETCH_TARGET_LATENCY = 5.0  # seconds, pages are made smaller while the requests are slower
+ARXIV_RATE = 1 / 3  # requests per second (arxiv api terms of use), FETCH_WORKERS requests at once at most
+REDDIT_RATE = 1.0  # requests per second
+REDDIT_PAGE_SIZE = 100  # posts per reddit request
+
+RESPONSE_CACHE_MODE = "cache"  # "off" | "cache" | "replay", replay only reads the cached responses (offline)
+RESPONSE_CACHE_FOLDER = Path(__file__).parent.parent.parent.joinpath("resource/cache")
+RESPONSE_CACHE_TTL = 24 * 3600  # seconds
+RESPONSE_CACHE_BYTES = 1 << 28
+
 DATA_FOLDER = Path(__file__).parent.parent.parent.joinpath("resource/data")
 
 CSV_SEP = '\t'
+
+INDEX_WORKERS = 1  # process count used to tokenize documents, 1 to tokenize in the main process
+INDEX_CHUNK_SIZE = 256
+LOAD_CHUNK_SIZE = 256  # rows read at once from a saved corpus, each chunk is indexed before the next one is read
+
+RESULT_CACHE_ENTRIES = 256  # search results kept per corpus, 0 to disable the cache
+RESULT_CACHE_BYTES = 1 << 20
+RESULT_CACHE_TTL = 600  # seconds
+
+STORAGE = "csv"  # "csv" | "sqlite", the format of the saved corpora (csv files are migrated to sqlite on first load)
@@ -1,8 +1,17 @@
+import io
+import json
+import queue
 import sys
-import urllib
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
 import praw
-import xmltodict
+import prawcore
+import urllib3
 from src.utility import config
+from src.utility.atom import read_entries
+from src.utility.fetch_scheduler import FetchScheduler
+from src.utility.response_cache import ResponseCache
 from src.model.document import Document, RedditDocument, ArxivDocument
 
 
@@ -14,14 +23,96 @@ class DataQuery:
     -------
     reddit(theme, count, offset="")
         Fetch <count> documents of <theme>, start at <offset> document from reddit
+    reddit_pages(theme, count, offset="")
+        Same as reddit, the documents are yielded page by page
     arxiv(theme, count, offset="")
         Fetch <count> documents of <theme>, start at <offset> document from arxiv
+    arxiv_pages(theme, count, offset=0)
+        Same as arxiv, the documents are yielded page by page
+    reddit_page(theme, limit, after)
+        Return the records of one page of reddit hot posts
+    arxiv_page(theme, start, size)
+        Return the entries of one page of arxiv results
     all(theme, count, r_off="", a_off=0)
-        Fetch <count> documents shared between reddit and arxiv
+        Fetch <count> documents shared between reddit and arxiv (both sources are fetched at the same time)
+    all_pages(theme, count, r_off="", a_off=0)
+        Same as all, the documents are yielded page by page, as soon as they are fetched
     """
 
     REDDIT = r = praw.Reddit(client_id=config.REDDIT_CID, client_secret=config.REDDIT_SECRET, user_agent=config.REDDIT_AGENT, check_for_async=False)
-    ARXIV_API_URL = "http://export.arxiv.org/api/query"
+    ARXIV_API_URL = config.ARXIV_API_URL
+    # Failed requests are only retried by the schedulers (urllib3 only follows the redirects)
+    HTTP = urllib3.PoolManager(maxsize=config.FETCH_WORKERS, block=True, timeout=config.FETCH_TIMEOUT,
+                               retries=urllib3.Retry(total=None, connect=0, read=0, other=0, redirect=3))
+    ARXIV_SCHEDULER = FetchScheduler("arxiv", config.ARXIV_RATE, config.FETCH_WORKERS, config.FETCH_RETRIES, config.FETCH_BACKOFF,
+                                     retry_on=(urllib3.exceptions.HTTPError,), target_latency=config.FETCH_TARGET_LATENCY, min_size=10)
+    REDDIT_SCHEDULER = FetchScheduler("reddit", config.REDDIT_RATE, 1, config.FETCH_RETRIES, config.FETCH_BACKOFF,
+                                      retry_on=(prawcore.exceptions.RequestException, prawcore.exceptions.ServerError, prawcore.exceptions.TooManyRequests),
+                                      target_latency=config.FETCH_TARGET_LATENCY, min_size=10)
+    CACHE = None if config.RESPONSE_CACHE_MODE == "off" else ResponseCache(
+        config.RESPONSE_CACHE_FOLDER, config.RESPONSE_CACHE_TTL, config.RESPONSE_CACHE_BYTES, config.RESPONSE_CACHE_MODE == "replay")
+
+    @classmethod
+    def _request(cls, url, params, fetch):
+        """
+        Return the response of a request from the response cache, the request is sent (with fetch) and its response
+        cached if the cache does not hold it
+        :param url: the url of the request
+        :type url: str
+        :param params: the parameters of the request
+        :type params: dict
+        :param fetch: the function sending the request
+        :type fetch: () -> bytes
+        :return: the response, None in replay mode if the cache does not hold it
+        :rtype: bytes | None
+        """
+        if cls.CACHE is None:
+            return fetch()
+
+        key = cls.CACHE.key(url, params)
+        data = cls.CACHE.get(key)
+        if data is None:
+            if cls.CACHE.replay:
+                print(f"No cached response for {url} {params}", file=sys.stderr)
+                return None
+            data = fetch()
+            cls.CACHE.put(key, data)
+        return data
+
+    @staticmethod
+    def reddit_record(post):
+        """
+        Return the values of a reddit post used by Document.from_reddit (the comments are only requested for the posts
+        long enough to be kept)
+        :param post: the result of praw request
+        :type post: praw.models.Submission
+        :return: the record of the post
+        :rtype: dict
+        """
+        return dict(title=post.title, author_flair_text=post.author_flair_text, created_utc=post.created_utc, url=post.url,
+                    selftext=post.selftext, comment_count=len(post.comments) if len(post.selftext) >= 100 else 0, name=post.name)
+
+    @classmethod
+    def reddit_page(cls, theme, limit, after):
+        """
+        Return the records of one page of reddit hot posts, see reddit_record
+        :param theme: the theme to query
+        :type theme: str
+        :param limit: the amount of post to query
+        :type limit: int
+        :param after: the name of the post before the page
+        :type after: str
+        :return: the records of the page
+        :rtype: list[dict]
+        :raise prawcore.exceptions.PrawcoreException
+        """
+        def fetch():
+            posts = cls.REDDIT.subreddit(theme).hot(limit=limit, params={"after": after})
+            return json.dumps(list(map(cls.reddit_record, posts))).encode("utf-8")
+
+        data = cls._request(f"https://oauth.reddit.com/r/{theme}/hot", dict(limit=limit, after=after),
+                            lambda: cls.REDDIT_SCHEDULER.call(fetch, limit))
+        return [] if data is None else json.loads(data)
 
     @classmethod
     def reddit(cls, theme, count, offset=""):
@@ -36,21 +127,94 @@ class DataQuery:
         :return: a list of document
         :rtype: list[RedditDocument]
         """
-        posts = []
-        to_query = count
+        return [document for page in cls.reddit_pages(theme, count, offset) for document in page]
+
+    @classmethod
+    def reddit_pages(cls, theme, count, offset=""):
+        """
+        Fetch <count> documents of <theme>, start at <offset> document from reddit, the documents of each page are
+        yielded as soon as the page is read.
+        The pages are requested through REDDIT_SCHEDULER, their size is adapted to the share of posts with a short text
+        (skipped).
+        :param theme: the theme to query
+        :type theme: str
+        :param count: the amount of document to query
+        :type count: int
+        :param offset: the document name to start the query
+        :type offset: str
+        :return: a generator of list of document (one list per page, pages without document are skipped)
+        :rtype: Generator[list[RedditDocument]]
+        """
+        fetched = 0
         cursor = offset
-        while len(posts) < count and to_query > 0:
-            hot_posts = cls.REDDIT.subreddit(theme).hot(limit=to_query, params={"after": cursor})
+        cls.REDDIT_SCHEDULER.start()
+        while fetched < count:
+            # The cached pages are keyed by their size: the size does not follow the latency when the cache is on
+            size, _ = cls.REDDIT_SCHEDULER.plan(count - fetched, config.REDDIT_PAGE_SIZE, adaptive=cls.CACHE is None)
+            try:
+                hot_posts = cls.reddit_page(theme, size, cursor)
+            except cls.REDDIT_SCHEDULER.retry_on as error:
+                print(f"Could not query reddit with {theme} keyword ({error})", file=sys.stderr)
+                return
 
-            to_query = 0
-            for post in hot_posts:
-                if len(post.selftext) < 100:
-                    to_query += 1
-                else:
-                    posts.append(post)
-                cursor = post.name
+            kept = [post for post in hot_posts if len(post["selftext"]) >= 100]
+            cls.REDDIT_SCHEDULER.observe(len(hot_posts), len(kept))
+            kept = kept[0:count - fetched]
+            if len(kept) > 0:
+                fetched += len(kept)
+                yield list(map(Document.from_reddit, kept))
+            if len(hot_posts) < size:
+                return
+            cursor = hot_posts[-1]["name"]
+
+    @classmethod
+    def arxiv_page(cls, theme, start, size):
+        """
+        Return the entries of one page of arxiv results (the connections to the api are pooled, the responses are cached).
+        The page is requested through ARXIV_SCHEDULER, the response is read as it is received when the cache is off,
+        entries with a short summary are skipped.
+        :param theme: the theme to query
+        :type theme: str
+        :param start: the api index of the first entry
+        :type start: int
+        :param size: the amount of entry to query
+        :type size: int
+        :return: the records of the entries kept and the entry count of the page (lower than size at the end of the
+            results, 0 in replay mode if the page is not cached)
+        :rtype: (list[ArxivEntry], int)
+        :raise urllib3.exceptions.HTTPError
+        """
+        fields = dict(search_query=f"all:{theme}", start=start, max_results=size)
+
+        def request(preload=True):
+            response = cls.HTTP.request("GET", cls.ARXIV_API_URL, fields=fields, preload_content=preload)
+            if response.status != 200:
+                # The connection goes back to the pool once the body is read
+                response.drain_conn()
+                response.release_conn()
+                raise urllib3.exceptions.HTTPError(f"arxiv api answered {response.status}")
+            return response
+
+        def read(stream):
+            entries, count = [], 0
+            for count, entry in enumerate(read_entries(stream, start, min_summary=100), 1):
+                if entry is not None:
+                    entries.append(entry)
+            return entries, count
+
+        def read_response():
+            response = request(preload=False)
+            try:
+                return read(response)
+            finally:
+                response.drain_conn()
+                response.release_conn()
+
+        if cls.CACHE is None:
+            return cls.ARXIV_SCHEDULER.call(read_response, size)
 
-        return list(map(Document.from_reddit, posts))
+        data = cls._request(cls.ARXIV_API_URL, fields, lambda: cls.ARXIV_SCHEDULER.call(lambda: request().data, size))
+        return read(io.BytesIO(data)) if data is not None else ([], 0)
 
     @classmethod
     def arxiv(cls, theme, count, offset=0):
@@ -65,39 +229,52 @@ class DataQuery:
         :return: a list of document
         :rtype: list[ArxivDocument]
         """
-        posts = []
-        to_query = count
-        cursor = int(offset) + 1
-        while len(posts) < count and to_query > 0:
-
-            lst = []
-            url = f'{cls.ARXIV_API_URL}?search_query=all:{theme}&start={cursor}&max_results={to_query}'
-            try:
-                xml = urllib.request.urlopen(url)
-                feed = xmltodict.parse(xml.read().decode('utf-8'))["feed"]
-                if "entry" in feed:
-                    lst = feed["entry"]
-                else:
-                    return posts
-            except urllib.error.HTTPError:
-                print(f"Could not query arxiv with {theme} keyword", file=sys.stderr)
-                return posts
-
-            if type(lst) is not list:
-                lst = [lst]
-
-            to_query = 0
-            next_cursor = 0
-            for i in range(len(lst)):
-                if len(lst[i]["summary"]) < 100:
-                    to_query += 1
-                else:
-                    posts.append(lst[i] | dict(api_index=cursor + i))
-                next_cursor = cursor + i
+        return [document for page in cls.arxiv_pages(theme, count, offset) for document in page]
 
-            cursor = next_cursor + 1
+    @classmethod
+    def arxiv_pages(cls, theme, count, offset=0):
+        """
+        Fetch <count> documents of <theme>, start at <offset> document from arxiv, the documents of each page are
+        yielded as soon as the page and the pages before it are read.
+        The pages needed are requested at the same time (config.FETCH_WORKERS at most) through ARXIV_SCHEDULER, more
+        pages are requested while documents are missing (entries with a short summary are skipped while the pages are
+        read, the size and the number of the pages are adapted to their share).
+        :param theme: the theme to query
+        :type theme: str
+        :param count: the amount of document to query
+        :type count: int
+        :param offset: the document index to start the query
+        :type offset: int
+        :return: a generator of list of document (one list per page, pages without document are skipped)
+        :rtype: Generator[list[ArxivDocument]]
+        """
+        fetched = 0
+        cursor = int(offset) + 1
+        cls.ARXIV_SCHEDULER.start()
 
-        return list(map(Document.from_arxiv, posts))
+        executor = ThreadPoolExecutor(max_workers=config.FETCH_WORKERS)
+        try:
+            while fetched < count:
+                # The cached pages are keyed by their start and size: they do not follow the latency when the cache is on
+                size, page_count = cls.ARXIV_SCHEDULER.plan(count - fetched, config.ARXIV_PAGE_SIZE, adaptive=cls.CACHE is None)
+                starts = [cursor + i * size for i in range(page_count)]
+                pages = executor.map(lambda start, size=size: cls.arxiv_page(theme, start, size), starts)
+                try:
+                    for entries, page_size in pages:
+                        cls.ARXIV_SCHEDULER.observe(page_size, len(entries))
+                        entries = entries[0:count - fetched]
+                        if len(entries) > 0:
+                            fetched += len(entries)
+                            yield list(map(Document.from_arxiv, entries))
+                        if page_size < size:
+                            return
+                except cls.ARXIV_SCHEDULER.retry_on as error:
+                    print(f"Could not query arxiv with {theme} keyword ({error})", file=sys.stderr)
+                    return
+                cursor = starts[-1] + size
+        finally:
+            # The pages not requested yet are no longer needed (end of the results, or the caller stopped reading)
+            executor.shutdown(wait=True, cancel_futures=True)
 
     @classmethod
     def all(cls, theme, count, r_off="", a_off=0):
@@ -111,24 +288,80 @@ class DataQuery:
         :type r_off: str
         :param a_off: the document index to start the query for arxiv
         :type a_off: int
-        :return: a list of document
+        :return: a list of document, reddit documents first
         :rtype: list[RedditDocument | ArxivDocument]
         """
+        documents = [document for page in cls.all_pages(theme, count, r_off, a_off) for document in page]
+        return [*filter(lambda doc: doc.get_type() == "reddit", documents), *filter(lambda doc: doc.get_type() == "arxiv", documents)]
+
+    @classmethod
+    def all_pages(cls, theme, count, r_off="", a_off=0):
+        """
+        Fetch <count> documents shared between reddit and arxiv (compensation if one of the api no longer has a document
+        to provide), the pages of both sources are yielded as soon as they are fetched: arxiv pages are fetched in
+        background while reddit is queried.
+        :param theme: the theme to query
+        :type theme: str
+        :param count: the amount of document to query
+        :type count: int
+        :param r_off: the document name to start the query for reddit
+        :type r_off: str
+        :param a_off: the document index to start the query for arxiv
+        :type a_off: int
+        :return: a generator of list of document (one source per list)
+        :rtype: Generator[list[RedditDocument] | list[ArxivDocument]]
+        """
         assert count % 2 == 0
 
-        arxiv_doc = cls.arxiv(theme, count // 2, a_off)
-        reddit_doc = cls.reddit(theme, count // 2, r_off)
+        reddit_doc, arxiv_doc = [], []
+        # Pages of the arxiv thread, None once it is over
+        arxiv_pages = queue.Queue()
+        arxiv_over = False
+        stop = threading.Event()
+
+        def fetch_arxiv():
+            try:
+                for page in cls.arxiv_pages(theme, count // 2, a_off):
+                    if stop.is_set():
+                        return
+                    arxiv_pages.put(page)
+            finally:
+                arxiv_pages.put(None)
+
+        def received(wait):
+            nonlocal arxiv_over
+            while not arxiv_over and (wait or not arxiv_pages.empty()):
+                page = arxiv_pages.get()
+                if page is None:
+                    arxiv_over = True
+                else:
+                    arxiv_doc.extend(page)
+                    yield page
+
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            arxiv_future = executor.submit(fetch_arxiv)
+            try:
+                for page in cls.reddit_pages(theme, count // 2, r_off):
+                    reddit_doc.extend(page)
+                    yield page
+                    yield from received(wait=False)
+                yield from received(wait=True)
+                arxiv_future.result()
+            finally:
+                stop.set()
 
         if len(arxiv_doc) < count // 2 and len(reddit_doc) == count // 2:
             print(f"Arxiv document compensated by reddit")
-            reddit_doc += cls.reddit(theme, (count // 2) - len(arxiv_doc), reddit_doc[-1].get_fullname())
+            for page in cls.reddit_pages(theme, (count // 2) - len(arxiv_doc), reddit_doc[-1].get_fullname()):
+                reddit_doc.extend(page)
+                yield page
         elif len(reddit_doc) < count // 2 and len(arxiv_doc) == count // 2:
             print(f"Reddit document compensated by arxiv")
-            arxiv_doc += cls.arxiv(theme, (count // 2) - len(reddit_doc), arxiv_doc[-1].get_api_index())
+            for page in cls.arxiv_pages(theme, (count // 2) - len(reddit_doc), arxiv_doc[-1].get_api_index()):
+                arxiv_doc.extend(page)
+                yield page
         elif len(arxiv_doc) < count // 2 and len(reddit_doc) < count // 2:
             print(f"Not enough document to fill corpus ({len(reddit_doc) + len(arxiv_doc)}/{count})")
 
         if len(arxiv_doc) < count // 2 and len(reddit_doc) < count // 2:
             print(f"Not enough document to fill corpus ({len(reddit_doc) + len(arxiv_doc)}/{count})")
-
-        return [*reddit_doc, *arxiv_doc]
@@ -0,0 +1,220 @@
+import math
+import random
+import sys
+import threading
+import time
+from collections import deque
+
+
+class TokenBucket:
+    """
+    A class used to limit a rate of request: a request takes a token, tokens are added at rate per second up to
+    capacity (the requests beyond capacity wait for their token)
+
+    Attributes
+    ----------
+    rate : float
+        the number of token added per second (None for no limit)
+    capacity : int
+        the maximum number of token, the number of request allowed at once
+
+    Methods
+    -------
+    acquire()
+        Take a token, wait for it if there is none
+    """
+
+    def __init__(self, rate=None, capacity=1):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """
+        Take a token, wait for it if there is none
+        :return: the number of second waited
+        :rtype: float
+        """
+        if self.rate is None:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            # The token is taken now, the tokens can be negative: the next requests wait behind this one
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        time.sleep(wait)
+        return wait
+
+
+class FetchScheduler:
+    """
+    A class used to send the requests of a source: the requests are rate limited, retried with an exponential backoff
+    (with jitter) and timed. The size of the pages is adapted to the latency of the requests and to the share of results
+    rejected by the caller.
+
+    Attributes
+    ----------
+    name : str
+        the name of the source
+    bucket : TokenBucket
+        the rate limit of the requests
+    retries : int
+        the number of retry of a failed request
+    backoff : float
+        the maximum wait before the first retry, in second (doubled at each retry)
+    max_backoff : float
+        the maximum wait before a retry, in second
+    retry_on : tuple[type]
+        the exceptions of a failed request that are retried
+    target_latency : float
+        the latency above which the pages are made smaller, in second
+    min_size : int
+        the minimum size of a page
+    limit : int
+        the current maximum size of a page (None until a request is slower than target_latency)
+    acceptance : float
+        the moving average of the share of results kept by the caller during the current query
+    latency : float
+        the moving average of the latency of the requests (None before the first request)
+    metrics : deque[dict]
+        the timing of the last requests
+
+    Methods
+    -------
+    start()
+        Start a query, the share of results kept is learned again
+    call(fetch, size)
+        Send a request, retried while it fails
+    plan(missing, max_size, adaptive=True)
+        Return the size and the number of the pages to request <missing> results
+    observe(size, kept)
+        Take into account the share of results kept from a page
+    stats()
+        Return the counters of the requests
+    """
+
+    SMOOTHING = 0.3
+
+    def __init__(self, name, rate=None, burst=1, retries=3, backoff=1.0, max_backoff=30.0, retry_on=(Exception,),
+                 target_latency=5.0, min_size=1):
+        self.name = name
+        self.bucket = TokenBucket(rate, burst)
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.retry_on = retry_on
+        self.target_latency = target_latency
+        self.min_size = min_size
+        self.limit = None
+        self.acceptance = 1.0
+        self.latency = None
+        self.metrics = deque(maxlen=1024)
+        self._lock = threading.Lock()
+
+    def start(self):
+        """
+        Start a query, the share of results kept is learned again (it depends on the query, and a query replayed from
+        the response cache requests the same pages)
+        """
+        with self._lock:
+            self.acceptance = 1.0
+
+    def call(self, fetch, size=None):
+        """
+        Send a request, retried while it fails with one of retry_on (the wait before retry n is drawn between 0 and
+        backoff * 2^n)
+        :param fetch: the function sending the request
+        :type fetch: () -> Any
+        :param size: the size of the requested page, kept in the metrics
+        :type size: int
+        :return: the result of fetch
+        :rtype: Any
+        :raise the exception of the last attempt
+        """
+        attempt = 0
+        while True:
+            waited = self.bucket.acquire()
+            start = time.perf_counter()
+            try:
+                result = fetch()
+            except self.retry_on as error:
+                self._measure(time.perf_counter() - start, waited, size, attempt, error)
+                if attempt >= self.retries:
+                    raise
+                delay = random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+                print(f"{self.name} request failed ({error}), retry in {delay:.1f}s", file=sys.stderr)
+                time.sleep(delay)
+                attempt += 1
+            else:
+                self._measure(time.perf_counter() - start, waited, size, attempt)
+                return result
+
+    def _measure(self, duration, waited, size, attempt, error=None):
+        """
+        Keep the timing of a request and adapt the page size limit to its latency (halved above target_latency,
+        raised by a half under a quarter of it)
+        """
+        with self._lock:
+            self.metrics.append(dict(duration=duration, waited=waited, size=size, attempt=attempt,
+                                     error=None if error is None else str(error)))
+            if error is not None or size is None:
+                return
+            self.latency = duration if self.latency is None else self.latency + self.SMOOTHING * (duration - self.latency)
+            if self.latency > self.target_latency:
+                self.limit = max(self.min_size, min(self.limit or size, size) // 2)
+            elif self.limit is not None and self.latency < self.target_latency / 4:
+                self.limit = math.ceil(self.limit * 1.5)
+
+    def plan(self, missing, max_size, adaptive=True):
+        """
+        Return the size and the number of the pages to request <missing> results, results are expected to be rejected
+        as often as in the previous pages
+        :param missing: the amount of result needed
+        :type missing: int
+        :param max_size: the maximum size of a page allowed by the api
+        :type max_size: int
+        :param adaptive: False to ignore the page size limit learned from the latency, the pages of a query then only
+            depend on the query and its results (the same pages are requested again, as a response cache needs)
+        :type adaptive: bool
+        :return: the size of a page and the number of page
+        :rtype: (int, int)
+        """
+        with self._lock:
+            wanted = max(1, math.ceil(missing / max(self.acceptance, 0.1)))
+            size = max(1, min(wanted, max_size if self.limit is None or not adaptive else min(self.limit, max_size)))
+            return size, math.ceil(wanted / size)
+
+    def observe(self, size, kept):
+        """
+        Take into account the share of results kept from a page
+        :param size: the amount of result of the page
+        :type size: int
+        :param kept: the amount of result kept
+        :type kept: int
+        """
+        if size > 0:
+            with self._lock:
+                self.acceptance += self.SMOOTHING * (kept / size - self.acceptance)
+
+    def stats(self):
+        """
+        Return the counters of the requests
+        :return: the request count, the failed attempts, the mean and maximum duration, the time waited for the rate
+            limit, the current page size limit and acceptance
+        :rtype: dict[str, int | float]
+        """
+        with self._lock:
+            durations = [metric["duration"] for metric in self.metrics]
+            return dict(requests=len(self.metrics), failures=sum(metric["error"] is not None for metric in self.metrics),
+                        mean=sum(durations) / len(durations) if durations else 0.0, max=max(durations, default=0.0),
+                        waited=sum(metric["waited"] for metric in self.metrics), limit=self.limit, acceptance=self.acceptance)
+
+    def __str__(self):
+        return f"FetchScheduler({self.name}, {', '.join(f'{key}={value}' for key, value in self.stats().items())})"
+
+    def __repr__(self):
+        return self.__str__()
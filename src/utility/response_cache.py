@@ -0,0 +1,190 @@
+import hashlib
+import json
+import os
+import threading
+import time
+
+
+class ResponseCache:
+    """
+    A class used to keep the responses of the apis on disk, each response is stored in a file named by the hash of its
+    request (url and parameters). Responses expire after a time to live and the oldest ones are evicted when the
+    cache is bigger than max_bytes (the total size is counted when the cache is opened, then kept up to date by put, so
+    the folder is only scanned when the cache is over budget). In replay mode the cache is used offline: responses
+    never expire and a missing response is not requested.
+
+    Attributes
+    ----------
+    folder : Path
+        the folder of the response files
+    ttl : float
+        the number of second a response is kept (None to keep responses until they are evicted)
+    max_bytes : int
+        the maximum total size of the responses (0 to disable the cache)
+    replay : bool
+        True to use the cache offline
+    hits : int
+        the number of get that found a response
+    misses : int
+        the number of get that found nothing (or an expired response)
+
+    Methods
+    -------
+    key(url, params)
+        Return the key of a request
+    get(key)
+        Return the response cached under key, None if it is missing or expired
+    put(key, data)
+        Cache a response under key, evicting the oldest responses over max_bytes
+    clear()
+        Remove all responses (the counters are kept)
+    stats()
+        Return the counters of the cache
+    """
+
+    def __init__(self, folder, ttl=None, max_bytes=1 << 28, replay=False):
+        self.folder = folder
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.replay = replay
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._size = self._total(self._files())
+
+    @staticmethod
+    def key(url, params=None):
+        """
+        Return the key of a request, the parameters order does not matter
+        :param url: the url of the request
+        :type url: str
+        :param params: the parameters of the request
+        :type params: dict
+        :return: the hexadecimal sha256 of the request
+        :rtype: str
+        """
+        request = json.dumps([url, sorted((str(name), str(value)) for name, value in (params or {}).items())])
+        return hashlib.sha256(request.encode("utf-8")).hexdigest()
+
+    def _path(self, key):
+        return self.folder.joinpath(key[:2], key)
+
+    def _files(self):
+        """
+        Return the response files (the files being written are left out)
+        :return: the paths
+        :rtype: list[Path]
+        """
+        return [path for path in self.folder.glob("*/*") if path.suffix != ".tmp"]
+
+    @staticmethod
+    def _total(paths):
+        """
+        Return the total size of files (the files removed meanwhile are left out)
+        :param paths: the paths of the files
+        :type paths: list[Path]
+        :return: the size in bytes
+        :rtype: int
+        """
+        size = 0
+        for path in paths:
+            try:
+                size += path.stat().st_size
+            except OSError:
+                continue
+        return size
+
+    def get(self, key):
+        """
+        Return the response cached under key, None if it is missing or expired (responses never expire in replay mode)
+        :param key: the key of the request, see key
+        :type key: str
+        :return: the response
+        :rtype: bytes | None
+        """
+        path = self._path(key)
+        try:
+            if not self.replay and self.ttl is not None and time.time() - path.stat().st_mtime > self.ttl:
+                raise FileNotFoundError(path)
+            data = path.read_bytes()
+        except OSError:
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+        return data
+
+    def put(self, key, data):
+        """
+        Cache a response under key, evicting the oldest responses over max_bytes (the file is replaced at once, so
+        concurrent readers see the old or the new response)
+        :param key: the key of the request, see key
+        :type key: str
+        :param data: the response
+        :type data: bytes
+        """
+        if len(data) > self.max_bytes:
+            return
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temporary = path.with_name(f"{key}.{os.getpid()}.{threading.get_ident()}.tmp")
+        temporary.write_bytes(data)
+
+        with self._lock:
+            try:
+                previous = path.stat().st_size
+            except OSError:
+                previous = 0
+            os.replace(temporary, path)
+            self._size += len(data) - previous
+            if self._size > self.max_bytes:
+                self._evict()
+
+    def _evict(self):
+        """
+        Remove the oldest responses while the cache is bigger than max_bytes, the total size is counted again from the
+        folder as other processes may share it (the lock must be held)
+        """
+        files = []
+        for path in self._files():
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, path))
+
+        size = sum(file[1] for file in files)
+        for _, file_size, path in sorted(files):
+            if size <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            size -= file_size
+        self._size = size
+
+    def clear(self):
+        """
+        Remove all responses (the counters are kept)
+        """
+        with self._lock:
+            for path in self._files():
+                path.unlink(missing_ok=True)
+            self._size = 0
+
+    def stats(self):
+        """
+        Return the counters of the cache
+        :return: the response count, the total size, the hits, the misses and the hit ratio
+        :rtype: dict[str, int | float]
+        """
+        with self._lock:
+            sizes = [path.stat().st_size for path in self._files()]
+            total = self.hits + self.misses
+            return dict(entries=len(sizes), bytes=sum(sizes), hits=self.hits, misses=self.misses,
+                        ratio=self.hits / total if total > 0 else 0.0)
+
+    def __str__(self):
+        return f"ResponseCache({self.folder}, replay={self.replay})"
+
+    def __repr__(self):
+        return self.__str__()
@@ -0,0 +1,124 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class ResultCache:
+    """
+    A class used to keep the last results of a function (least recently used first evicted), bounded in entries and
+    bytes, each entry expiring after a time to live
+
+    Attributes
+    ----------
+    max_entries : int
+        the maximum number of entry (0 to disable the cache)
+    max_bytes : int
+        the maximum total size of the entries
+    ttl : float
+        the number of second an entry is kept (None to keep entries until they are evicted)
+    hits : int
+        the number of get that found a value
+    misses : int
+        the number of get that found nothing (or an expired value)
+    size : int
+        the total size of the entries
+
+    Methods
+    -------
+    get(key)
+        Return the value cached under key, None if it is missing or expired
+    put(key, value, size)
+        Cache value under key, evicting the least recently used entries over the bounds
+    clear()
+        Remove all entries (the counters are kept)
+    stats()
+        Return the counters of the cache
+    """
+
+    def __init__(self, max_entries=256, max_bytes=1 << 20, ttl=None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.size = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """
+        Return the value cached under key, None if it is missing or expired
+        :param key: the key of the value
+        :type key: Hashable
+        :return: the value
+        :rtype: Any
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self.ttl is not None and time.monotonic() - entry[2] > self.ttl:
+                self._remove(key)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value, size):
+        """
+        Cache value under key, evicting the least recently used entries over the bounds (a value bigger than
+        max_bytes is not cached)
+        :param key: the key of the value
+        :type key: Hashable
+        :param value: the value
+        :type value: Any
+        :param size: the size of the value, in bytes
+        :type size: int
+        """
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            if self.max_entries < 1 or size > self.max_bytes:
+                return
+            self._entries[key] = (value, size, time.monotonic())
+            self.size += size
+            while len(self._entries) > self.max_entries or self.size > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+
+    def _remove(self, key):
+        """
+        Remove the entry of key (the lock must be held)
+        :param key: the key of the entry
+        :type key: Hashable
+        """
+        _, size, _ = self._entries.pop(key)
+        self.size -= size
+
+    def clear(self):
+        """
+        Remove all entries (the counters are kept)
+        """
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+    def stats(self):
+        """
+        Return the counters of the cache
+        :return: the entry count, the total size, the hits, the misses and the hit ratio
+        :rtype: dict[str, int | float]
+        """
+        with self._lock:
+            total = self.hits + self.misses
+            return dict(entries=len(self._entries), bytes=self.size, hits=self.hits, misses=self.misses,
+                        ratio=self.hits / total if total > 0 else 0.0)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __str__(self):
+        return f"ResultCache({', '.join(f'{key}={value}' for key, value in self.stats().items())})"
+
+    def __repr__(self):
+        return self.__str__()
@@ -0,0 +1,121 @@
+import hashlib
+import re
+
+import numpy as np
+
+ENGLISH_STOPWORDS = frozenset("""
+a about above after again against all am an and any are as at be because been before being below between both but by
+can could did do does doing down during each few for from further had has have having he her here hers herself him
+himself his how i if in into is it its itself just me more most my myself no nor not now of off on once only or other
+our ours ourselves out over own same she should so some such than that the their theirs them themselves then there
+these they this those through to too under until up very was we were what when where which while who whom why will
+with would you your yours yourself yourselves
+""".split())
+
+
+class Tokenizer:
+    """
+    A class used to split texts into index words
+
+    Attributes
+    ----------
+    stopwords : frozenset[str]
+        the words removed from the texts
+    stemmer : Callable[[str], str] | None
+        the function that return the stem of a word (None to keep words as they are)
+    min_df : int | float
+        the minimum number (int) or proportion (float) of document a word must appear in to be kept in the vocabulary
+    max_df : int | float
+        the maximum number (int) or proportion (float) of document a word can appear in to be kept in the vocabulary
+
+    Methods
+    -------
+    tokens(text)
+        Yield the words of text: only letters, as lower case, without stopwords and words of more than 20 letters, stemmed
+    tokenize(text)
+        Return the list of words of text
+    stem(word)
+        Return the stem of word (memoised)
+    keep(document_freq, ndoc)
+        Return the mask of the words kept by min_df and max_df
+    signature()
+        Return a string that identify the tokenizer settings
+    """
+
+    NOT_LETTER = re.compile(r"[^a-zA-Z\s]+")
+    MAX_WORD_LENGTH = 20
+
+    def __init__(self, stopwords=(), stemmer=None, min_df=1, max_df=1.0):
+        self.stopwords = frozenset(stopwords)
+        self.stemmer = stemmer
+        self.min_df = min_df
+        self.max_df = max_df
+        self._stems = {}
+
+    def tokens(self, text):
+        """
+        Yield the words of text: only letters, as lower case, without stopwords and words of more than 20 letters, stemmed
+        :param text: the text to split
+        :type text: str
+        :return: a generator of word
+        :rtype: Generator[str]
+        """
+        for word in self.NOT_LETTER.sub("", text).lower().split():
+            if len(word) <= self.MAX_WORD_LENGTH and word not in self.stopwords:
+                yield self.stem(word) if self.stemmer else word
+
+    def tokenize(self, text):
+        """
+        Return the list of words of text
+        :param text: the text to split
+        :type text: str
+        :return: a list of word
+        :rtype: list[str]
+        """
+        return list(self.tokens(text))
+
+    def stem(self, word):
+        """
+        Return the stem of word (memoised)
+        :param word: the word
+        :type word: str
+        :return: the stem of the word
+        :rtype: str
+        """
+        stem = self._stems.get(word)
+        if stem is None:
+            stem = self._stems[word] = self.stemmer(word) if self.stemmer else word
+        return stem
+
+    def keep(self, document_freq, ndoc):
+        """
+        Return the mask of the words kept by min_df and max_df
+        :param document_freq: the number of document that contain each word
+        :type document_freq: ndarray
+        :param ndoc: the number of document
+        :type ndoc: int
+        :return: True for each word to keep
+        :rtype: ndarray
+        """
+        min_df = self.min_df * ndoc if isinstance(self.min_df, float) else self.min_df
+        max_df = self.max_df * ndoc if isinstance(self.max_df, float) else self.max_df
+        return (np.asarray(document_freq) >= min_df) & (np.asarray(document_freq) <= max_df)
+
+    def signature(self):
+        """
+        Return a string that identify the tokenizer settings (to know if an index was built with the same settings)
+        :return: the signature
+        :rtype: str
+        """
+        stopwords = hashlib.sha1(" ".join(sorted(self.stopwords)).encode("utf-8")).hexdigest()[0:12]
+        stemmer = getattr(self.stemmer, "__qualname__", type(self.stemmer).__name__) if self.stemmer else ""
+        return f"{stopwords}/{stemmer}/{self.min_df}/{self.max_df}"
+
+    def __getstate__(self):
+        return self.__dict__ | {"_stems": {}}
+
+    def __str__(self):
+        return f"Tokenizer(stopwords={len(self.stopwords)}, stemmer={self.stemmer is not None}, min_df={self.min_df}, max_df={self.max_df})"
+
+    def __repr__(self):
+        return self.__str__()